@@ -0,0 +1,78 @@
+"""Compare the generated argument binder against the generic one it replaced.
+
+Run from the repository root with `python -m benchmarks.binder`.
+"""
+
+import itertools
+import sys
+import timeit
+
+import prequel as pq
+
+
+def legacy_binder(query, query_context):
+    """The generic closure previously returned by `mkquery`."""
+
+    def inner(*args, **kwargs):
+        convert_kw = []
+
+        if len(args) > len(query_context):
+            raise TypeError(
+                f"Query takes {len(query_context)} arguments but {len(args)} were given"
+            )
+        elif len(args) < len(query_context):
+            iterator = query_context.items()
+            next(itertools.islice(iterator, len(args), len(args)), None)
+            for arg, data in iterator:
+                val = kwargs.pop(arg, data[1])
+                if val is Ellipsis:
+                    raise TypeError(
+                        f"Query missing a required keyword-only argument: {repr(arg)}"
+                    )
+                convert_kw.append(val)
+
+        if kwargs:
+            raise TypeError(
+                f"Query got unexpected keyword arguments {list(kwargs.keys())}"
+            )
+
+        return (query, *args, *convert_kw)
+
+    return inner
+
+
+def bench(params: int, number: int = 2000, repeat: int = 20):
+    """Time positional and keyword calls for a query with `params` arguments.
+
+    The fastest of `repeat` interleaved repetitions is kept, since single runs are noisy.
+    """
+    blocks = [pq.Variable(f"arg{i}") for i in range(params)]
+    generated = pq.mkquery(blocks)
+    query_context = {f"arg{i}": (object, ...) for i in range(params)}
+    args = list(range(params))
+    legacy = legacy_binder(generated(*args)[0], query_context)
+
+    # Keyword names written at call sites are interned, so intern them here too.
+    kwargs = {sys.intern(f"arg{i}"): i for i in range(params)}
+    names = {"args": args, "kwargs": kwargs}
+    for label, stmt in [("positional", "query(*args)"), ("keyword", "query(**kwargs)")]:
+        # Alternate between the binders, so that both see the same noise.
+        old = new = float("inf")
+        for _ in range(repeat):
+            for query in (legacy, generated):
+                seconds = timeit.timeit(stmt, globals={"query": query, **names}, number=number)
+                if query is legacy:
+                    old = min(old, seconds)
+                else:
+                    new = min(new, seconds)
+        print(
+            f"{params:>4} params {label:>10}: "
+            f"legacy {old / number * 1e9:8.0f} ns/call, "
+            f"generated {new / number * 1e9:8.0f} ns/call, "
+            f"speedup {old / new:5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    for size in (1, 10, 100):
+        bench(size)
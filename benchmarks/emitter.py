@@ -0,0 +1,70 @@
+"""Compare the iterative emitter against recursive flattening and string concatenation.
+
+Run from the repository root with `python -m benchmarks.emitter`.
+"""
+
+import timeit
+from itertools import chain
+
+import prequel as pq
+from prequel import types
+from prequel.emit import Flat
+
+
+def legacy_flatten(node, value=False):
+    """Flatten recursively, copying child lists at every level like the old `flatten()`."""
+    if isinstance(node, Flat):
+        return legacy_flatten(node.node)
+    if isinstance(node, str) or not hasattr(node, "parts"):
+        return [node]
+    res = [*chain.from_iterable(legacy_flatten(part, True) for part in node.parts())]
+    if value and node.parenthesize:
+        return ["(", *res, ")"]
+    return res
+
+
+def legacy_render(blocks):
+    """Render blocks by concatenating strings, like the old `mkquery`."""
+    query_context = types.QueryArgs()
+    query = ""
+    for block in blocks:
+        part = block if isinstance(block, str) else block.compile(query_context)
+        if part in [")", ","]:
+            query = query.rstrip()
+        query += part
+        if part != "(":
+            query += " "
+    return query.rstrip(), query_context
+
+
+def small_query():
+    return pq.Select("id", "name").from_("user").where(id=int, name=str)
+
+
+def wide_query(count=2000):
+    return pq.Select("id").from_("user").where(*[pq.Column(f"col{i}") == i for i in range(count)])
+
+
+def deep_query(depth=300):
+    expr = pq.Column("col0")
+    for i in range(1, depth):
+        expr = pq.Expression(expr, pq.Operator.add, pq.Column(f"col{i}"))
+    return pq.Select(expr).from_("user")
+
+
+def bench(label, query, number):
+    """Time flattening and rendering a query with both implementations."""
+    assert pq.render(query.flatten())[0] == legacy_render(legacy_flatten(query))[0]
+    tokens = len(query.flatten())
+    old = timeit.timeit(lambda: legacy_render(legacy_flatten(query)), number=number) / number
+    new = timeit.timeit(lambda: pq.render(query.flatten()), number=number) / number
+    print(
+        f"{label:>6} ({tokens:>5} tokens): "
+        f"legacy {old * 1e6:9.1f} us, emitter {new * 1e6:9.1f} us, speedup {old / new:5.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    bench("small", small_query(), 20000)
+    bench("wide", wide_query(), 20)
+    bench("deep", deep_query(), 50)
@@ -0,0 +1,107 @@
+"""Measure the memory used by trees of nodes, with and without `__slots__`.
+
+Dict-based subclasses of the node types stand in for the old layout,
+since subclasses that do not declare `__slots__` get a `__dict__` again.
+
+Run from the repository root with `python -m benchmarks.memory`.
+"""
+
+import gc
+import tracemalloc
+
+import prequel as pq
+
+
+class DictTable(pq.Table):
+    pass
+
+
+class DictColumn(pq.Column):
+    pass
+
+
+class DictVariable(pq.Variable):
+    pass
+
+
+class DictExpression(pq.Expression):
+    pass
+
+
+class DictBetween(pq.Between):
+    pass
+
+
+class DictFunctionCall(pq.FunctionCall):
+    pass
+
+
+SLOTTED = (pq.Table, pq.Column, pq.Variable, pq.Expression, pq.Between, pq.FunctionCall)
+DICT = (DictTable, DictColumn, DictVariable, DictExpression, DictBetween, DictFunctionCall)
+
+
+def names(count, distinct=None):
+    """Create the names used by a tree up front, so they are not measured.
+
+    With `distinct`, tables and columns are drawn from that many names,
+    like filters over a fixed schema, and share interned nodes.
+    """
+    res = []
+    for i in range(count):
+        j = i % distinct if distinct else i
+        res.append((f"col{j}", f"arg{i}", f"min{i}", f"max{i}", f"table{j}"))
+    return res
+
+
+def build(names_, classes):
+    """Build a filter tree with one condition per set of names."""
+    table_cls, column_cls, variable_cls, expression_cls, between_cls, call_cls = classes
+    table = table_cls("user")
+    conditions = []
+    for i, (col, arg, cmin, cmax, other) in enumerate(names_):
+        column = column_cls(col, table=table)
+        if i % 2:
+            conditions.append(expression_cls(column, pq.Operator.eq, variable_cls(arg)))
+        else:
+            count_call = call_cls(pq.Function.count, [column])
+            conditions.append(between_cls(count_call, variable_cls(cmin), variable_cls(cmax)))
+        conditions.append(table_cls(other))
+    return conditions
+
+
+def node_count(count):
+    """Number of nodes in a tree, see `build`."""
+    return 1 + sum(4 if i % 2 else 6 for i in range(count))
+
+
+def measure(count, classes, distinct=None):
+    """Return the bytes allocated while building a tree."""
+    names_ = names(count, distinct)
+    build(names(1), classes)  # Warm up class-level caches outside of the measurement.
+    gc.collect()
+    tracemalloc.start()
+    tree = build(names_, classes)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tree
+    return size
+
+
+def bench(count, distinct=None):
+    """Compare slotted and dict-based trees of `count` conditions."""
+    nodes = node_count(count)
+    slotted = measure(count, SLOTTED, distinct)
+    dicts = measure(count, DICT, distinct)
+    label = f"{distinct} names" if distinct else "unique names"
+    print(
+        f"{nodes:>7} nodes, {label:>12}: "
+        f"__dict__ {dicts / nodes:6.1f} B/node, __slots__ {slotted / nodes:6.1f} B/node, "
+        f"saved {(dicts - slotted) / 2 ** 20:6.2f} MiB ({1 - slotted / dicts:5.1%})"
+    )
+
+
+if __name__ == "__main__":
+    for size in [2000, 20000, 200000]:
+        bench(size)
+    for size in [2000, 20000, 200000]:
+        bench(size, 100)
@@ -0,0 +1,35 @@
+"""Measure how placeholder numbering scales with the number of variables.
+
+Run from the repository root with `python -m benchmarks.placeholders`.
+"""
+
+import timeit
+
+import prequel as pq
+
+
+def bench(count: int, repeat: int = 5):
+    """Time compiling `count` distinct variables, alone and through mkquery."""
+    variables = [pq.Variable(f"arg{i}") for i in range(count)]
+    blocks = ["SELECT", *variables, ","] * 2
+
+    def compile_variables():
+        query_args = pq.types.QueryArgs()
+        for variable in variables:
+            variable.compile(query_args)
+        # Reusing a name must resolve to the existing placeholder.
+        for variable in variables:
+            variable.compile(query_args)
+
+    compile_time = min(timeit.repeat(compile_variables, number=1, repeat=repeat))
+    mkquery_time = min(timeit.repeat(lambda: pq.mkquery(blocks[:-1]), number=1, repeat=repeat))
+    print(
+        f"{count:>6} variables: "
+        f"compile {compile_time * 1e3:8.2f} ms ({compile_time / count * 1e9:6.0f} ns/var), "
+        f"mkquery {mkquery_time * 1e3:8.2f} ms ({mkquery_time / count * 1e9:6.0f} ns/var)"
+    )
+
+
+if __name__ == "__main__":
+    for size in (100, 1000, 10000):
+        bench(size)
@@ -4,13 +4,21 @@ Licensed under the terms of the LGPLv3 License.
 Copyright (C) Oxylibrium 2020
 """
 
-from . import types
+from . import metrics, types
 from .expression import *
 from .variable import *
 from .function import *
 from .column import *
 from .helpers import *
 from .mkquery import *
+from .metrics import *
+from .cache import *
+from .paginate import *
 from .select import *
+from .pgcopy import *
+from .returning import *
 from .insert import *
 from .update import *
+from .stream import *
+from .executor import *
+from .loader import *
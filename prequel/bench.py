@@ -0,0 +1,226 @@
+"""Benchmark suite for building, compiling and binding queries.
+
+Run with `python -m prequel.bench`, which prints the results as JSON.
+Save the output of two runs, and compare them with
+`python -m prequel.bench --compare before.json`.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .column import Column
+from .expression import Expression, Operator
+from .insert import Insert
+from .mkquery import mkquery
+from .select import Select
+from .update import Update
+
+__all__ = ["CASES", "measure", "run", "compare", "main"]
+
+DEFAULT_SIZES = (10, 100, 1000)
+
+# A case takes a size and returns the function to time.
+Case = Callable[[int], Callable[[], Any]]
+
+
+def _select(size: int) -> Select:
+    columns = [f"col{i}" for i in range(size)]
+    return Select(*columns).from_("bench").where(**{col: int for col in columns})
+
+
+def _insert(size: int) -> Insert:
+    return Insert("bench", [f"col{i}" for i in range(size)])
+
+
+def _update(size: int) -> Update:
+    columns = [f"col{i}" for i in range(size)]
+    return Update("bench").set(**{col: int for col in columns}).where(id=int)
+
+
+def _deep_where(size: int) -> Select:
+    # Nested binary expressions, rather than one flat chain.
+    expr = Column("col0") == 0
+    for i in range(1, size):
+        expr = Expression(expr, Operator.or_, Column(f"col{i}") == i)
+    return Select("id").from_("bench").where(expr)
+
+
+def _build(builder: Callable[[int], Any]) -> Case:
+    return lambda size: lambda: builder(size).flatten()
+
+
+def _compile(builder: Callable[[int], Any]) -> Case:
+    # Calls mkquery directly, so the query cache does not hide the cost.
+    def case(size: int) -> Callable[[], Any]:
+        blocks = builder(size).flatten()
+        return lambda: mkquery(blocks)
+    return case
+
+
+def _cached(builder: Callable[[int], Any]) -> Case:
+    def case(size: int) -> Callable[[], Any]:
+        query = builder(size)
+        query.to_query()
+        return query.to_query
+    return case
+
+
+def _bind(builder: Callable[[int], Any]) -> Case:
+    def case(size: int) -> Callable[[], Any]:
+        query = mkquery(builder(size).flatten())
+        args = tuple(range(len(query.__signature__.parameters)))
+        return lambda: query(*args)
+    return case
+
+
+def _bind_keywords(builder: Callable[[int], Any]) -> Case:
+    def case(size: int) -> Callable[[], Any]:
+        query = mkquery(builder(size).flatten())
+        kwargs = {name: 0 for name in query.__signature__.parameters}
+        return lambda: query(**kwargs)
+    return case
+
+
+def _partial(size: int) -> Callable[[], Any]:
+    query = _select(size).to_query()
+    return lambda: query.partial(col0=0)
+
+
+def _insert_batches(size: int) -> Callable[[], Any]:
+    insert = _insert(10)
+    rows = [tuple(range(10))] * size
+    return lambda: list(insert.batches(rows))
+
+
+CASES: Dict[str, Case] = {
+    "build.select": _build(_select),
+    "build.insert": _build(_insert),
+    "build.update": _build(_update),
+    "build.deep_where": _build(_deep_where),
+    "compile.select": _compile(_select),
+    "compile.insert": _compile(_insert),
+    "compile.update": _compile(_update),
+    "compile.deep_where": _compile(_deep_where),
+    "to_query.cached": _cached(_select),
+    "bind.select": _bind(_select),
+    "bind.select_keywords": _bind_keywords(_select),
+    "bind.insert": _bind(_insert),
+    "insert.batches": _insert_batches,
+    "partial.create": _partial,
+}
+
+
+def measure(func: Callable[[], Any], repeat: int = 5, min_time: float = 0.2) -> Tuple[float, int]:
+    """Time a function.
+
+    The number of loops is scaled until one repetition takes at least
+    `min_time` seconds, and the fastest of `repeat` repetitions is kept.
+
+    Args:
+        func: function to time.
+        repeat: number of repetitions.
+        min_time: minimal duration of a repetition, in seconds.
+
+    Returns:
+        Seconds per call, and number of loops per repetition.
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / loops, loops
+
+
+def run(cases: Optional[Sequence[str]] = None,
+        sizes: Sequence[int] = DEFAULT_SIZES,
+        repeat: int = 5,
+        min_time: float = 0.2) -> Iterator[Dict[str, Any]]:
+    """Run benchmark cases at every size.
+
+    Args:
+        cases: names of cases to run, or prefixes of them, eg. "bind.". Defaults to all.
+        sizes: sizes to run each case at, eg. number of columns or conditions.
+        repeat: number of repetitions of each measurement.
+        min_time: minimal duration of a repetition, in seconds.
+
+    Yields:
+        One result per case and size.
+    """
+    for name, case in CASES.items():
+        if cases and not any(name.startswith(prefix) for prefix in cases):
+            continue
+        for size in sizes:
+            seconds, loops = measure(case(size), repeat, min_time)
+            yield {"name": name, "size": size, "seconds": seconds, "loops": loops}
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]]) -> List[str]:
+    """Format the speedup of results against a baseline run, one line per matching case."""
+    before = {(res["name"], res["size"]): res["seconds"] for res in baseline}
+    lines = []
+    for res in results:
+        old = before.get((res["name"], res["size"]))
+        if old is not None:
+            new = res["seconds"]
+            lines.append(
+                f"{res['name']:<24} {res['size']:>6} "
+                f"{old * 1e6:>12.2f}us {new * 1e6:>12.2f}us {old / new:>7.2f}x"
+            )
+    return lines
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        prog="python -m prequel.bench", description=__doc__.split("\n", 1)[0]
+    )
+    parser.add_argument("cases", nargs="*", help="case names or prefixes to run, eg. compile.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("-o", "--output", help="file to write the JSON results to")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare against")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(CASES))
+        return
+
+    results = list(run(args.cases, args.sizes, args.repeat, args.min_time))
+    report = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["results"]
+        print("\n".join(compare(results, baseline)), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
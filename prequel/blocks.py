@@ -1,8 +1,9 @@
 """Implement basic helpers that combine blocks."""
 
-from typing import List, Sequence, Union
+from typing import Any, List, Sequence, Union
 
 from . import types
+from .emit import Flat, emit, interleave
 
 
 class CommaSeparated(types.Block):
@@ -18,17 +19,16 @@ class CommaSeparated(types.Block):
         ["hi", ",", pq.Variable("hello")]
     """
 
+    __slots__ = ("objs",)
+    parenthesize = False
+
     def __init__(self, *objs: Sequence[Union[str, types.Block]]):
         self.objs = objs
 
+    def parts(self) -> Sequence[Any]:
+        """Return the objects separated by commas, see `emit.emit`."""
+        return interleave([obj if isinstance(obj, str) else Flat(obj) for obj in self.objs], ",")
+
     def flatten(self) -> List[types.BuildingBlock]:
         """Flatten the Blocks into a set of comma-separated building blocks."""
-        res: List[types.BuildingBlock] = []
-        for obj in self.objs:
-            if isinstance(obj, str):
-                res.append(obj)
-            elif isinstance(obj, types.Value):
-                res.extend(obj.flatten())
-            res.append(",")
-        res.pop()
-        return res
+        return emit(self)
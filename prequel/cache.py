@@ -0,0 +1,230 @@
+"""Process-wide cache of compiled queries."""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, Sequence, Tuple
+
+from . import types
+from .mkquery import _compile, _Template, _with_defaults, mkquery
+from .variable import Variable, _warn_conflict
+
+__all__ = ["CacheInfo", "CachedQuery", "QueryCache", "fingerprint", "query_cache"]
+
+
+class CacheInfo(NamedTuple):
+    """Snapshot of the state of a `QueryCache`."""
+
+    hits: int
+    misses: int
+    maxsize: Optional[int]
+    currsize: int
+
+
+def _default_key(default: Any) -> Hashable:
+    # The kind of default, which decides the signature, but not its value.
+    if default is Ellipsis or default is None or isinstance(default, type):
+        return default
+    return (type(default),)
+
+
+def _fingerprint(blocks: Sequence[types.BuildingBlock]) -> Tuple[Optional[Tuple[Hashable, ...]],
+                                                                  List[Any],
+                                                                  List[Tuple[Any, Any]]]:
+    """Compute the fingerprint of blocks, and the defaults of their variables, see `fingerprint`.
+
+    Defaults are listed in placeholder order, ie. by first use of each name.
+    Variables reusing a name with another type or default are returned too,
+    with the first variable of that name, since compiling, which warns
+    about them, is skipped on a cache hit.
+    """
+    key: List[Hashable] = []
+    variables: Dict[str, Variable] = {}
+    conflicts = []
+    for block in blocks:
+        if isinstance(block, str):
+            key.append(block)
+        elif isinstance(block, Variable):
+            key.append((Variable, block.name, _default_key(block.default), block.cast))
+            first = variables.setdefault(block.name, block)
+            if first is not block and block.query_arg() != first.query_arg():
+                conflicts.append((block, first))
+        else:
+            return None, [], []
+    defaults = [
+        Ellipsis if isinstance(var.default, type) else var.default for var in variables.values()
+    ]
+    return tuple(key), defaults, conflicts
+
+
+def fingerprint(blocks: Sequence[types.BuildingBlock]) -> Optional[Tuple[Hashable, ...]]:
+    """Compute a structural fingerprint for a sequence of building blocks.
+
+    Two sequences with the same fingerprint compile to the same code:
+    the SQL text (tables, columns and operators), and the name, cast and
+    kind of default (none, a type, or a value of some type) of every
+    variable are part of the key. Values of defaults are not, since they
+    are only passed to the code when binding.
+
+    Args:
+        blocks: building blocks, as returned by `flatten()`.
+
+    Returns:
+        A hashable key, or None if a block cannot be fingerprinted.
+    """
+    return _fingerprint(blocks)[0]
+
+
+class QueryCache:
+    """LRU cache mapping block fingerprints to compiled queries.
+
+    Queries differing only in the values of their defaults share
+    the generated code, but each gets its own defaults.
+
+    Attributes:
+        hits: number of lookups served from the cache.
+        misses: number of lookups that compiled a new query.
+
+    Examples:
+        >>> cache = pq.QueryCache(maxsize=2)
+        >>> query = cache.mkquery(["SELECT", pq.Variable("a")])
+        >>> cache.mkquery(["SELECT", pq.Variable("a")]) is query
+        True
+    """
+
+    def __init__(self, maxsize: Optional[int] = 512):
+        self._maxsize = maxsize
+        self._queries: OrderedDict[Hashable, _Template] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self) -> Optional[int]:
+        """Maximum number of cached queries, None for no limit, 0 to disable caching."""
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize: Optional[int]):
+        with self._lock:
+            self._maxsize = maxsize
+            self._trim()
+
+    def _trim(self):
+        if self._maxsize is None:
+            return
+        while len(self._queries) > self._maxsize:
+            self._queries.popitem(last=False)
+
+    def mkquery(self, blocks: Sequence[types.BuildingBlock]) -> Callable:
+        """Build a query from building blocks, reusing a cached query if possible.
+
+        Args:
+            blocks: List of blocks to combine into a query
+        """
+        key, defaults, conflicts = _fingerprint(blocks)
+        if key is None or self._maxsize == 0:
+            return mkquery(blocks)
+
+        with self._lock:
+            template = self._queries.get(key)
+            if template is not None:
+                self._queries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if template is not None:
+            for var, first in conflicts:
+                _warn_conflict(var.name, var.query_arg(), first.query_arg())
+
+        if template is None:
+            template = _compile(blocks)
+            with self._lock:
+                template = self._queries.setdefault(key, template)
+                self._trim()
+        return _with_defaults(template, defaults)
+
+    def invalidate(self, blocks: Sequence[types.BuildingBlock]) -> bool:
+        """Remove the query built from the given blocks from the cache.
+
+        Returns:
+            Whether a cached query was removed.
+        """
+        key = fingerprint(blocks)
+        with self._lock:
+            return self._queries.pop(key, None) is not None
+
+    def clear(self):
+        """Remove all cached queries and reset the counters."""
+        with self._lock:
+            self._queries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> CacheInfo:
+        """Return the current hit/miss counters and size of the cache."""
+        return CacheInfo(self.hits, self.misses, self._maxsize, len(self._queries))
+
+    def __len__(self):
+        return len(self._queries)
+
+
+query_cache = QueryCache()
+
+
+class CachedQuery:
+    """Mixin memoizing `to_query()` of a query builder.
+
+    The compiled query is kept until an attribute of the builder is set,
+    as every method modifying it does, so calling `to_query()` again
+    neither walks the tree nor looks up `query_cache`. Attributes are
+    therefore replaced rather than modified in place.
+
+    The attributes of builders, eg. `Select.values` or `Insert.columns`,
+    are read-only: a list edited in place, eg. with `append()`, is not
+    seen by a query already compiled. Use the methods of the builder,
+    or assign the attribute a new value, instead.
+
+    Other renderings of the builder, eg. the SQL of `Insert.batches()`,
+    are memoized with `_memoized()` and cleared along with the query.
+    """
+
+    _compiled: Optional[Callable] = None
+    _derived: Optional[Dict[Hashable, Any]] = None
+    _max_derived = 16
+
+    def __setattr__(self, name: str, value: Any):
+        if self._compiled is not None:
+            object.__setattr__(self, "_compiled", None)
+        if self._derived is not None:
+            object.__setattr__(self, "_derived", None)
+        object.__setattr__(self, name, value)
+
+    def _memoized(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """Return the result of a function, computed once until the builder changes.
+
+        Args:
+            key: key of the result, unique among the uses by the builder.
+            func: function computing the result from the builder.
+        """
+        derived = self._derived
+        if derived is None:
+            derived = {}
+            object.__setattr__(self, "_derived", derived)
+        if key in derived:
+            return derived[key]
+        result = func()
+        if len(derived) >= self._max_derived:
+            derived.clear()
+        derived[key] = result
+        return result
+
+    def to_query(self) -> Callable:
+        """Compile into a query function."""
+        query = self._compiled
+        if query is None:
+            query = query_cache.mkquery(self.flatten())  # type: ignore
+            object.__setattr__(self, "_compiled", query)
+        return query
@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
-from typing import Any, List, Optional, Union
+import weakref
+from collections import deque
+from types import MappingProxyType
+from typing import Any, Deque, Mapping, Optional, Sequence, Union
 
 from . import types
 from .utils import quote_ident, clean_ident
@@ -11,30 +14,128 @@ from .variable import Variable
 
 __all__ = ["Table", "Column"]
 
+# Recently created tables and columns are kept alive, so that queries built
+# over and over reuse them even when nothing else holds on to them.
+_recent: Deque[Any] = deque(maxlen=4096)
+
+
+def _init(obj: Any, **attributes: Any):
+    """Set the attributes of an immutable object, on creation."""
+    for name, value in attributes.items():
+        object.__setattr__(obj, name, value)
+
+
+def _immutable(obj: Any, name: str):
+    raise AttributeError(f"{type(obj).__name__} is interned and immutable, cannot set {name}.")
+
 
 class Table:
     """SQL table.
 
+    Tables are interned: creating a table with the same name (and schema)
+    again returns the same, immutable, object, with its SQL rendered once.
+
+    A table can declare the PostgreSQL types of its columns. Variables
+    compared to, or inserted into, those columns are then cast explicitly,
+    eg. `$1::int8`, so the server does not have to infer their types.
+
+    An aliased table is referred to by its alias, eg. in the names of
+    its columns, and declared as `"table" AS "alias"` in queries.
+
     Attributes:
         table: name of table
+        schema: (optional) mapping of column names to PostgreSQL types
+        alias: (optional) name to refer to the table by
+
+    Examples:
+        >>> users = pq.Table("user", {"id": "int8", "name": "text"})
+        >>> pq.Select("name").from_(users).where(id=int).to_query()(1)
+        ('SELECT "name" FROM "user" WHERE "id" = $1::int8', 1)
     """
 
-    def __init__(self, table: str):
+    __slots__ = ("table", "schema", "alias", "_sql", "_declaration", "__weakref__")
+    _interned: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+
+    def __new__(cls,
+                table: str,
+                schema: Optional[Mapping[str, str]] = None,
+                *,
+                alias: Optional[str] = None):
+        key = (cls, table, frozenset(schema.items()) if schema is not None else None, alias)
+        self = cls._interned.get(key)
+        if self is not None:
+            return self
+
         if not isinstance(table, str):
             raise TypeError(f"Cannot create table with name of type {type(table)}")
-        self.table = table
+        sql = quote_ident(alias if alias is not None else table)
+        declaration = quote_ident(table)
+        if alias is not None:
+            declaration += " AS " + sql
+        self = super().__new__(cls)
+        _init(
+            self,
+            table=table,
+            schema=MappingProxyType(dict(schema)) if schema is not None else None,
+            alias=alias,
+            _sql=sql,
+            _declaration=declaration,
+        )
+        _recent.append(self)
+        return cls._interned.setdefault(key, self)
+
+    def __setattr__(self, name: str, value: Any):
+        _immutable(self, name)
+
+    def __delattr__(self, name: str):
+        _immutable(self, name)
+
+    def __getstate__(self):
+        # Everything is restored by __new__, from __getnewargs_ex__.
+        return None
+
+    def __getnewargs_ex__(self):
+        schema = dict(self.schema) if self.schema is not None else None
+        return (self.table, schema), {"alias": self.alias}
 
     def __str__(self):
-        return quote_ident(self.table)
+        return self._sql
+
+    def declaration(self) -> str:
+        """Return the SQL declaring the table in a query, eg. `"user" AS "u"`."""
+        return self._declaration
+
+    def as_(self, alias: str) -> Table:
+        """Return the table under an alias, eg. to join a table with itself.
+
+        Args:
+            alias: name to refer to the table by.
+        """
+        return type(self)(self.table, self.schema, alias=alias)
+
+    @property
+    def name(self) -> str:
+        """Name the table is referred to by, ie. its alias if it has one."""
+        return self.alias if self.alias is not None else self.table
 
     def col(self, column: str) -> Column:
-        """Returns a column from the given table.
+        """Returns the column of the given name from the table.
 
         Args:
-            column: name of the column
+            column: name of the column, which must be in the schema if there is one.
         """
+        if self.schema is not None and column not in self.schema:
+            raise ValueError(f"Table {repr(self.table)} has no column {repr(column)}.")
         return Column(table=self, column=column)
 
+    def pgtype(self, column: str) -> Optional[str]:
+        """Return the PostgreSQL type of a column, if declared in the schema.
+
+        Args:
+            column: name of the column
+        """
+        return self.schema.get(column) if self.schema is not None else None
+
     @classmethod
     def as_table(cls, table: Union[Table, str]) -> Table:
         """Convert value to a table if it isn't already one.
@@ -52,38 +153,89 @@ class Table:
 class Column(ValueMixin, types.Value):
     """SQL column.
 
+    Columns are interned, and immutable, like tables, see `Table`.
+
     Attributes:
         column: name of column
         table: (optional) table which column belongs to
+        pgtype: (optional) PostgreSQL type of the column, used to cast
+            variables compared to it. Defaults to the type in the schema of the table.
     """
 
-    def __init__(self, column: str, *, table: Optional[Table] = None):
-        self.table = Table.as_table(table) if table else None
-        self.column = column
+    __slots__ = ("table", "column", "pgtype", "_parts", "_arg", "__weakref__")
+    _interned: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+
+    def __new__(cls,
+                column: str,
+                *,
+                table: Optional[Union[Table, str]] = None,
+                pgtype: Optional[str] = None):
+        table = Table.as_table(table) if table else None
+        if pgtype is None and table is not None:
+            pgtype = table.pgtype(column)
+        key = (cls, column, table, pgtype)
+        self = cls._interned.get(key)
+        if self is not None:
+            return self
+
+        prefix = (str(table) + ".") if table else ""
+        name = clean_ident(column)
+        self = super().__new__(cls)
+        _init(
+            self,
+            table=table,
+            column=column,
+            pgtype=pgtype,
+            _parts=(prefix + quote_ident(column),),
+            _arg=(clean_ident(table.name) + "_" + name) if table else name,
+        )
+        _recent.append(self)
+        return cls._interned.setdefault(key, self)
+
+    def __setattr__(self, name: str, value: Any):
+        _immutable(self, name)
+
+    def __delattr__(self, name: str):
+        _immutable(self, name)
+
+    def __getstate__(self):
+        # Everything is restored by __new__, from __getnewargs_ex__.
+        return None
+
+    def __getnewargs_ex__(self):
+        return (self.column,), {"table": self.table, "pgtype": self.pgtype}
+
+    @classmethod
+    def as_column(cls, column: Union[Column, str], table: Optional[Table] = None) -> Column:
+        """Convert value to a column if it isn't already one.
 
-    def flatten(self) -> List[types.BuildingBlock]:
-        """Flatten column to SQL representation."""
-        return [str(self)]
+        Names are not qualified by the table, but get their type from its schema.
+
+        Args:
+            column: value to convert
+            table: (optional) table the column belongs to
+        """
+        if isinstance(column, Column):
+            return column
+        if isinstance(column, str):
+            return cls(column, pgtype=table.pgtype(column) if table is not None else None)
+        raise TypeError(f"Cannot convert {repr(column)} to Column.")
 
-    def as_value(self) -> List[types.BuildingBlock]:
-        """Flatten column to SQL representation for use as a value."""
-        return self.flatten()
+    def parts(self) -> Sequence[Any]:
+        """Return the SQL representation of the column."""
+        return self._parts
 
     def as_arg(self) -> str:
         """Return a Python identifier to refer to the column by name."""
-        name = clean_ident(self.column)
-        if self.table:
-            name = clean_ident(self.table.table) + "_" + name
-        return name
+        return self._arg
 
     def __repr__(self):
         return f"{self.__class__.__name__}("\
-            f"table={repr(self.table.table) if self.table else None}, "\
+            f"table={repr(self.table.name) if self.table else None}, "\
             f"column={repr(self.column)})"
 
     def __str__(self):
-        prefix = (str(self.table) + ".") if self.table else ""
-        return prefix + quote_ident(self.column)
+        return self._parts[0]
 
     def _convert_arg(self, other: Any, opname: str) -> Variable:
         if isinstance(other, types.Value):
@@ -92,4 +244,7 @@ class Column(ValueMixin, types.Value):
             name = self.as_arg()
             if opname != "eq":
                 name += "_" + opname
-            return Variable(name, other)
+            cast = self.pgtype
+            if cast is not None and opname in ("in", "not_in"):
+                cast += "[]"
+            return Variable(name, other, cast=cast)
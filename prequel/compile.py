@@ -0,0 +1,157 @@
+"""Compile the queries of a module ahead of time, into a plain Python module.
+
+Run with `python -m prequel.compile myapp.queries -o myapp/_queries_compiled.py`.
+Every public compiled query (eg. the result of `to_query()`) or builder
+(eg. a `Select`) of the module is written out as its SQL and a binder
+function, so importing the generated module does not build, compile or
+inspect anything, nor import prequel at all.
+
+Binders have plain Python signatures, with the same parameters as the
+compiled queries, so Python itself checks their arguments: errors are the
+usual `TypeError`s of function calls, rather than those of compiled queries.
+"""
+
+import argparse
+import ast
+import importlib
+import sys
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from . import types
+from .mkquery import _binder_source, _prefix
+
+__all__ = ["find_queries", "generate", "main"]
+
+HEADER = '''"""Queries of `{module}`, compiled ahead of time.
+
+Generated by `python -m prequel.compile {module}`, do not edit.
+"""
+# pylint: skip-file
+
+from __future__ import annotations
+
+{imports}from typing import Any, Dict, Tuple
+
+__all__ = {names}
+'''
+
+
+def _is_query(obj: Any) -> bool:
+    return callable(obj) and isinstance(getattr(obj, "query_args", None), types.QueryArgs)
+
+
+def find_queries(module: Any) -> Dict[str, Callable]:
+    """Find the public queries of a module, in definition order.
+
+    Builders, ie. objects with a `to_query()` method, are compiled.
+
+    Args:
+        module: module to search.
+
+    Returns:
+        Compiled queries by name.
+    """
+    queries = {}
+    for name, obj in vars(module).items():
+        if name.startswith("_") or isinstance(obj, type):
+            continue
+        if _is_query(obj):
+            queries[name] = obj
+        elif callable(getattr(obj, "to_query", None)):
+            queries[name] = obj.to_query()
+    return queries
+
+
+def _literal(value: Any) -> str:
+    source = repr(value)
+    try:
+        same = ast.literal_eval(source) == value
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        same = False
+    if not same:
+        raise ValueError(f"Cannot write value {source} as a Python literal.")
+    return source
+
+
+def _annotation_module(type_: Any) -> Optional[str]:
+    """Return the module to import for an annotation, if any."""
+    module = getattr(type_, "__module__", None)
+    if type_ is Any or module in (None, "builtins"):
+        return None
+    return module
+
+
+def _annotation(type_: Any) -> str:
+    if type_ is Any:
+        return "Any"
+    module = _annotation_module(type_)
+    name = getattr(type_, "__qualname__", None) or repr(type_)
+    return name if module is None else f"{module}.{name}"
+
+
+def generate(queries: Dict[str, Callable], module: str = "queries") -> str:
+    """Generate the source of a module of compiled queries.
+
+    Args:
+        queries: compiled queries by name, see `find_queries`.
+        module: name of the module the queries come from, for the docstring.
+
+    Returns:
+        The source of the module.
+    """
+    prefix = _prefix([*queries, *(arg for query in queries.values() for arg in query.query_args)])
+    modules = sorted({
+        name
+        for query in queries.values()
+        for type_, _ in query.query_args.values()
+        for name in [_annotation_module(type_)]
+        if name is not None
+    })
+    imports = "".join(f"import {name}\n" for name in modules)
+    parts = [HEADER.format(module=module, names=repr(list(queries)), imports=imports)]
+    for name, query in queries.items():
+        annotations = [_annotation(type_) for type_, _ in query.query_args.values()]
+        returns = f"Tuple[str, {', '.join(annotations)}]" if annotations else "Tuple[str]"
+        source, constants = _binder_source(
+            query.sql, query.query_args, prefix, f"{prefix}{name}_",
+            name=name, annotations=annotations, returns=returns, instrument=False,
+            fixed=getattr(query, "fixed", None), checks=False,
+        )
+        lines: List[str] = [f"{prefix}{name}_query = {repr(query.sql)}"]
+        for constant, value in constants.items():
+            if constant != f"{prefix}{name}_query":
+                lines.append(f"{constant} = {_literal(value)}")
+        lines.extend([
+            source,
+            f"{name}.sql = {prefix}{name}_query",
+            f"{name}.pgtypes = {repr(query.pgtypes)}",
+        ])
+        parts.append("\n".join(lines))
+    return "\n\n\n".join(part.strip("\n") for part in parts) + "\n"
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        prog="python -m prequel.compile", description=__doc__.split("\n", 1)[0]
+    )
+    parser.add_argument("module", help="module defining the queries, eg. myapp.queries")
+    parser.add_argument("-o", "--output", help="file to write the module to, instead of stdout")
+    args = parser.parse_args(argv)
+
+    if "" not in sys.path:
+        sys.path.insert(0, "")
+    queries = find_queries(importlib.import_module(args.module))
+    if not queries:
+        parser.error(f"No queries found in {args.module}.")
+
+    source = generate(queries, args.module)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(source)
+    else:
+        sys.stdout.write(source)
+
+
+if __name__ == "__main__":
+    main()
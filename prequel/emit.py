@@ -0,0 +1,129 @@
+"""Iterative emission of block trees into building blocks and SQL text."""
+
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+from . import types
+
+__all__ = ["Flat", "emit", "join"]
+
+
+class Flat:  # pylint: disable=too-few-public-methods
+    """Mark a child node to be emitted with `flatten()` rather than `as_value()`.
+
+    Attributes:
+        node: node to flatten.
+    """
+
+    __slots__ = ("node",)
+
+    def __init__(self, node: Any):
+        self.node = node
+
+
+_TOKEN, _NODE, _FLAT, _LEGACY = range(1, 5)
+_KINDS: Dict[type, int] = {}
+_CLOSE = (")",)
+
+
+def _kind(cls: type) -> int:
+    kind = _KINDS.get(cls)
+    if kind is None:
+        if cls is Flat:
+            kind = _FLAT
+        elif hasattr(cls, "parts"):
+            kind = _NODE
+        elif issubclass(cls, str) or hasattr(cls, "compile"):
+            kind = _TOKEN
+        else:
+            kind = _LEGACY
+        _KINDS[cls] = kind
+    return kind
+
+
+def _expand(node: Any, value: bool) -> Iterator[Any]:
+    kind = _kind(type(node))
+    if kind == _TOKEN:
+        return iter((node,))
+    if kind == _LEGACY:
+        return iter(node.as_value() if value else node.flatten())
+    if value and node.parenthesize:
+        return chain(("(",), node.parts(), _CLOSE)
+    return iter(node.parts())
+
+
+def emit(node: Any, value: bool = False) -> List[types.BuildingBlock]:
+    """Emit the building blocks of a node.
+
+    Walks the tree of nodes with an explicit stack, so the depth of the
+    tree is not limited by recursion, and appends every building block
+    to a single list.
+
+    Nodes implement `parts()`, which returns their strings, building blocks
+    and child nodes without expanding the children, and `parenthesize`,
+    which tells whether to wrap the node in brackets when used as a value.
+    Child nodes are emitted as values unless wrapped with `Flat`.
+    Values without `parts()` are expanded with `flatten()` or `as_value()`.
+
+    Args:
+        node: node to emit.
+        value: emit the node as a value, rather than flattened.
+    """
+    out: List[types.BuildingBlock] = []
+    append = out.append
+    kinds = _KINDS
+    stack = [_expand(node, value)]
+    while stack:
+        for item in stack[-1]:
+            kind = kinds.get(type(item)) or _kind(type(item))
+            if kind == _TOKEN:
+                append(item)
+            elif kind == _NODE:
+                parts = item.parts()
+                if item.parenthesize:
+                    append("(")
+                    stack.append(iter(_CLOSE))
+                stack.append(iter(parts))
+                break
+            elif kind == _FLAT:
+                stack.append(_expand(item.node, False))
+                break
+            else:
+                stack.append(iter(item.as_value()))
+                break
+        else:
+            stack.pop()
+    return out
+
+
+def join(parts: Iterable[str]) -> str:
+    """Join SQL fragments into a query.
+
+    Fragments are separated by spaces, except after an opening bracket
+    and before a closing bracket or a comma. Empty fragments are skipped.
+
+    Args:
+        parts: SQL fragments, eg. strings and compiled variables.
+    """
+    out: List[str] = []
+    append = out.append
+    previous = "("
+    for part in parts:
+        if not part:
+            continue
+        if previous != "(" and part != ")" and part != ",":
+            append(" ")
+        append(part)
+        previous = part
+    return "".join(out)
+
+
+def interleave(values: Sequence[Any], separator: str) -> List[Any]:
+    """Return values with a separator between each of them."""
+    res: List[Any] = []
+    for value in values:
+        res.append(value)
+        res.append(separator)
+    if res:
+        res.pop()
+    return res
@@ -0,0 +1,227 @@
+"""Run compiled queries on a connection pool with prepared statements."""
+
+from __future__ import annotations
+
+import inspect
+import weakref
+from collections import OrderedDict
+from typing import Any, AsyncContextManager, Callable, Optional, Protocol, Sequence, Tuple
+
+from .cache import CacheInfo
+
+__all__ = ["PreparedStatement", "PreparingConnection", "Pool", "Executor"]
+
+INVALID_STATEMENT_NAME = "26000"
+
+Query = Callable[..., Sequence[Any]]
+
+
+class PreparedStatement(Protocol):
+    """Prepared statement, eg. `asyncpg.prepared_stmt.PreparedStatement`."""
+
+    async def fetch(self, *args: Any) -> Sequence[Any]:
+        """Execute the statement and return all rows."""
+        ...
+
+    async def fetchrow(self, *args: Any) -> Optional[Any]:
+        """Execute the statement and return the first row."""
+        ...
+
+    def get_statusmsg(self) -> str:
+        """Return the status of the last execution, eg. "UPDATE 3"."""
+        ...
+
+
+class PreparingConnection(Protocol):  # pylint: disable=too-few-public-methods
+    """Connection that can prepare statements, eg. `asyncpg.Connection`."""
+
+    async def prepare(self, query: str) -> PreparedStatement:
+        """Prepare a statement for a query."""
+        ...
+
+
+class Pool(Protocol):  # pylint: disable=too-few-public-methods
+    """Connection pool, eg. `asyncpg.Pool`."""
+
+    def acquire(self) -> AsyncContextManager[PreparingConnection]:
+        """Acquire a connection for the duration of a context."""
+        ...
+
+
+async def _close(statement: PreparedStatement):
+    """Close a statement evicted from the cache, if the driver supports it.
+
+    Args:
+        statement: prepared statement.
+    """
+    close = getattr(statement, "close", None)
+    if close is None:
+        return
+    result = close()
+    if inspect.isawaitable(result):
+        await result
+
+
+def _is_invalid_statement(ex: Exception) -> bool:
+    """Check whether an error means a prepared statement no longer exists on the server.
+
+    Args:
+        ex: error raised by the driver.
+    """
+    if getattr(ex, "sqlstate", None) == INVALID_STATEMENT_NAME:
+        return True
+    message = str(ex)
+    return "prepared statement" in message and "does not exist" in message
+
+
+class Executor:
+    """Run compiled queries on connections from a pool, preparing each query once per connection.
+
+    Every connection keeps an LRU of its prepared statements, keyed by SQL.
+    Statements evicted from it are closed, if they have a `close()` method.
+    If a statement has disappeared from the server, eg. after `DISCARD ALL`
+    or through a statement-level pooler, it is prepared again and the call retried.
+
+    Attributes:
+        pool: pool to acquire connections from.
+        cache_size: maximum number of prepared statements per connection.
+        connection_key: function returning the object to keep the statements of
+            a connection on. Defaults to the connection itself, which only works
+            for pools handing out the same object for a connection every time.
+            Pools wrapping connections in a new object for every acquire, such
+            as asyncpg's, need a function returning the wrapped connection.
+        hits: number of calls that reused a prepared statement.
+        misses: number of statements prepared.
+
+    Examples:
+        asyncpg pools hand out a new proxy for every acquire, and have no
+        public way to reach the connection behind it:
+
+        >>> pool = await asyncpg.create_pool(dsn)
+        >>> executor = pq.Executor(pool, cache_size=256, connection_key=lambda conn: conn._con)
+        >>> query = pq.Select("name").from_("user").where(id=int).to_query()
+        >>> row = await executor.fetchrow(query, 101)
+    """
+
+    def __init__(self,
+                 pool: Pool,
+                 cache_size: int = 100,
+                 connection_key: Optional[Callable[[Any], Any]] = None):
+        if cache_size < 1:
+            raise ValueError(f"Cache size must be positive, got {cache_size}.")
+        self.pool = pool
+        self.cache_size = cache_size
+        self.connection_key = connection_key
+        self.hits = 0
+        self.misses = 0
+        self._statements: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def _cache(self, conn: Any) -> OrderedDict:
+        key = conn if self.connection_key is None else self.connection_key(conn)
+        try:
+            cache = self._statements.get(key)
+            if cache is None:
+                cache = self._statements[key] = OrderedDict()
+        except TypeError:
+            raise TypeError(
+                f"Cannot cache statements on {type(key).__name__} objects, which cannot be"
+                " weakly referenced, pass a connection_key returning the connection."
+            ) from None
+        return cache
+
+    async def prepare(self, conn: PreparingConnection, sql: str) -> PreparedStatement:
+        """Return the prepared statement for a query on a connection, preparing it if needed.
+
+        Args:
+            conn: connection acquired from the pool.
+            sql: SQL of the query.
+        """
+        cache = self._cache(conn)
+        statement = cache.get(sql)
+        if statement is not None:
+            cache.move_to_end(sql)
+            self.hits += 1
+            return statement
+
+        statement = await conn.prepare(sql)
+        self.misses += 1
+        cache[sql] = statement
+        while len(cache) > self.cache_size:
+            _, evicted = cache.popitem(last=False)
+            await _close(evicted)
+        return statement
+
+    async def run(self,
+                  conn: PreparingConnection,
+                  method: Callable[[PreparedStatement, Tuple[Any, ...]], Any],
+                  bound: Sequence[Any]) -> Any:
+        """Run a bound query on a connection with a prepared statement.
+
+        Args:
+            conn: connection acquired from the pool.
+            method: coroutine function taking the statement and the arguments.
+            bound: query and arguments, as returned by a compiled query.
+        """
+        sql, args = bound[0], tuple(bound[1:])
+        statement = await self.prepare(conn, sql)
+        try:
+            return await method(statement, args)
+        except Exception as ex:
+            if not _is_invalid_statement(ex):
+                raise
+        self._cache(conn).pop(sql, None)
+        statement = await self.prepare(conn, sql)
+        return await method(statement, args)
+
+    async def _acquire_and_run(self, method, query, args, kwargs) -> Any:
+        bound = query(*args, **kwargs)
+        async with self.pool.acquire() as conn:
+            return await self.run(conn, method, bound)
+
+    async def fetch(self, query: Query, *args: Any, **kwargs: Any) -> Sequence[Any]:
+        """Run a compiled query and return all rows.
+
+        Args:
+            query: compiled query, eg. from `Select.to_query()`.
+            args: arguments of the query.
+            kwargs: arguments of the query.
+        """
+        return await self._acquire_and_run(_fetch, query, args, kwargs)
+
+    async def fetchrow(self, query: Query, *args: Any, **kwargs: Any) -> Optional[Any]:
+        """Run a compiled query and return the first row, or None.
+
+        Args:
+            query: compiled query, eg. from `Select.to_query()`.
+            args: arguments of the query.
+            kwargs: arguments of the query.
+        """
+        return await self._acquire_and_run(_fetchrow, query, args, kwargs)
+
+    async def execute(self, query: Query, *args: Any, **kwargs: Any) -> str:
+        """Run a compiled query and return its status, eg. "UPDATE 3".
+
+        Args:
+            query: compiled query, eg. from `Update.to_query()`.
+            args: arguments of the query.
+            kwargs: arguments of the query.
+        """
+        return await self._acquire_and_run(_execute, query, args, kwargs)
+
+    def info(self) -> CacheInfo:
+        """Return statistics of the statement caches of all live connections."""
+        currsize = sum(len(cache) for cache in self._statements.values())
+        return CacheInfo(self.hits, self.misses, self.cache_size, currsize)
+
+
+async def _fetch(statement: PreparedStatement, args: Tuple[Any, ...]) -> Sequence[Any]:
+    return await statement.fetch(*args)
+
+
+async def _fetchrow(statement: PreparedStatement, args: Tuple[Any, ...]) -> Optional[Any]:
+    return await statement.fetchrow(*args)
+
+
+async def _execute(statement: PreparedStatement, args: Tuple[Any, ...]) -> str:
+    await statement.fetch(*args)
+    return statement.get_statusmsg()
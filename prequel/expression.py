@@ -3,11 +3,12 @@
 from __future__ import annotations
 
 import enum
-from typing import Any, List, cast
+from typing import Any, List, Sequence, cast
 
 from . import types
+from .emit import emit, interleave
 
-__all__ = ["Operator", "ValueMixin", "Expression", "Between"]
+__all__ = ["Operator", "ValueMixin", "Expression", "Chain", "Between", "In", "Row"]
 
 
 class Operator(enum.Enum):
@@ -36,8 +37,22 @@ class ValueMixin(types.Value):
 
     If the class implements `Value._convert_arg`,
     use it to convert arbitrary arguments to `pq.Value`
+
+    Classes that implement `parts()` get `flatten()` and `as_value()`
+    from the emitter, see `emit.emit`.
     """
 
+    __slots__ = ()
+    parenthesize = False
+
+    def flatten(self) -> List[types.BuildingBlock]:
+        """Flatten the value into a list of building blocks."""
+        return emit(self)
+
+    def as_value(self) -> List[types.BuildingBlock]:
+        """Flatten the value into a list of building blocks, for use as an operand."""
+        return emit(self, True)
+
     def __ne__(self, other: Any):
         other = self._convert_arg(other, "ne")
         return Expression(self, Operator.ne, other)
@@ -73,9 +88,19 @@ class ValueMixin(types.Value):
         cmax = self._convert_arg(cmax, "max")
         return Between(self, cmin, cmax)
 
+    def in_(self, other: Any = list):
+        """Helper function to generate membership constraints against an array."""
+        other = self._convert_arg(other, "in")
+        return In(self, other)
+
+    def not_in(self, other: Any = list):
+        """Helper function to generate negated membership constraints against an array."""
+        other = self._convert_arg(other, "not_in")
+        return In(self, other, negate=True)
+
     def __add__(self, other: types.Value):
         if self.boolean or other.boolean:
-            return Expression(self, Operator.and_, other)
+            return Chain(Operator.and_, [self, other])
         return Expression(self, Operator.add, other)
 
     def __sub__(self, other: types.Value):
@@ -86,7 +111,7 @@ class ValueMixin(types.Value):
 
     def __truediv__(self, other: types.Value):
         if self.boolean or other.boolean:
-            return Expression(self, Operator.or_, other)
+            return Chain(Operator.or_, [self, other])
         return Expression(self, Operator.truediv, other)
 
     def _convert_arg(self, other: Any, opname: str) -> types.Value:
@@ -108,16 +133,16 @@ class Expression(ValueMixin):
         ["name", "=", pq.Variable("name_var")]
     """
 
+    __slots__ = ("lhs", "rhs", "op")
+    parenthesize = True
+
     def __init__(self, lhs: types.Value, op: Operator, rhs: types.Value):
         self.lhs = lhs
         self.rhs = rhs
         self.op = op
 
-    def flatten(self) -> List[types.BuildingBlock]:
-        return [*self.lhs.as_value(), self.op.value, *self.rhs.as_value()]
-
-    def as_value(self) -> List[types.BuildingBlock]:
-        return ["(", *self.flatten(), ")"]
+    def parts(self) -> Sequence[Any]:
+        return (self.lhs, self.op.value, self.rhs)
 
     @property
     def boolean(self):
@@ -136,6 +161,45 @@ class Expression(ValueMixin):
         return f'pq.Expression(lhs={repr(self.lhs)}, op={repr(self.op)}, rhs={repr(self.rhs)})'
 
 
+class Chain(ValueMixin):
+    """Flat SQL expression joining any number of values with one operator.
+
+    Nested chains of the same associative operator are merged into one,
+    so long conjunctions are stored, and flattened, without recursion.
+
+    Attributes:
+        op: operator.
+        values: values joined by the operator.
+
+    Examples:
+        >>> pq.Chain(pq.Operator.and_, [pq.Variable("a"), pq.Variable("b")]).flatten()
+        [pq.Variable("a"), "AND", pq.Variable("b")]
+    """
+
+    __slots__ = ("op", "values")
+    ASSOCIATIVE = frozenset({Operator.and_, Operator.or_, Operator.add, Operator.mul})
+    parenthesize = True
+
+    def __init__(self, op: Operator, values: Sequence[types.Value]):
+        self.op = op
+        self.values: List[types.Value] = []
+        for value in values:
+            if isinstance(value, Chain) and value.op is op and op in self.ASSOCIATIVE:
+                self.values.extend(value.values)
+            else:
+                self.values.append(value)
+
+    def parts(self) -> Sequence[Any]:
+        return interleave(self.values, self.op.value)
+
+    @property
+    def boolean(self):
+        return self.op in {Operator.and_, Operator.or_}
+
+    def __repr__(self):
+        return f"pq.Chain(op={repr(self.op)}, values={repr(self.values)})"
+
+
 class Between(ValueMixin):
     """Between SQL comparison.
 
@@ -144,12 +208,72 @@ class Between(ValueMixin):
         min: Minimum of range.
         max: Maximum of range.
     """
+    __slots__ = ("val", "min", "max")
     boolean = True
+    parenthesize = True
 
     def __init__(self, val: types.Value, cmin: types.Value, cmax: types.Value):
         self.val = val
         self.min = cmin
         self.max = cmax
 
-    def flatten(self) -> List[types.BuildingBlock]:
-        return [*self.val.as_value(), "BETWEEN", *self.min.as_value(), "AND", *self.max.as_value()]
+    def parts(self) -> Sequence[Any]:
+        return (self.val, "BETWEEN", self.min, "AND", self.max)
+
+
+class In(ValueMixin):
+    """Array membership SQL comparison.
+
+    Compares against a single array value, eg. a variable holding a list,
+    so the query is the same regardless of how many elements it holds.
+
+    Attributes:
+        val: Value being compared.
+        array: Array of values to compare against.
+        negate: Whether to check that the value is not in the array.
+
+    Examples:
+        >>> pq.Column("id").in_([1, 2]).flatten()
+        ['"id"', '=', 'ANY', '(', pq.Variable('id_in', [1, 2]), ')']
+        >>> pq.Column("id").not_in(list).flatten()
+        ['"id"', '<>', 'ALL', '(', pq.Variable('id_not_in', list), ')']
+    """
+    __slots__ = ("val", "array", "negate")
+    boolean = True
+    parenthesize = True
+
+    def __init__(self, val: types.Value, array: types.Value, negate: bool = False):
+        self.val = val
+        self.array = array
+        self.negate = negate
+
+    def parts(self) -> Sequence[Any]:
+        if self.negate:
+            return (self.val, Operator.ne.value, "ALL", "(", self.array, ")")
+        return (self.val, Operator.eq.value, "ANY", "(", self.array, ")")
+
+
+class Row(ValueMixin):
+    """SQL row constructor.
+
+    Compares element by element, eg. `(a, b) > (x, y)` holds
+    if `a > x`, or if `a = x` and `b > y`.
+
+    Attributes:
+        values: values of the row.
+
+    Examples:
+        >>> pq.Row([pq.Column("a"), pq.Column("b")]).flatten()
+        ['(', '"a"', ',', '"b"', ')']
+    """
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: Sequence[types.Value]):
+        self.values = list(values)
+
+    def parts(self) -> Sequence[Any]:
+        return ("(", *interleave(self.values, ","), ")")
+
+    def __repr__(self):
+        return f"pq.Row(values={repr(self.values)})"
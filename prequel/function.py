@@ -1,9 +1,10 @@
 """Data and logic for SQL function calls."""
 
 import enum
-from typing import List
+from typing import Any, List, Sequence
 
-from . import blocks, types
+from . import types
+from .emit import Flat, interleave
 from .expression import ValueMixin
 
 
@@ -26,16 +27,17 @@ class FunctionCall(ValueMixin):
         boolean: If the function returns a boolean type.
     """
 
+    __slots__ = ("values", "func", "_boolean")
+    parenthesize = True
+
     def __init__(self, func: Function, vals: List[types.Value]):
         self.values = vals
         self.func = func
         self._boolean = False  # TODO: investigate if functions can return booleans
 
-    def flatten(self) -> List[types.BuildingBlock]:
-        return [self.func.value, "(", *blocks.CommaSeparated(self.values).flatten(), ")"]
-
-    def as_value(self) -> List[types.BuildingBlock]:
-        return ["(", *self.flatten(), ")"]
+    def parts(self) -> Sequence[Any]:
+        args = interleave([Flat(value) for value in self.values], ",")
+        return (self.func.value, "(", *args, ")")
 
     @property
     def boolean(self):
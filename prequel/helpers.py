@@ -3,12 +3,15 @@
 from typing import Sequence
 
 from . import types
-from .expression import Expression, Operator
+from .expression import Chain, Operator
 
 
 def group(values: Sequence[types.Value], op: Operator) -> types.Value:
     """Group a sequence of values with an operator.
 
+    Values are combined into a single flat `Chain`,
+    rather than a nested tree of binary expressions.
+
     Args:
         values: sequence of values to combine
         op: operator to combine with
@@ -23,8 +26,4 @@ def group(values: Sequence[types.Value], op: Operator) -> types.Value:
     if len(values) < 2:
         return values[0]
 
-    expr = Expression(values[0], op, values[1])
-    for con in values[2:]:
-        expr = Expression(expr, op, con)
-
-    return expr
+    return Chain(op, values)
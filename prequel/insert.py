@@ -1,31 +1,56 @@
 """SQL insert module."""
-from typing import Optional, Sequence, Union, Callable
+import functools
+import itertools
+from typing import (
+    Any, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+)
 
 from . import types
 from .blocks import CommaSeparated
+from .cache import CachedQuery
 from .column import Column, Table
-from .mkquery import mkquery
+from .mkquery import render
+from .pgcopy import CopyWriter, Encoder, encode_columns
+from .returning import Returning
 from .select import Select
+from .utils import quote_ident, transpose
 from .variable import Variable
 
+__all__ = ["EXCLUDED", "Insert", "MAX_PARAMS"]
 
-class Insert:
+
+MAX_PARAMS = 32767
+"""Maximum number of parameters PostgreSQL drivers accept in one query."""
+
+EXCLUDED = Table("excluded")
+"""The row proposed for insertion, in `Insert.on_conflict().do_update()`."""
+
+
+class Insert(Returning, CachedQuery):
     """SQL insert query.
 
+    Variables for columns with a PostgreSQL type, eg. from the schema
+    of the table, are cast to it, and the type is used by default
+    for unnest() and COPY.
+
     Attributes:
         table: Table to insert into
         columns: Columns of data
         values: List of data
+
+    Examples:
+        >>> pq.Insert("user", ["id", "name"]).on_conflict("id").do_update("name").to_query().sql
+        'INSERT INTO "user" ("id", "name") VALUES ($1, $2) ON CONFLICT ("id")
+         DO UPDATE SET "name" = "excluded"."name"'
     """
     def __init__(self, table: Union[str, Table], columns: Sequence[Union[str, Column]]):
         self.table = Table.as_table(table)
-        self.columns = []
-        for column in columns:
-            if isinstance(column, Column):
-                self.columns.append(column)
-            else:
-                self.columns.append(Column(column))
+        self.columns = [Column.as_column(column, self.table) for column in columns]
         self._values: Optional[Sequence[types.BuildingBlock]] = None
+        self._unnest: Optional[Sequence[str]] = None
+        # Conflict columns and constraint, and the action to take.
+        self._conflict: Optional[Tuple[List[str], Optional[str]]] = None
+        self._conflict_action: Optional[List[types.BuildingBlock]] = None
 
     def values_fromquery(self, select: Select):
         """Get values from a select query.
@@ -44,7 +69,7 @@ class Insert:
         if len(values) != len(self.columns):
             raise ValueError("SELECT does not unwrap to enough values.")
 
-        self._values = CommaSeparated(values).flatten()
+        self._values = CommaSeparated(*values).flatten()  # type: ignore
         return self
 
     def values_raw(self, *rawvalues: types.BuildingBlock):
@@ -56,32 +81,294 @@ class Insert:
         self._values = rawvalues
         return self
 
-    def flatten(self) -> Sequence[types.BuildingBlock]:
-        """Flatten into a list of blocks."""
+    def _types(self, column_types: Optional[Sequence[Any]]) -> Sequence[Any]:
+        if column_types is None:
+            column_types = [column.pgtype for column in self.columns]
+            missing = [column.column for column in self.columns if column.pgtype is None]
+            if missing:
+                raise ValueError(f"No types given, and columns {missing} have no type.")
+        if len(column_types) != len(self.columns):
+            raise ValueError(f"Expected {len(self.columns)} types, got {len(column_types)}.")
+        return column_types
+
+    def unnest(self, column_types: Optional[Sequence[str]] = None):
+        """Insert arrays of values, one array per column, with unnest().
+
+        The query takes one array argument per column, so its text
+        is the same for any number of rows.
+
+        Args:
+            column_types: PostgreSQL type of each column, eg. `int8`.
+                Defaults to the types of the columns.
+
+        Examples:
+            >>> query = pq.Insert("user", ["id", "name"]).unnest(["int8", "text"]).to_query()
+            >>> query([1, 2], ["oxy", "lib"])
+            ('INSERT INTO "user" ("id", "name") SELECT * FROM unnest ($1::int8[], $2::text[])',
+             [1, 2], ['oxy', 'lib'])
+        """
+        self._unnest = list(self._types(column_types))
+        return self
+
+    def unnest_rows(self, rows: Iterable[Sequence[Any]]) -> Tuple[Any, ...]:
+        """Bind rows of values to an unnest() insert.
+
+        Args:
+            rows: iterable of rows, each with one value per column.
+
+        Returns:
+            Tuple of query and one array of values per column.
+        """
+        if self._unnest is None:
+            raise ValueError("Insert does not use unnest(), call Insert.unnest() first.")
+
+        return self.to_query()(*transpose(rows, len(self.columns)))
+
+    def on_conflict(self,
+                    *columns: Union[str, Column],
+                    constraint: Optional[str] = None):
+        """Handle rows conflicting with existing ones, ie. upsert.
+
+        Follow with `do_update()` or `do_nothing()`. This applies to every
+        form of the insert: single row, `batches()`, `unnest()` and
+        `values_fromquery()`, but not COPY.
+
+        Args:
+            *columns: columns of the unique index to infer, eg. the primary key.
+            constraint: name of the constraint, instead of columns.
+        """
+        if columns and constraint is not None:
+            raise ValueError("Cannot give both conflict columns and a constraint.")
+
+        self._conflict = ([Column.as_column(col).column for col in columns], constraint)
+        self._conflict_action = None
+        return self
+
+    def do_update(self,
+                  *columns: Union[str, Column],
+                  **updates: types.Value):
+        """Update the existing row on conflict.
 
-        parts = []
+        Values proposed for insertion are available as `pq.EXCLUDED.col(...)`.
+
+        Args:
+            *columns: columns to set to the value proposed for insertion.
+                Defaults to every inserted column that is not a conflict column,
+                if no updates are given either.
+            **updates: columns to set to other values, as in `Update.set()`.
+
+        Examples:
+            >>> pq.Insert("counter", ["key", "count"]).on_conflict("key").do_update(
+            ...     count=pq.Column("count", table="counter") + pq.EXCLUDED.col("count")
+            ... )
+        """
+        if self._conflict is None:
+            raise ValueError("Call Insert.on_conflict() before do_update().")
+        keys, constraint = self._conflict
+        if not keys and constraint is None:
+            raise ValueError("ON CONFLICT DO UPDATE requires conflict columns or a constraint.")
+
+        if not columns and not updates:
+            columns = tuple(col for col in self.columns if col.column not in keys)
+            if not columns:
+                raise ValueError("No columns to update, give them explicitly.")
+
+        assignments = []
+        for col in columns:
+            column = Column.as_column(col, self.table)
+            assignments.append(column == EXCLUDED.col(column.column))
+        for col, val in updates.items():
+            assignments.append(Column.as_column(col, self.table) == val)
+
+        self._conflict_action = [
+            "DO UPDATE SET", *CommaSeparated(*assignments).flatten()  # type: ignore
+        ]
+        return self
 
+    def do_nothing(self):
+        """Skip rows conflicting with existing ones."""
+        if self._conflict is None:
+            self.on_conflict()
+        self._conflict_action = ["DO NOTHING"]
+        return self
+
+    def _suffix(self) -> List[types.BuildingBlock]:
+        if self._conflict is None:
+            return []
+        if self._conflict_action is None:
+            raise ValueError("Call do_update() or do_nothing() after Insert.on_conflict().")
+
+        keys, constraint = self._conflict
+        if constraint is not None:
+            target = ["ON CONFLICT ON CONSTRAINT", quote_ident(constraint)]
+        elif keys:
+            target = ["ON CONFLICT", "(", ", ".join([quote_ident(key) for key in keys]), ")"]
+        else:
+            target = ["ON CONFLICT"]
+        return [*target, *self._conflict_action]
+
+    def _target(self) -> List[types.BuildingBlock]:
         columns = ", ".join([str(column) for column in self.columns])
-        table = str(self.table)
+        return ["INSERT INTO", self.table.declaration(), "(", columns, ")"]
+
+    def _flatten(self,
+                 rows: Sequence[Sequence[types.BuildingBlock]]) -> Sequence[types.BuildingBlock]:
+        parts = [*self._target(), "VALUES"]
+        for values in rows:
+            parts.extend(["(", *values, ")", ","])
+        parts.pop()
+        parts.extend(self._suffix())
+        parts.extend(self._returning_blocks())
+
+        return parts
+
+    def flatten(self) -> Sequence[types.BuildingBlock]:
+        """Flatten into a list of blocks."""
+        if self._unnest is not None:
+            arrays = [
+                Variable(col.as_arg(), list, cast=pgtype + "[]")
+                for col, pgtype in zip(self.columns, self._unnest)
+            ]
+            return [
+                *self._target(),
+                "SELECT * FROM unnest",
+                "(",
+                *CommaSeparated(*arrays).flatten(),  # type: ignore
+                ")",
+                *self._suffix(),
+                *self._returning_blocks(),
+            ]
 
         values = self._values
         if not values:
-            values = [Variable(col.as_arg(), ...) for col in self.columns]
-
-        parts = [
-            "INSERT INTO",
-            table,
-            "(",
-            columns,
-            ")",
-            "VALUES",
-            "(",
-            *values,
-            ")",
-        ]
+            variables = [Variable(col.as_arg(), ..., cast=col.pgtype) for col in self.columns]
+            values = CommaSeparated(*variables).flatten()  # type: ignore
 
-        return parts
+        return self._flatten([values])
+
+    def _render_rows(self, count: int) -> str:
+        args = [(col.as_arg(), col.pgtype) for col in self.columns]
+        rows = []
+        for row in range(count):
+            values: List[types.BuildingBlock] = []
+            for arg, pgtype in args:
+                values.extend([Variable(f"{arg}_{row}", cast=pgtype), ","])
+            values.pop()
+            rows.append(values)
+        query, query_args = render(self._flatten(rows))
+        if len(query_args) != count * len(args):
+            raise ValueError(
+                "Cannot use batches() with query arguments in ON CONFLICT or RETURNING."
+            )
+        return query
+
+    def batches(self,
+                rows: Iterable[Sequence[Any]],
+                *,
+                max_params: int = MAX_PARAMS) -> Iterator[Tuple[Any, ...]]:
+        """Insert many rows with multi-row VALUES queries.
+
+        Rows are consumed lazily and split into chunks of as many rows as
+        fit in `max_params` parameters. The query for a chunk size is only
+        rendered once, and kept until the insert is modified, so a whole
+        batch uses at most two distinct queries.
+
+        Args:
+            rows: iterable of rows, each with one value per column.
+            max_params: maximum number of parameters in one query.
+
+        Yields:
+            Tuples of query and arguments, like those returned by `to_query()`.
+
+        Examples:
+            >>> list(pq.Insert("user", ["id", "name"]).batches([(1, "a"), (2, "b")]))
+            [('INSERT INTO "user" ("id", "name") VALUES ($1, $2), ($3, $4)', 1, 'a', 2, 'b')]
+        """
+        width = len(self.columns)
+        if width > max_params:
+            raise ValueError(f"Cannot insert {width} columns with {max_params} parameters.")
+
+        size = max_params // width
+        rows = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows, size))
+            if not chunk:
+                return
+
+            args = []
+            for row in chunk:
+                if len(row) != width:
+                    raise ValueError(f"Expected {width} values per row, got {len(row)}.")
+                args.extend(row)
+
+            count = len(chunk)
+            query = self._memoized(("rows", count), functools.partial(self._render_rows, count))
+            yield (query, *args)
+
+    def copy_query(self) -> str:
+        """Return a binary COPY FROM STDIN query for the table and columns."""
+        columns = ", ".join([quote_ident(column.column) for column in self.columns])
+        # COPY names the table itself, its alias is only valid in INSERT.
+        return f"COPY {quote_ident(self.table.table)} ({columns}) FROM STDIN (FORMAT binary)"
+
+    def copy(self,
+             rows: Iterable[Sequence[Any]],
+             column_types: Optional[Sequence[Union[str, Encoder]]] = None,
+             *,
+             buffer_size: int = 1 << 16) -> Tuple[str, Iterator[bytes]]:
+        """Load rows with a binary COPY.
+
+        Args:
+            rows: iterable of rows, each with one value per column.
+            column_types: PostgreSQL type name or encoder for each column.
+                Defaults to the types of the columns.
+            buffer_size: approximate size of each chunk of COPY data.
+
+        Returns:
+            The COPY query, and a generator of binary COPY data
+            to pass to the driver, eg. `copy_in` or `copy_to_table`.
+
+        Examples:
+            >>> query, data = pq.Insert("user", ["id", "name"]).copy(rows, ["int8", "text"])
+            >>> query
+            'COPY "user" ("id", "name") FROM STDIN (FORMAT binary)'
+        """
+        writer = CopyWriter(self._types(column_types), buffer_size=buffer_size)
+        return self.copy_query(), writer.encode(rows)
+
+    def copy_columns(self,
+                     data: Mapping[str, Any],
+                     column_types: Optional[Sequence[str]] = None,
+                     *,
+                     nulls: Optional[Mapping[str, Any]] = None,
+                     chunk_rows: int = 1 << 16) -> Tuple[str, Iterator[bytes]]:
+        """Load columnar data, eg. NumPy arrays, with a binary COPY.
+
+        See `pq.encode_columns` for how columns are encoded.
+
+        Args:
+            data: mapping of column name to an array of values,
+                with exactly one entry for each column of the insert.
+            column_types: PostgreSQL type name for each column.
+                Defaults to the types of the columns.
+            nulls: optional mapping of column name to a boolean NULL mask.
+            chunk_rows: number of rows encoded per chunk of COPY data.
+
+        Returns:
+            The COPY query, and a generator of binary COPY data.
+
+        Examples:
+            >>> data = {"id": np.arange(3), "score": np.array([0.5, 1.0, 2.0])}
+            >>> query, chunks = pq.Insert("user", ["id", "score"]).copy_columns(
+            ...     data, ["int8", "float8"], nulls={"score": np.isnan(data["score"])}
+            ... )
+        """
+        names = [column.column for column in self.columns]
+        if set(data) != set(names):
+            raise ValueError(f"Expected data for columns {names}, got {list(data)}.")
 
-    def to_query(self) -> Callable:
-        """Build query into a callable."""
-        return mkquery(self.flatten())
+        column_types = self._types(column_types)
+        columns = [data[name] for name in names]
+        masks = [nulls.get(name) for name in names] if nulls else None
+        chunks = encode_columns(columns, column_types, masks, chunk_rows=chunk_rows)
+        return self.copy_query(), chunks
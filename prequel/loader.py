@@ -0,0 +1,154 @@
+"""Coalesce concurrent lookups by key into batched queries."""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import functools
+import inspect
+from typing import (
+    Any, Awaitable, Callable, Dict, Hashable, List, Mapping, Optional, Sequence, Set, Union
+)
+
+from .column import Column
+from .expression import Operator
+from .helpers import group
+
+__all__ = ["Loader"]
+
+
+class Loader:
+    """Batch lookups of rows by key, in the style of DataLoader.
+
+    Keys requested concurrently, within one iteration of the event loop
+    or within `window` seconds, are deduplicated and fetched with a single
+    `WHERE key = ANY($1)` query. Each caller then gets the row for its key.
+
+    Attributes:
+        fetch: coroutine function taking the query and its arguments and
+            returning rows, eg. asyncpg's `Connection.fetch` or `Pool.fetch`.
+        key: column the rows are looked up by, which must be selected.
+        query: compiled batch query, taking the array of keys.
+        max_batch_size: maximum number of keys fetched by one query.
+        window: seconds to wait for more keys before fetching, or 0 for
+            the end of the current iteration of the event loop.
+        many: whether each key has a list of rows, rather than one row.
+        params: values of the other arguments of the query, eg. from `where()`,
+            passed to every batch.
+
+    Examples:
+        >>> users = pq.Loader(pool.fetch, pq.Select("id", "name").from_("user"), "id")
+        >>> alice, bob = await asyncio.gather(users.load(1), users.load(2))
+
+        >>> select = pq.Select("id", "name").from_("user").where(tenant=int)
+        >>> users = pq.Loader(pool.fetch, select, "id", params={"tenant": 7})
+    """
+
+    def __init__(self,
+                 fetch: Callable[..., Awaitable[Sequence[Any]]],
+                 select: Any,
+                 key: Union[Column, str],
+                 *,
+                 max_batch_size: int = 1000,
+                 window: float = 0.0,
+                 many: bool = False,
+                 params: Optional[Mapping[str, Any]] = None):
+        if max_batch_size < 1:
+            raise ValueError(f"Batch size must be positive, got {max_batch_size}.")
+
+        self.fetch = fetch
+        self.key = Column.as_column(key, select.table)
+        self.max_batch_size = max_batch_size
+        self.window = window
+        self.many = many
+        self.params = dict(params or {})
+
+        batch = copy.copy(select)
+        member = self.key.in_(list)
+        if select.constraints is None:
+            batch.constraints = member
+        else:
+            batch.constraints = group([select.constraints, member], Operator.and_)
+        self.query = batch.to_query()
+        self._keys = member.array.name
+        # Fail now on unknown arguments, rather than in every batch.
+        inspect.signature(self.query).bind_partial(**self.params)
+
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self._handle: Optional[asyncio.Handle] = None
+        # Running batches, referenced so they are not garbage collected.
+        self._tasks: Set[asyncio.Future] = set()
+
+    def load(self, key: Hashable) -> Awaitable[Any]:
+        """Load the row for a key, or None if there is none.
+
+        With `many`, load the list of rows for the key instead.
+
+        Args:
+            key: value of the key column.
+        """
+        future = self._pending.get(key)
+        if future is not None:
+            return asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[key] = future
+        if len(self._pending) >= self.max_batch_size:
+            self.dispatch()
+        elif self._handle is None:
+            if self.window:
+                self._handle = loop.call_later(self.window, self.dispatch)
+            else:
+                self._handle = loop.call_soon(self.dispatch)
+        return asyncio.shield(future)
+
+    async def load_many(self, keys: Sequence[Hashable]) -> List[Any]:
+        """Load the rows for several keys, see `load`.
+
+        Args:
+            keys: values of the key column.
+        """
+        return list(await asyncio.gather(*[self.load(key) for key in keys]))
+
+    def dispatch(self):
+        """Fetch the pending keys now, without waiting for more."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._pending:
+            pending, self._pending = self._pending, {}
+            task = asyncio.ensure_future(self._run(pending))
+            self._tasks.add(task)
+            task.add_done_callback(functools.partial(self._finish, pending))
+
+    def _finish(self, pending: Dict[Hashable, asyncio.Future], task: asyncio.Future):
+        """Settle the futures a batch left pending, if it was cancelled or failed."""
+        self._tasks.discard(task)
+        for future in pending.values():
+            if future.done():
+                continue
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+
+    async def _run(self, pending: Dict[Hashable, asyncio.Future]):
+        try:
+            rows = await self.fetch(*self.query(**{self._keys: list(pending)}, **self.params))
+        except Exception as ex:  # pylint: disable=broad-except
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(ex)
+            return
+
+        column = self.key.column
+        results: Dict[Hashable, Any] = {}
+        for row in rows:
+            if self.many:
+                results.setdefault(row[column], []).append(row)
+            else:
+                results[row[column]] = row
+        for key, future in pending.items():
+            if not future.done():
+                future.set_result(results.get(key, [] if self.many else None))
@@ -0,0 +1,143 @@
+"""Optional metrics on the compilation and binding of queries.
+
+Metrics are disabled by default. While disabled, compiled queries only
+check a flag in their own globals, so the cost of binding is unchanged.
+
+Examples:
+    >>> pq.metrics.enable()
+    >>> pq.metrics.add_hook(lambda event, sql, seconds: statsd.timing(f"sql.{event}", seconds))
+    >>> pq.stats(top=5)
+    [QueryStats(sql='SELECT ...', compiles=1, compile_time=..., binds=1000, bind_time=...)]
+"""
+
+import logging
+import threading
+import weakref
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+__all__ = ["QueryStats", "stats"]
+
+COMPILE = "compile"
+BIND = "bind"
+
+Hook = Callable[[str, str, float], None]
+
+enabled = False
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_counters: Dict[str, List[float]] = {}
+_hooks: List[Hook] = []
+# Compiled queries, and the name of the flag in their globals.
+_binders: "weakref.WeakKeyDictionary[Callable, str]" = weakref.WeakKeyDictionary()
+
+
+class QueryStats(NamedTuple):
+    """Snapshot of the metrics of one query, keyed by its SQL."""
+
+    sql: str
+    compiles: int
+    compile_time: float
+    binds: int
+    bind_time: float
+
+    @property
+    def total_time(self) -> float:
+        """Total time spent compiling and binding the query, in seconds."""
+        return self.compile_time + self.bind_time
+
+
+def _set_enabled(value: bool):
+    global enabled  # pylint: disable=global-statement
+    enabled = value
+    for binder, flag in list(_binders.items()):
+        binder.__globals__[flag] = value
+
+
+def enable():
+    """Start recording metrics."""
+    _set_enabled(True)
+
+
+def disable():
+    """Stop recording metrics. Recorded metrics are kept."""
+    _set_enabled(False)
+
+
+def register(binder: Callable, flag: str):
+    """Register a compiled query, whose globals hold the enabled flag under a name.
+
+    Args:
+        binder: compiled query.
+        flag: name of the flag in the globals of the binder.
+    """
+    binder.__globals__[flag] = enabled
+    _binders[binder] = flag
+
+
+def add_hook(hook: Hook):
+    """Call a function on every recorded event, eg. to export metrics.
+
+    Errors raised by the hook are logged, and not raised to the caller of the query.
+
+    Args:
+        hook: function taking the event ("compile" or "bind"),
+            the SQL of the query and the duration in seconds.
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook: Hook):
+    """Stop calling a function added with `add_hook`."""
+    _hooks.remove(hook)
+
+
+def record(event: str, sql: str, seconds: float):
+    """Record an event of a query.
+
+    Args:
+        event: "compile" or "bind".
+        sql: SQL of the query.
+        seconds: duration of the event.
+    """
+    offset = 0 if event == COMPILE else 2
+    with _lock:
+        counters = _counters.get(sql)
+        if counters is None:
+            counters = _counters[sql] = [0, 0.0, 0, 0.0]
+        counters[offset] += 1
+        counters[offset + 1] += seconds
+    for hook in list(_hooks):
+        try:
+            hook(event, sql, seconds)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Metrics hook %r failed on %s of %r.", hook, event, sql)
+
+
+def record_bind(sql: str, seconds: float):
+    """Record the binding of a query, see `record`."""
+    record(BIND, sql, seconds)
+
+
+def reset():
+    """Forget every recorded metric."""
+    with _lock:
+        _counters.clear()
+
+
+def stats(top: Optional[int] = 10, by: str = "total_time") -> List[QueryStats]:
+    """Return the metrics of the most expensive queries.
+
+    Args:
+        top: number of queries to return, or None for all of them.
+        by: field of `QueryStats` to sort by, in descending order.
+    """
+    if by not in QueryStats._fields and by != "total_time":
+        raise ValueError(f"Cannot sort query stats by {repr(by)}.")
+    with _lock:
+        snapshot = [
+            QueryStats(sql, int(c), ct, int(b), bt) for sql, (c, ct, b, bt) in _counters.items()
+        ]
+    snapshot.sort(key=lambda entry: getattr(entry, by), reverse=True)
+    return snapshot if top is None else snapshot[:top]
@@ -2,101 +2,422 @@
 
 from __future__ import annotations
 
-import itertools
 import inspect
-from typing import Any, List, Sequence, Tuple, Callable
+import textwrap
+import time
+from types import MappingProxyType
+from typing import (
+    Any, Callable, Collection, Dict, List, Mapping, Optional, Sequence, Tuple
+)
 
-from . import types
+from . import metrics, types
+from .emit import join
 
-__all__ = ["mkquery"]
+__all__ = ["mkquery", "render"]
 
+# Binding many named parameters, and checking each for a missing value,
+# costs more than a generic binder, so queries with more arguments than
+# this get a fast path for calls passing every argument positionally.
+_WIDE = 24
 
-def mkquery(blocks: Sequence[types.BuildingBlock]) -> Callable:
-    """Build a query from a sequence of building blocks.
+
+def _too_many(count: int, extra: Tuple[Any, ...]):
+    # Binders cannot call len() themselves, an argument may be named so.
+    raise TypeError(f"Query takes {count} arguments but {count + len(extra)} were given")
+
+
+def _missing(names: Tuple[str, ...], values: Tuple[Any, ...]):
+    arg = next(name for name, value in zip(names, values) if value is Ellipsis)
+    raise TypeError(f"Query missing a required keyword-only argument: {repr(arg)}")
+
+
+def _unexpected(kwargs: Dict[str, Any]):
+    raise TypeError(f"Query got unexpected keyword arguments {list(kwargs.keys())}")
+
+
+def _prefix(names: Sequence[str]) -> str:
+    """Return a prefix for generated names that no argument name starts with."""
+    prefix = "_pq_"
+    while any(name.startswith(prefix) for name in names):
+        prefix += "_"
+    return prefix
+
+
+def _keyword_only(query_context: types.QueryArgs, fixed: Collection[str]) -> List[str]:
+    """Return the arguments that can only be passed by keyword.
+
+    A required argument placed after one with a default, eg. by
+    `where(active=True, id=int)`, cannot be positional, so it and
+    every argument after it are keyword-only.
 
     Args:
-        blocks: List of blocks to combine into a query
+        query_context: arguments of the query, in placeholder order.
+        fixed: names of the arguments fixed by `partial()`.
+    """
+    names = [arg for arg in query_context if arg not in fixed]
+    has_default = False
+    for i, arg in enumerate(names):
+        required = query_context[arg][1] is Ellipsis
+        if required and has_default:
+            return names[i:]
+        has_default = has_default or not required
+    return []
+
+
+def _binder_source(query: str,
+                   query_context: types.QueryArgs,
+                   prefix: str,
+                   local: str,
+                   *,
+                   name: str = "query",
+                   annotations: Optional[Sequence[str]] = None,
+                   returns: Optional[str] = None,
+                   instrument: bool = True,
+                   fixed: Optional[Mapping[str, Any]] = None,
+                   checks: bool = True) -> Tuple[str, Dict[str, Any]]:
+    """Generate the source of a function that binds arguments for a query.
+
+    Queries with many arguments get a second function, named `name`,
+    returning the positional arguments as they are when all of them are
+    given, and calling the binder, named `{local}bind`, otherwise.
+
+    Args:
+        query: finalized SQL query.
+        query_context: arguments of the query, in placeholder order.
+        prefix: prefix of the names of the shared helpers, see `_prefix`.
+        local: prefix of the names of the constants of this query,
+            which must start with `prefix`.
+        name: name of the function.
+        annotations: source of the annotation of each argument, if any.
+        returns: source of the return annotation, if any.
+        instrument: whether to record metrics when they are enabled,
+            which requires `{prefix}enabled`, `{prefix}clock` and `{prefix}record`.
+        fixed: values of arguments that are not parameters of the function,
+            but constants placed directly into their slots.
+        checks: whether to check the arguments in the function, with the error
+            messages of `mkquery`, which requires `{prefix}too_many`,
+            `{prefix}missing` and `{prefix}unexpected`. Otherwise required
+            arguments have no default, and Python itself checks the arguments.
 
     Returns:
-        A callable that takes variable arguments
-        and returns a tuple that can be passed to PostgreSQL drivers.
-        (such as asyncpg)
+        The source, and the constants it refers to by name.
     """
-    query_context: types.QueryArgs = {}
-    parts = []
-    result: List[Any] = [str]
-    params: List[inspect.Parameter] = []
-
-    for block in blocks:
-        if isinstance(block, str):
-            parts.append(block)
+    fixed = fixed or {}
+    names = [arg for arg in query_context if arg not in fixed]
+    keyword_only = set(_keyword_only(query_context, fixed))
+    constants: Dict[str, Any] = {f"{local}query": query}
+    slots = []
+    params = []
+    keyword_params = []
+    required = []
+    for i, (arg, (_, default)) in enumerate(query_context.items()):
+        if arg in fixed:
+            constants[f"{local}f{i}"] = fixed[arg]
+            slots.append(f"{local}f{i}")
+            continue
+        slots.append(arg)
+        annotation = f": {annotations[i]}" if annotations else ""
+        target = keyword_params if arg in keyword_only else params
+        if default is Ellipsis:
+            target.append(f"{arg}{annotation}=..." if checks else f"{arg}{annotation}")
+            required.append(arg)
         else:
-            parts.append(block.compile(query_context))
+            constants[f"{local}d{i}"] = default
+            target.append(f"{arg}{annotation}={local}d{i}")
+    positional = len(params)
+    if checks:
+        params.extend([f"*{prefix}args", *keyword_params, f"**{prefix}kwargs"])
+    elif keyword_params:
+        params.extend(["*", *keyword_params])
 
-    for arg, info in query_context.items():
-        type_, default = info
-        result.append(type_)
-        if type_ is Any:
-            inspect_type = inspect.Parameter.empty
+    returns = f" -> {returns}" if returns else ""
+    wide = checks and not fixed and not keyword_only and len(names) > _WIDE
+    lines = [f"def {local + 'bind' if wide else name}({', '.join(params)}){returns}:"]
+    if instrument:
+        lines.append(f"    {prefix}start = {prefix}enabled and {prefix}clock()")
+    if checks:
+        lines.extend([
+            f"    if {prefix}args:",
+            f"        {prefix}too_many({positional}, {prefix}args)",
+        ])
+    if checks and required:
+        values = "".join(f"{arg}, " for arg in required)
+        lines.extend([
+            f"    if {' or '.join(f'{arg} is ...' for arg in required)}:",
+            f"        {prefix}missing({repr(tuple(required))}, ({values}))",
+        ])
+    if checks:
+        lines.extend([
+            f"    if {prefix}kwargs:",
+            f"        {prefix}unexpected({prefix}kwargs)",
+        ])
+    if instrument:
+        lines.extend([
+            f"    if {prefix}start:",
+            f"        {prefix}record({local}query, {prefix}clock() - {prefix}start)",
+        ])
+    lines.append(f"    return ({local}query, {''.join(f'{slot}, ' for slot in slots)})")
+    if wide:
+        lines.extend([
+            f"def {name}(*{prefix}args, **{prefix}kwargs){returns}:",
+            f"    if {prefix}kwargs or len({prefix}args) != {len(names)}:",
+            f"        return {local}bind(*{prefix}args, **{prefix}kwargs)",
+        ])
+        if not instrument:
+            lines.append(f"    return ({local}query,) + {prefix}args")
         else:
-            inspect_type = type_
+            lines.extend([
+                f"    {prefix}start = {prefix}enabled and {prefix}clock()",
+                f"    {prefix}bound = ({local}query,) + {prefix}args",
+                f"    if {prefix}start:",
+                f"        {prefix}record({local}query, {prefix}clock() - {prefix}start)",
+                f"    return {prefix}bound",
+            ])
+    return "\n".join(lines), constants
 
-        if default is Ellipsis:
-            default = inspect.Parameter.empty
 
+class _Template:
+    """Generated code of a query, shared by the queries with its structure.
+
+    Queries differing only in the values of their defaults, or of the
+    arguments fixed with `partial()`, share one template, and only
+    pass those values to its factory.
+
+    Attributes:
+        sql: finalized SQL query.
+        query_args: arguments of the query, with the defaults it was compiled with.
+        fixed: names of the arguments fixed by `partial()`.
+        slots: arguments passed to `make`, in order, ie. those with
+            a default and the fixed ones.
+        make: factory taking the values of `slots` and returning a binder.
+        signature: signature of the binders, with the compiled defaults.
+        query: the query with the compiled defaults, if nothing is fixed.
+        partials: templates with some arguments fixed, by their names,
+            shared by every template of the query.
+    """
+
+    __slots__ = (
+        "sql", "query_args", "fixed", "slots", "make", "signature", "pgtypes", "query", "partials"
+    )
+
+    def __init__(self,
+                 query: str,
+                 query_context: types.QueryArgs,
+                 fixed: Collection[str] = (),
+                 partials: Optional[Dict[frozenset, _Template]] = None):
+        self.sql = query
+        self.query_args = query_context
+        self.fixed = frozenset(fixed)
+        self.slots = [
+            arg for arg, (_, default) in query_context.items()
+            if arg in self.fixed or default is not Ellipsis
+        ]
+        self.make = _factory(query, query_context, self.fixed)
+        self.signature = _signature(query_context, self.fixed)
+        self.pgtypes = tuple(query_context.casts.get(name) for name in query_context)
+        self.query: Optional[Callable] = None
+        self.partials = {} if partials is None else partials
+        if not fixed:
+            self.query = _instance(self, query_context, {})
+
+
+def _factory(query: str, query_context: types.QueryArgs, fixed: Sequence[str]) -> Callable:
+    """Generate a factory of functions that bind arguments for a query.
+
+    The binders have one parameter per query argument, so Python itself
+    matches positional and keyword arguments to their slots, and return
+    the tuple of query and arguments directly. Defaults and fixed values
+    are parameters of the factory, so queries only differing by them
+    share the generated code.
+    Binding is only timed while metrics are enabled, see `metrics`.
+
+    Args:
+        query: finalized SQL query.
+        query_context: arguments of the query, in placeholder order.
+        fixed: names of the arguments fixed by `partial()`.
+    """
+    # Generated helpers must not shadow any argument names.
+    prefix = _prefix(list(query_context))
+    source, constants = _binder_source(
+        query, query_context, prefix, prefix, fixed=dict.fromkeys(fixed)
+    )
+    params = [name for name in constants if name != f"{prefix}query"]
+    source = "\n".join([
+        f"def {prefix}make({', '.join(params)}):",
+        textwrap.indent(source, "    "),
+        "    return query",
+    ])
+    namespace: Dict[str, Any] = {
+        f"{prefix}too_many": _too_many,
+        f"{prefix}missing": _missing,
+        f"{prefix}unexpected": _unexpected,
+        f"{prefix}clock": time.perf_counter,
+        f"{prefix}record": metrics.record_bind,
+        f"{prefix}query": query,
+    }
+    exec(source, namespace)  # pylint: disable=exec-used
+    make = namespace[f"{prefix}make"]
+    metrics.register(make, f"{prefix}enabled")
+    return make
+
+
+def _signature(query_context: types.QueryArgs, fixed: Collection[str]) -> inspect.Signature:
+    result: List[Any] = [str]
+    params: List[inspect.Parameter] = []
+    keyword_only = set(_keyword_only(query_context, fixed))
+    for arg, (type_, default) in query_context.items():
+        result.append(type_)
+        if arg in fixed:
+            continue
         params.append(
             inspect.Parameter(
                 name=arg,
-                kind=inspect.Parameter.POSITIONAL_OR_KEYWORD,
-                default=default,
-                annotation=inspect_type,
+                kind=inspect.Parameter.KEYWORD_ONLY
+                if arg in keyword_only else inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                default=inspect.Parameter.empty if default is Ellipsis else default,
+                annotation=inspect.Parameter.empty if type_ is Any else type_,
             )
         )
 
-    query = ""
-    for part in parts:
-        if part in [")", ","]:
-            query = query.rstrip()
-        query += part
-        if part != "(":
-            query += " "
-
-    query = query.rstrip()
-    return_type = Tuple[Any]  # type: ignore
-    return_type.__args__ = tuple(result)  # type: ignore
-
-    def inner(*args, **kwargs):
-        nonlocal query, query_context
-        # ignore VSCode, the above is not an error
-        # Python LS cannot bind values with type hinted declarations :/
-        convert_kw = []
-
-        if len(args) > len(query_context):
-            raise TypeError(
-                f"Query takes {len(query_context)} arguments but {len(args)} were given"
-            )
-        elif len(args) < len(query_context):
-            iterator = query_context.items()
-
-            # Consume n items from the query_context dict
-            next(itertools.islice(iterator, len(args), len(args)), None)
-            for arg, data in iterator:
-                val = kwargs.pop(arg, data[1])
-                if val is Ellipsis:
-                    raise TypeError(
-                        f"Query missing a required keyword-only argument: {repr(arg)}"
-                    )
-
-                convert_kw.append(val)
-
-        if kwargs:
-            raise TypeError(
-                f"Query got unexpected keyword arguments {list(kwargs.keys())}"
-            )
+    return_type = Tuple[tuple(result)]  # type: ignore
+    return inspect.Signature(parameters=params, return_annotation=return_type)
+
+
+def _same(value: Any, other: Any) -> bool:
+    # Equal immutable values are interchangeable, mutable ones are not shared.
+    return value is other or (type(value) in _IMMUTABLE and type(other) is type(value)
+                              and value == other)
+
+
+_IMMUTABLE = frozenset([int, float, str, bytes, bool, type(None)])
+
 
-        return (query, *args, *convert_kw)
+def _instance(template: _Template,
+              query_context: types.QueryArgs,
+              fixed: Mapping[str, Any]) -> Callable:
+    """Create a query from a template.
 
-    inner.__signature__ = inspect.Signature(
-        parameters=params, return_annotation=return_type
+    Args:
+        template: template of the query.
+        query_context: arguments of the query, with their defaults.
+        fixed: values of the arguments fixed by `partial()`.
+    """
+    compiled = template.query_args
+    shared = query_context is compiled or all(
+        _same(default, compiled[arg][1]) for arg, (_, default) in query_context.items()
     )
+    if shared and template.query is not None:
+        return template.query
+
+    inner = template.make(*[
+        fixed[arg] if arg in fixed else query_context[arg][1] for arg in template.slots
+    ])
+    if shared:
+        inner.__signature__ = template.signature
+    else:
+        inner.__signature__ = template.signature.replace(parameters=[
+            param.replace(default=query_context[name][1])
+            if param.default is not inspect.Parameter.empty else param
+            for name, param in template.signature.parameters.items()
+        ])
+    inner.sql = template.sql
+    inner.query_args = query_context
+    inner.pgtypes = template.pgtypes
+    inner.fixed = MappingProxyType(dict(fixed))
+
+    def partial(**values: Any) -> Callable:
+        """Bind arguments ahead of time, eg. one shared by every call.
+
+        The fixed values are placed directly into their slots,
+        so only the remaining arguments are bound on each call.
+
+        Args:
+            **values: values of arguments, by name.
+
+        Returns:
+            A query taking only the remaining arguments.
+
+        Examples:
+            >>> query = pq.Select("id").from_("doc").where(tenant=int, id=int).to_query()
+            >>> query.partial(tenant=7)(id=1)
+            ('SELECT "id" FROM "doc" WHERE ("tenant" = $1) AND ("id" = $2)', 7, 1)
+        """
+        unexpected = [name for name in values if name not in query_context or name in fixed]
+        if unexpected:
+            _unexpected({name: values[name] for name in unexpected})
+        merged = {**fixed, **values}
+        names = frozenset(merged)
+        derived = template.partials.get(names)
+        if derived is None:
+            derived = template.partials[names] = _Template(
+                template.sql, template.query_args, names, template.partials
+            )
+        return _instance(derived, query_context, merged)
+
+    inner.partial = partial
     return inner
+
+
+def _with_defaults(template: _Template, defaults: Sequence[Any]) -> Callable:
+    """Create the query of a template with other defaults, in placeholder order."""
+    compiled = template.query_args
+    if template.query is not None and all(
+        _same(default, info[1]) for default, info in zip(defaults, compiled.values())
+    ):
+        return template.query
+
+    query_context = types.QueryArgs()
+    for (arg, (type_, _)), default in zip(compiled.items(), defaults):
+        query_context[arg] = (type_, default)
+    query_context.casts = compiled.casts
+    return _instance(template, query_context, {})
+
+
+def render(blocks: Sequence[types.BuildingBlock]) -> Tuple[str, types.QueryArgs]:
+    """Render a sequence of building blocks into SQL.
+
+    Args:
+        blocks: List of blocks to combine into a query
+
+    Returns:
+        The SQL query and its arguments, in placeholder order.
+    """
+    query_context = types.QueryArgs()
+    parts = []
+
+    for block in blocks:
+        if isinstance(block, str):
+            parts.append(block)
+        else:
+            parts.append(block.compile(query_context))
+
+    return join(parts), query_context
+
+
+def _compile(blocks: Sequence[types.BuildingBlock]) -> _Template:
+    """Render building blocks, and generate the code of the query, see `mkquery`."""
+    start = metrics.enabled and time.perf_counter()
+    query, query_context = render(blocks)
+    template = _Template(query, query_context)
+    if start:
+        metrics.record(metrics.COMPILE, query, time.perf_counter() - start)
+    return template
+
+
+def mkquery(blocks: Sequence[types.BuildingBlock]) -> Callable:
+    """Build a query from a sequence of building blocks.
+
+    Args:
+        blocks: List of blocks to combine into a query
+
+    Returns:
+        A callable that takes variable arguments
+        and returns a tuple that can be passed to PostgreSQL drivers.
+        (such as asyncpg)
+        Its `sql` and `query_args` attributes hold the query
+        and its arguments, in placeholder order, and `pgtypes`
+        the PostgreSQL type each argument is cast to, or None.
+        Its `partial()` method binds some arguments ahead of time.
+        Required arguments after one with a default are keyword-only.
+    """
+    return _compile(blocks).query  # type: ignore
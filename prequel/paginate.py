@@ -0,0 +1,129 @@
+"""Keyset pagination of select queries."""
+
+from __future__ import annotations
+
+import copy
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, Sequence
+
+from . import types
+from .column import Column
+from .expression import Expression, Operator, Row
+from .helpers import group
+from .variable import Variable
+
+__all__ = ["Paginator"]
+
+
+class Paginator:
+    """Page through the results of a select query by key.
+
+    Rather than skipping rows with OFFSET, every page after the first
+    seeks past the key of the last row of the previous page, eg.
+    `WHERE ("k1", "k2") > ($1, $2) ORDER BY "k1", "k2" LIMIT $3`,
+    so each page costs the same regardless of how deep it is.
+    Both queries are compiled once and reused for every page.
+
+    Arguments of the select query are passed by position or keyword,
+    and the page size by keyword, as `page_size`.
+
+    Attributes:
+        keys: columns the pages are ordered by, which must be unique together.
+        page_size: default number of rows per page.
+        first: compiled query for the first page.
+        next: compiled query for the following pages, taking
+            the key of the last row as `after_<column>` arguments.
+
+    Examples:
+        >>> pages = pq.Select("id", "name").from_("user").paginate("id", page_size=2)
+        >>> pages.next(after_id=2)
+        ('SELECT "id", "name" FROM "user" WHERE "id" > $1 ORDER BY "id" LIMIT $2', 2, 2)
+        >>> for rows in pages.pages(fetch):
+        ...     print(rows)
+    """
+
+    def __init__(self, select: Any, keys: Sequence[Column], page_size: int = 100):
+        if not keys:
+            raise ValueError("No pagination keys given!")
+        for key in keys:
+            if not isinstance(key, Column):
+                raise TypeError(f"Cannot paginate by {repr(key)}, expected a Column.")
+
+        self.keys = list(keys)
+        self.page_size = page_size
+
+        after = [Variable("after_" + key.as_arg(), cast=key.pgtype) for key in self.keys]
+        self._after = [(var.name, key.column) for var, key in zip(after, self.keys)]
+        if len(self.keys) == 1:
+            seek: types.Value = Expression(self.keys[0], Operator.gt, after[0])
+        else:
+            seek = Expression(Row(self.keys), Operator.gt, Row(after))
+
+        first = copy.copy(select).order_by(*self.keys).limit(Variable("page_size", page_size))
+        rest = copy.copy(first)
+        if select.constraints is None:
+            rest.constraints = seek
+        else:
+            rest.constraints = group([select.constraints, seek], Operator.and_)
+
+        self.first = first.to_query()
+        self.next = rest.to_query()
+
+    def query(self, last: Optional[Any], *args: Any, **kwargs: Any) -> tuple:
+        """Bind the query for the page following a row.
+
+        Args:
+            last: last row of the previous page, or None for the first page.
+                Key values are looked up by column name, eg. `last["id"]`.
+            args: arguments of the select query.
+            kwargs: arguments of the select query, and `page_size`.
+        """
+        if last is None:
+            return self.first(*args, **kwargs)
+        after: Dict[str, Any] = {name: last[column] for name, column in self._after}
+        return self.next(*args, **kwargs, **after)
+
+    def pages(self,
+              fetch: Callable[..., Sequence[Any]],
+              *args: Any,
+              **kwargs: Any) -> Iterator[Sequence[Any]]:
+        """Fetch pages until the results run out.
+
+        Args:
+            fetch: function taking the query and its arguments
+                and returning a sequence of rows, eg. a driver's `fetch`.
+            args: arguments of the select query.
+            kwargs: arguments of the select query, and `page_size`.
+
+        Yields:
+            Non-empty pages of rows.
+        """
+        page_size = kwargs.get("page_size", self.page_size)
+        rows = fetch(*self.query(None, *args, **kwargs))
+        while rows:
+            yield rows
+            if len(rows) < page_size:
+                return
+            rows = fetch(*self.query(rows[-1], *args, **kwargs))
+
+    async def apages(self,
+                     fetch: Callable[..., Awaitable[Sequence[Any]]],
+                     *args: Any,
+                     **kwargs: Any) -> AsyncIterator[Sequence[Any]]:
+        """Fetch pages until the results run out, with an async fetch function.
+
+        Args:
+            fetch: coroutine function taking the query and its arguments
+                and returning a sequence of rows, eg. asyncpg's `Connection.fetch`.
+            args: arguments of the select query.
+            kwargs: arguments of the select query, and `page_size`.
+
+        Yields:
+            Non-empty pages of rows.
+        """
+        page_size = kwargs.get("page_size", self.page_size)
+        rows = await fetch(*self.query(None, *args, **kwargs))
+        while rows:
+            yield rows
+            if len(rows) < page_size:
+                return
+            rows = await fetch(*self.query(rows[-1], *args, **kwargs))
@@ -0,0 +1,411 @@
+"""Encode rows in the PostgreSQL binary COPY format."""
+
+import datetime
+import decimal
+import struct
+import uuid
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence, Union
+
+__all__ = ["Encoder", "ENCODERS", "register_encoder", "CopyWriter", "encode_columns"]
+
+
+Encoder = Callable[[Any], bytes]
+
+COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+COPY_TRAILER = struct.pack("!h", -1)
+NULL = struct.pack("!i", -1)
+
+PG_EPOCH = datetime.datetime(2000, 1, 1)
+PG_EPOCH_DATE = PG_EPOCH.date()
+
+_INT16 = struct.Struct("!h")
+_INT32 = struct.Struct("!i")
+_NUMERIC_HEADER = struct.Struct("!hhHH")
+
+NUMERIC_POS = 0x0000
+NUMERIC_NEG = 0x4000
+NUMERIC_NAN = 0xC000
+NUMERIC_PINF = 0xD000
+NUMERIC_NINF = 0xF000
+
+
+def _fixed(fmt: str) -> Encoder:
+    return struct.Struct("!" + fmt).pack
+
+
+def _encode_bool(value: Any) -> bytes:
+    return b"\x01" if value else b"\x00"
+
+
+def _encode_text(value: str) -> bytes:
+    return value.encode("utf-8")
+
+
+def _encode_bytea(value: Any) -> bytes:
+    return bytes(value)
+
+
+def _encode_timestamp(value: datetime.datetime) -> bytes:
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    delta = value - PG_EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+    return struct.pack("!q", micros)
+
+
+def _encode_date(value: datetime.date) -> bytes:
+    return struct.pack("!i", (value - PG_EPOCH_DATE).days)
+
+
+def _encode_uuid(value: Union[uuid.UUID, str]) -> bytes:
+    if not isinstance(value, uuid.UUID):
+        value = uuid.UUID(value)
+    return value.bytes
+
+
+def _encode_numeric(value: Any) -> bytes:
+    if not isinstance(value, decimal.Decimal):
+        value = decimal.Decimal(repr(value) if isinstance(value, float) else value)
+
+    if value.is_nan():
+        return _NUMERIC_HEADER.pack(0, 0, NUMERIC_NAN, 0)
+    if value.is_infinite():
+        return _NUMERIC_HEADER.pack(0, 0, NUMERIC_NINF if value < 0 else NUMERIC_PINF, 0)
+
+    sign, digits, exponent = value.as_tuple()
+    dscale = max(-exponent, 0)
+    number = "".join(map(str, digits)) + "0" * max(exponent, 0)
+
+    # Split around the decimal point, and pad both halves to base-10000 digits.
+    point = len(number) + min(exponent, 0)
+    if point < 0:
+        number = "0" * -point + number
+        point = 0
+    integer, fraction = number[:point], number[point:]
+    integer = integer.zfill((len(integer) + 3) // 4 * 4)
+    fraction = fraction.ljust((len(fraction) + 3) // 4 * 4, "0")
+    padded = integer + fraction
+    groups = [int(padded[i:i + 4]) for i in range(0, len(padded), 4)]
+    weight = len(integer) // 4 - 1
+
+    start = 0
+    while start < len(groups) and groups[start] == 0:
+        start += 1
+    end = len(groups)
+    while end > start and groups[end - 1] == 0:
+        end -= 1
+    groups = groups[start:end]
+    weight = weight - start if groups else 0
+
+    header = _NUMERIC_HEADER.pack(
+        len(groups), weight, NUMERIC_NEG if sign and groups else NUMERIC_POS, dscale
+    )
+    return header + struct.pack(f"!{len(groups)}H", *groups)
+
+
+ENCODERS: Dict[str, Encoder] = {
+    "bool": _encode_bool,
+    "int2": _fixed("h"),
+    "int4": _fixed("i"),
+    "int8": _fixed("q"),
+    "float4": _fixed("f"),
+    "float8": _fixed("d"),
+    "text": _encode_text,
+    "varchar": _encode_text,
+    "bytea": _encode_bytea,
+    "date": _encode_date,
+    "timestamp": _encode_timestamp,
+    "timestamptz": _encode_timestamp,
+    "uuid": _encode_uuid,
+    "numeric": _encode_numeric,
+}
+
+
+# Big-endian NumPy dtypes matching the binary format of fixed-width types.
+NUMPY_DTYPES = {
+    "bool": "?",
+    "int2": ">i2",
+    "int4": ">i4",
+    "int8": ">i8",
+    "float4": ">f4",
+    "float8": ">f8",
+    "date": ">i4",
+    "timestamp": ">i8",
+    "timestamptz": ">i8",
+}
+
+
+def register_encoder(pgtype: str, encoder: Encoder):
+    """Register a binary encoder for a PostgreSQL type.
+
+    Args:
+        pgtype: name of the type, as used in `CopyWriter` type lists.
+        encoder: function returning the binary representation of a value,
+            without the length prefix. It is never called with None.
+    """
+    ENCODERS[pgtype] = encoder
+
+
+class CopyWriter:
+    """Stream rows in the PostgreSQL binary COPY format.
+
+    Fields are written into a single buffer that is reused for the whole
+    stream, and handed out in chunks of roughly `buffer_size` bytes.
+    Each call to `encode()` has its own buffer, so streams may be interleaved.
+
+    Attributes:
+        encoders: encoder used for each column.
+        buffer_size: size at which the buffer is flushed.
+
+    Examples:
+        >>> writer = pq.CopyWriter(["int4", "text"])
+        >>> data = b"".join(writer.encode([(1, "oxy"), (2, None)]))
+    """
+
+    def __init__(self, types: Sequence[Union[str, Encoder]], *, buffer_size: int = 1 << 16):
+        self.encoders = []
+        for pgtype in types:
+            if isinstance(pgtype, str):
+                if pgtype not in ENCODERS:
+                    raise ValueError(f"No binary encoder for type {repr(pgtype)}.")
+                self.encoders.append(ENCODERS[pgtype])
+            else:
+                self.encoders.append(pgtype)
+        self.buffer_size = buffer_size
+
+    def encode(self, rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+        """Encode rows, including the COPY header and trailer.
+
+        Args:
+            rows: iterable of rows, each with one value per column.
+                None is encoded as NULL.
+
+        Yields:
+            Chunks of COPY data.
+        """
+        buf = bytearray(COPY_HEADER)
+
+        width = len(self.encoders)
+        field_count = _INT16.pack(width)
+        pack_length = _INT32.pack
+        encoders = self.encoders
+        for row in rows:
+            if len(row) != width:
+                raise ValueError(f"Expected {width} values per row, got {len(row)}.")
+
+            buf += field_count
+            for encoder, value in zip(encoders, row):
+                if value is None:
+                    buf += NULL
+                else:
+                    data = encoder(value)
+                    buf += pack_length(len(data))
+                    buf += data
+
+            if len(buf) >= self.buffer_size:
+                yield bytes(buf)
+                buf.clear()
+
+        buf += COPY_TRAILER
+        yield bytes(buf)
+
+
+def _numpy():
+    try:
+        import numpy  # pylint: disable=import-outside-toplevel
+    except ImportError as ex:
+        raise ImportError("Columnar COPY requires numpy to be installed.") from ex
+    return numpy
+
+
+# Kinds of NumPy arrays that convert to each type without losing data.
+NUMPY_KINDS = {
+    "bool": "biuf",
+    "int2": "biu",
+    "int4": "biu",
+    "int8": "biu",
+    "float4": "biuf",
+    "float8": "biuf",
+}
+
+
+def _to_wire(np, values: Any, pgtype: str) -> Any:
+    """Convert an array to the big-endian binary representation of a type."""
+    if pgtype in ("timestamp", "timestamptz"):
+        values = np.asarray(values, dtype="datetime64[us]") - np.datetime64(PG_EPOCH, "us")
+    elif pgtype == "date":
+        values = np.asarray(values, dtype="datetime64[D]") - np.datetime64(PG_EPOCH_DATE, "D")
+    else:
+        values = np.asarray(values)
+        if values.dtype.kind not in NUMPY_KINDS[pgtype]:
+            raise TypeError(f"Cannot write an array of {values.dtype} as {pgtype}.")
+
+    dtype = np.dtype(NUMPY_DTYPES[pgtype])
+    if dtype.kind == "i" and values.size and values.dtype.kind in "iu":
+        limits = np.iinfo(dtype)
+        if values.min() < limits.min or values.max() > limits.max:
+            raise ValueError(f"Values out of range for {pgtype}.")
+    return values.astype(dtype, copy=False)
+
+
+def _encode_chunk(np, width: int, fields: Sequence[Any], count: int) -> bytes:
+    """Lay out a chunk of rows with variable-width fields.
+
+    Args:
+        np: the numpy module.
+        width: number of fields per row.
+        fields: per column, a tuple of the byte length of each value, -1 for NULL,
+            and either the values as a 2D array of bytes, one row per non-NULL
+            value, or all non-NULL values joined as bytes.
+        count: number of rows.
+    """
+    row_sizes = np.full(count, 2 + 4 * width, dtype=np.int64)
+    for lengths, _ in fields:
+        row_sizes += np.maximum(lengths, 0)
+    ends = np.cumsum(row_sizes)
+    out = np.empty(int(ends[-1]), dtype=np.uint8)
+
+    pos = ends - row_sizes
+    out[pos[:, None] + np.arange(2)] = np.frombuffer(_INT16.pack(width), dtype=np.uint8)
+    pos += 2
+    for lengths, values in fields:
+        out[pos[:, None] + np.arange(4)] = lengths.astype(">i4").view(np.uint8).reshape(count, 4)
+        pos += 4
+        present = lengths >= 0
+        if isinstance(values, bytes):
+            # Scatter the joined values to the positions of their fields.
+            data = np.frombuffer(values, dtype=np.uint8)
+            sizes = lengths[present]
+            starts = np.cumsum(sizes) - sizes
+            out[np.repeat(pos[present] - starts, sizes) + np.arange(len(data))] = data
+        else:
+            out[pos[present][:, None] + np.arange(values.shape[1])] = values
+        pos += np.maximum(lengths, 0)
+    return out.tobytes()
+
+
+def encode_columns(columns: Sequence[Any],
+                   types: Sequence[str],
+                   nulls: Optional[Sequence[Any]] = None,
+                   *,
+                   chunk_rows: int = 1 << 16) -> Iterator[bytes]:
+    """Encode columns of NumPy arrays in the PostgreSQL binary COPY format.
+
+    If every column has a fixed-width type (see `NUMPY_DTYPES`), whole
+    chunks of rows are laid out as one structured array and written
+    without creating any per-row Python objects. Otherwise, only the values
+    of variable-width columns are encoded one by one, and fields are laid out
+    with array operations.
+
+    Args:
+        columns: one array (or array-like) per column, all of the same length.
+            Masked arrays are written with NULL for masked values.
+        types: PostgreSQL type name of each column.
+        nulls: optional boolean mask per column, True for NULL values.
+        chunk_rows: number of rows encoded per chunk of COPY data.
+
+    Yields:
+        Chunks of COPY data, including the header and trailer.
+    """
+    np = _numpy()
+    if len(types) != len(columns):
+        raise ValueError(f"Expected {len(columns)} types, got {len(types)}.")
+
+    masks = []
+    for i, column in enumerate(columns):
+        mask = np.ma.getmask(column)
+        if nulls is not None and nulls[i] is not None:
+            mask = np.ma.mask_or(mask, np.asarray(nulls[i], dtype=bool))
+        masks.append(None if mask is np.ma.nomask else np.asarray(mask, dtype=bool))
+    columns = [np.ma.getdata(column) for column in columns]
+
+    lengths = {len(column) for column in columns}
+    if len(lengths) > 1:
+        raise ValueError("All columns must have the same length.")
+    count = lengths.pop() if lengths else 0
+
+    if not all(pgtype in NUMPY_DTYPES for pgtype in types):
+        yield from _encode_mixed(np, columns, types, masks, count, chunk_rows)
+        return
+
+    wire = [_to_wire(np, column, pgtype) for column, pgtype in zip(columns, types)]
+    fields = [("count", ">i2")]
+    for i, values in enumerate(wire):
+        fields.extend([(f"length{i}", ">i4"), (f"value{i}", values.dtype)])
+    dtype = np.dtype(fields)
+
+    yield COPY_HEADER
+    for start in range(0, count, chunk_rows):
+        stop = min(start + chunk_rows, count)
+        rows = np.empty(stop - start, dtype=dtype)
+        rows["count"] = len(wire)
+        for i, values in enumerate(wire):
+            rows[f"length{i}"] = values.dtype.itemsize
+            rows[f"value{i}"] = values[start:stop]
+
+        if not any(mask is not None and mask[start:stop].any() for mask in masks):
+            yield rows.tobytes()
+            continue
+
+        # NULL fields have a length of -1 and no value bytes, so drop those bytes.
+        keep = np.ones((stop - start, dtype.itemsize), dtype=bool)
+        for i, mask in enumerate(masks):
+            if mask is None:
+                continue
+            chunk_mask = mask[start:stop]
+            rows[f"length{i}"][chunk_mask] = -1
+            offset = dtype.fields[f"value{i}"][1]
+            keep[chunk_mask, offset:offset + wire[i].dtype.itemsize] = False
+        yield rows.view(np.uint8).reshape(stop - start, dtype.itemsize)[keep].tobytes()
+    yield COPY_TRAILER
+
+
+def _encode_mixed(np,
+                  columns: Sequence[Any],
+                  types: Sequence[str],
+                  masks: Sequence[Any],
+                  count: int,
+                  chunk_rows: int) -> Iterator[bytes]:
+    """Encode columns of which some have a variable-width type, see `encode_columns`."""
+    for pgtype in types:
+        if pgtype not in NUMPY_DTYPES and pgtype not in ENCODERS:
+            raise ValueError(f"No binary encoder for type {repr(pgtype)}.")
+    wire = [
+        _to_wire(np, column, pgtype) if pgtype in NUMPY_DTYPES else np.asarray(column)
+        for column, pgtype in zip(columns, types)
+    ]
+
+    yield COPY_HEADER
+    for start in range(0, count, chunk_rows):
+        stop = min(start + chunk_rows, count)
+        fields = []
+        for values, pgtype, mask in zip(wire, types, masks):
+            nulls = None if mask is None else mask[start:stop]
+            values = values[start:stop]
+            if pgtype in NUMPY_DTYPES:
+                size = values.dtype.itemsize
+                lengths = np.full(stop - start, size, dtype=np.int64)
+                if nulls is not None:
+                    lengths[nulls] = -1
+                    values = values[~nulls]
+                values = np.ascontiguousarray(values)
+                fields.append((lengths, values.view(np.uint8).reshape(len(values), size)))
+                continue
+
+            encoder = ENCODERS[pgtype]
+            if nulls is None:
+                data = [encoder(value) for value in values.tolist()]
+                lengths = np.fromiter(map(len, data), dtype=np.int64, count=len(data))
+            else:
+                data = [
+                    None if null else encoder(value)
+                    for value, null in zip(values.tolist(), nulls.tolist())
+                ]
+                lengths = np.fromiter(
+                    (-1 if value is None else len(value) for value in data),
+                    dtype=np.int64, count=len(data),
+                )
+                data = [value for value in data if value is not None]
+            fields.append((lengths, b"".join(data)))
+        yield _encode_chunk(np, len(wire), fields, stop - start)
+    yield COPY_TRAILER
@@ -0,0 +1,55 @@
+"""RETURNING clause, shared by the queries that write rows."""
+
+from typing import List, Optional, Sequence, Union
+
+from . import types
+from .blocks import CommaSeparated
+from .column import Column, Table
+
+__all__ = ["Returning"]
+
+
+class Returning:
+    """Mixin adding `returning()` to a query that writes rows.
+
+    The query appends `_returning_blocks()` at its end, after any other clause.
+    """
+
+    _returning: Sequence[Union[str, types.Value]] = ()
+
+    def returning(self, *columns: Union[str, types.Value]):
+        """Return values computed from the written rows, eg. generated ids.
+
+        Args:
+            *columns: columns, by name or as `Column`, or expressions,
+                eg. function calls, to return.
+
+        Examples:
+            >>> pq.Insert("user", ["name"]).returning("id", "created").to_query()("oxy")
+            ('INSERT INTO "user" ("name") VALUES ($1) RETURNING "id", "created"', 'oxy')
+        """
+        if not columns:
+            raise ValueError("Give at least one column or expression to return.")
+        for column in columns:
+            if not isinstance(column, (str, types.Value)):
+                raise TypeError(f"Cannot return {repr(column)}, expected a column or value.")
+
+        self._returning = columns
+        return self
+
+    def _returning_blocks(self, table: Optional[Table] = None) -> List[types.BuildingBlock]:
+        """Return the flattened RETURNING clause, or nothing.
+
+        Args:
+            table: table to qualify columns given by name with,
+                where they could be ambiguous.
+        """
+        if not self._returning:
+            return []
+
+        values = [
+            (Column(col, table=table) if table is not None else Column.as_column(col))
+            if isinstance(col, str) else col
+            for col in self._returning
+        ]
+        return ["RETURNING", *CommaSeparated(*values).flatten()]  # type: ignore
@@ -1,19 +1,30 @@
 """SQL select query."""
 
-from typing import Any, List, Mapping, Optional, Sequence, Union
+from typing import Any, List, Mapping, Optional, Sequence, Tuple, Union
 
 from . import types
 from .blocks import CommaSeparated
+from .cache import CachedQuery
+from .emit import Flat, emit
 from .column import Column, Table
 from .expression import Operator
 from .helpers import group
-from .mkquery import mkquery
+from .paginate import Paginator
+from .variable import Variable
 
 
-class Select:
-    """Simple Select query. 
-    
-    Does not support complex joins or relationships in current state.
+JOINS = {
+    "inner": "JOIN",
+    "left": "LEFT JOIN",
+    "right": "RIGHT JOIN",
+    "full": "FULL JOIN",
+}
+
+
+class Select(CachedQuery):
+    """Simple Select query.
+
+    Related rows of other tables are fetched in the same query with `join()`.
 
     Examples:
         >>> pq.Select("id", "name", "pwhash").from_("user").to_query()()
@@ -24,54 +35,130 @@ class Select:
         self.values: List[types.Value] = []
         for val in values:
             if isinstance(val, str):
-                self.values.append(Column(val))
+                self.values.append(Column.as_column(val))
             else:
                 self.values.append(val)
 
         self.constraints: Optional[types.Value] = None
         self.table: Optional[Table] = None
+        self.joins: List[Tuple[str, Table, types.Value]] = []
+        self.order: List[types.Value] = []
+        self.count: Optional[types.Value] = None
 
     def where(self, *constraints: types.Value, **constraints_and: Mapping[str, Any]):
         """Specify constraints to be used.
 
         Takes constraints either as values, eg. expressions,
-        or keyword arguments, eg. id=int
+        or keyword arguments, eg. id=int. Keyword arguments naming
+        columns in the schema of the table are cast to their types,
+        so choose the table with `from_()` first.
 
         Examples:
             >>> pq.Select("id").from_("user").wheree(i)
         """
         self.constraints = group(
-            list(constraints) + [Column(col) == val for col, val in constraints_and.items()],
+            list(constraints) + [
+                Column.as_column(col, self.table) == val for col, val in constraints_and.items()
+            ],
             Operator.and_,
         )
         return self
 
-    def from_(self, table: str):
+    def from_(self, table: Union[Table, str]):
         """Choose table to query from.
 
         Args:
-            table: name of table.
+            table: table, or name of table.
         """
         self.table = Table.as_table(table)
         return self
 
+    def join(self, table: Union[Table, str], on: types.Value, kind: str = "inner"):
+        """Join another table.
+
+        Columns of joined tables are referred to through the table,
+        eg. `posts.col("title")`, and tables can be aliased with `Table.as_()`.
+
+        Args:
+            table: table, or name of table, to join.
+            on: condition that related rows satisfy.
+            kind: "inner", "left", "right" or "full".
+
+        Examples:
+            >>> user, post = pq.Table("user").as_("u"), pq.Table("post").as_("p")
+            >>> pq.Select(user.col("name"), post.col("title")).from_(user).join(
+            ...     post, on=post.col("author") == user.col("id"), kind="left"
+            ... ).to_query()()
+            ('SELECT "u"."name", "p"."title" FROM "user" AS "u" '
+             'LEFT JOIN "post" AS "p" ON "p"."author" = "u"."id"',)
+        """
+        if kind not in JOINS:
+            raise ValueError(f"Unknown join kind {repr(kind)}, expected one of {list(JOINS)}.")
+
+        self.joins = [*self.joins, (JOINS[kind], Table.as_table(table), on)]
+        return self
+
+    def order_by(self, *columns: Union[types.Value, str]):
+        """Choose the values to sort the result by, in ascending order.
+
+        Args:
+            columns: columns, or names of columns, to sort by.
+
+        Examples:
+            >>> pq.Select("id").from_("user").order_by("name", "id")
+        """
+        self.order = [Column.as_column(col, self.table) for col in columns]
+        return self
+
+    def limit(self, count: Any = int):
+        """Limit the number of rows returned.
+
+        Args:
+            count: maximum number of rows, either a value
+                or the default of the `limit` variable.
+
+        Examples:
+            >>> pq.Select("id").from_("user").limit(10).to_query()()
+            ('SELECT "id" FROM "user" LIMIT $1', 10)
+        """
+        self.count = count if isinstance(count, types.Value) else Variable("limit", count)
+        return self
+
+    def paginate(self,
+                 key: Union[types.Value, str, Sequence[Union[types.Value, str]]],
+                 page_size: int = 100) -> Paginator:
+        """Page through the results by key, see `Paginator`.
+
+        Args:
+            key: unique column, or columns, to order the pages by.
+            page_size: default number of rows per page.
+        """
+        keys = key if isinstance(key, (list, tuple)) else [key]
+        return Paginator(self, [Column.as_column(k, self.table) for k in keys], page_size)
+
     def __repr__(self):
         return str(self.to_query())
 
-    def flatten(self) -> Sequence[types.BuildingBlock]:
-        """Flatten into a list of blocks."""
-        columns = CommaSeparated(*self.values).flatten()  # type: ignore
-
-        parts = ["SELECT", *columns]
+    def parts(self) -> Sequence[Any]:
+        """Return the clauses of the query, see `emit.emit`."""
+        parts: List[Any] = ["SELECT", CommaSeparated(*self.values)]  # type: ignore
         if self.table:
-            parts.extend(["FROM", str(self.table)])
+            parts.extend(["FROM", self.table.declaration()])
+
+        for join, table, on in self.joins:
+            parts.extend([join, table.declaration(), "ON", Flat(on)])
 
         if self.constraints is not None:
-            parts.append("WHERE")
-            parts.extend(self.constraints.flatten())
+            parts.extend(["WHERE", Flat(self.constraints)])
+
+        if self.order:
+            parts.extend(["ORDER BY", CommaSeparated(*self.order)])
+
+        if self.count is not None:
+            parts.extend(["LIMIT", self.count])
 
         return parts
 
-    def to_query(self):
-        """Compile into a query function."""
-        return mkquery(self.flatten())
+    def flatten(self) -> Sequence[types.BuildingBlock]:
+        """Flatten into a list of blocks."""
+        return emit(self)
@@ -0,0 +1,107 @@
+"""Stream query results in batches through server-side cursors."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, Protocol, Sequence
+
+__all__ = ["Cursor", "CursorConnection", "stream"]
+
+
+class Cursor(Protocol):  # pylint: disable=too-few-public-methods
+    """Server-side cursor, eg. `asyncpg.cursor.Cursor`."""
+
+    async def fetch(self, n: int) -> Sequence[Any]:
+        """Fetch the next `n` rows, or fewer at the end of the results."""
+        ...
+
+
+class CursorConnection(Protocol):  # pylint: disable=too-few-public-methods
+    """Connection that can open server-side cursors, eg. `asyncpg.Connection`."""
+
+    def cursor(self, query: str, *args: Any, prefetch: Optional[int] = None) -> Awaitable[Cursor]:
+        """Return an awaitable that declares a cursor for a query."""
+        ...
+
+
+async def _batches(conn: CursorConnection,
+                   bound: Sequence[Any],
+                   batch_size: int) -> AsyncIterator[Sequence[Any]]:
+    cursor = await conn.cursor(*bound)
+    while True:
+        rows = await cursor.fetch(batch_size)
+        if not rows:
+            return
+        yield rows
+        if len(rows) < batch_size:
+            return
+
+
+async def _read_ahead(batches: AsyncIterator[Sequence[Any]],
+                      queue: asyncio.Queue):
+    try:
+        async for rows in batches:
+            await queue.put((rows, None))
+    except Exception as ex:  # pylint: disable=broad-except
+        await queue.put((None, ex))
+    else:
+        await queue.put((None, None))
+
+
+async def stream(conn: CursorConnection,
+                 query: Callable[..., Sequence[Any]],
+                 *args: Any,
+                 batch_size: int = 1000,
+                 prefetch: int = 0,
+                 **kwargs: Any) -> AsyncIterator[Sequence[Any]]:
+    """Run a query through a server-side cursor and yield its rows in batches.
+
+    Only `batch_size` rows are fetched at a time, and the next batch is
+    not fetched until the consumer asks for it, so memory use is bounded
+    regardless of the size of the result. With `prefetch`, up to that many
+    batches are fetched ahead while the consumer processes the current one.
+
+    Cursors only live inside a transaction, which the caller must open.
+
+    Args:
+        conn: connection to run the query on, eg. an asyncpg connection.
+        query: compiled query, eg. from `Select.to_query()`.
+        args: arguments of the query.
+        batch_size: number of rows fetched per batch.
+        prefetch: number of batches to fetch ahead of the consumer.
+        kwargs: arguments of the query.
+
+    Yields:
+        Non-empty batches of rows.
+
+    Examples:
+        >>> query = pq.Select("id", "name").from_("user").where(active=bool).to_query()
+        >>> async with conn.transaction():
+        ...     async for rows in pq.stream(conn, query, True, batch_size=5000):
+        ...         write(rows)
+    """
+    if batch_size < 1:
+        raise ValueError(f"Batch size must be positive, got {batch_size}.")
+    if prefetch < 0:
+        raise ValueError(f"Prefetch must not be negative, got {prefetch}.")
+
+    batches = _batches(conn, query(*args, **kwargs), batch_size)
+    if not prefetch:
+        async for rows in batches:
+            yield rows
+        return
+
+    # The reader blocks once the queue is full, until the consumer catches up.
+    queue: asyncio.Queue = asyncio.Queue(maxsize=prefetch)
+    reader = asyncio.ensure_future(_read_ahead(batches, queue))
+    try:
+        while True:
+            rows, error = await queue.get()
+            if error is not None:
+                raise error
+            if rows is None:
+                return
+            yield rows
+    finally:
+        reader.cancel()
+        await asyncio.gather(reader, return_exceptions=True)
@@ -0,0 +1,167 @@
+"""In-memory fakes of database drivers, to test code that runs prequel queries.
+
+These are not imported by `prequel` itself, use `from prequel import testing`.
+"""
+
+import contextlib
+import itertools
+from typing import Any, AsyncIterator, Callable, List, Optional, Sequence, Tuple, Union
+
+__all__ = [
+    "FakeCursor", "FakeStatement", "FakeConnection", "FakeProxy", "FakePool",
+    "InvalidStatementError",
+]
+
+Rows = Union[Sequence[Any], Callable[..., Sequence[Any]]]
+
+
+class FakeCursor:
+    """Server-side cursor over a list of rows.
+
+    Attributes:
+        rows: rows of the result.
+        fetches: number of rows requested by each call to `fetch`.
+    """
+
+    def __init__(self, rows: Sequence[Any]):
+        self.rows = rows
+        self.fetches: List[int] = []
+        self._position = 0
+
+    async def fetch(self, n: int) -> List[Any]:
+        """Return the next `n` rows."""
+        self.fetches.append(n)
+        rows = list(self.rows[self._position:self._position + n])
+        self._position += len(rows)
+        return rows
+
+
+class InvalidStatementError(Exception):
+    """Raised when running a statement that has been deallocated."""
+
+    sqlstate = "26000"
+
+
+class FakeStatement:
+    """Prepared statement of a `FakeConnection`.
+
+    Attributes:
+        query: SQL of the statement.
+        valid: whether the statement still exists on the connection.
+    """
+
+    def __init__(self, connection: "FakeConnection", query: str):
+        self.query = query
+        self.valid = True
+        self._connection = connection
+        self._status = ""
+
+    async def fetch(self, *args: Any) -> List[Any]:
+        """Run the statement and return all rows."""
+        if not self.valid:
+            raise InvalidStatementError("prepared statement does not exist")
+        rows = self._connection._run(self.query, args)  # pylint: disable=protected-access
+        self._status = f"{self.query.split(' ', 1)[0].upper()} {len(rows)}"
+        return rows
+
+    async def fetchrow(self, *args: Any) -> Optional[Any]:
+        """Run the statement and return the first row."""
+        rows = await self.fetch(*args)
+        return rows[0] if rows else None
+
+    def get_statusmsg(self) -> str:
+        """Return the status of the last run."""
+        return self._status
+
+    async def close(self):
+        """Deallocate the statement."""
+        self.valid = False
+
+
+class FakeConnection:
+    """Connection returning canned rows for every query, in the style of asyncpg.
+
+    Attributes:
+        rows: rows returned for every query, or a function
+            taking the query and its arguments and returning rows.
+        queries: every query run so far, with its arguments.
+        cursors: every cursor opened so far.
+        statements: every statement prepared so far.
+
+    Examples:
+        >>> conn = testing.FakeConnection([{"id": 1}, {"id": 2}])
+        >>> rows = await conn.fetch(*query())
+    """
+
+    def __init__(self, rows: Rows = ()):
+        self.rows = rows
+        self.queries: List[Tuple[str, Tuple[Any, ...]]] = []
+        self.cursors: List[FakeCursor] = []
+        self.statements: List[FakeStatement] = []
+
+    def _run(self, query: str, args: Tuple[Any, ...]) -> List[Any]:
+        self.queries.append((query, args))
+        rows = self.rows(query, *args) if callable(self.rows) else self.rows
+        return list(rows)
+
+    async def cursor(self,  # pylint: disable=unused-argument
+                     query: str,
+                     *args: Any,
+                     prefetch: Optional[int] = None) -> FakeCursor:
+        """Declare a cursor for a query."""
+        cursor = FakeCursor(self._run(query, args))
+        self.cursors.append(cursor)
+        return cursor
+
+    async def fetch(self, query: str, *args: Any) -> List[Any]:
+        """Run a query and return all rows."""
+        return self._run(query, args)
+
+    async def prepare(self, query: str) -> FakeStatement:
+        """Prepare a statement for a query."""
+        statement = FakeStatement(self, query)
+        self.statements.append(statement)
+        return statement
+
+    def deallocate(self):
+        """Drop every prepared statement, like `DEALLOCATE ALL`."""
+        for statement in self.statements:
+            statement.valid = False
+
+
+class FakeProxy:
+    """Wrapper of a connection for one acquire, like asyncpg's `PoolConnectionProxy`.
+
+    Like it, proxies cannot be weakly referenced.
+
+    Attributes:
+        connection: wrapped connection.
+    """
+
+    __slots__ = ("connection",)
+
+    def __init__(self, connection: FakeConnection):
+        self.connection = connection
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.connection, name)
+
+
+class FakePool:
+    """Pool handing out `FakeConnection`s in turn.
+
+    Attributes:
+        connections: connections of the pool.
+        proxies: whether to wrap connections in a new `FakeProxy` on every acquire.
+    """
+
+    def __init__(self, rows: Rows = (), size: int = 1, *, proxies: bool = False):
+        self.connections = [FakeConnection(rows) for _ in range(size)]
+        self.proxies = proxies
+        self._next = itertools.cycle(self.connections)
+
+    @contextlib.asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Union[FakeConnection, FakeProxy]]:
+        """Acquire the next connection."""
+        conn = next(self._next)
+        yield FakeProxy(conn) if self.proxies else conn
@@ -1,11 +1,33 @@
 """Type checking information for various Protocols implemented by prequel objects."""
 
-from typing import Any, Dict, List, Protocol, Tuple, Union, runtime_checkable
+from typing import Any, Dict, List, Optional, Protocol, Tuple, Union, runtime_checkable
 
 __all__ = ["QueryArgs", "BaseBlock", "BuildingBlock", "Block", "Value"]
 
 
-QueryArgs = Dict[str, Tuple[Any, Any]]
+class QueryArgs(Dict[str, Tuple[Any, Any]]):
+    """Registry of query arguments, in the order of their placeholders.
+
+    Maps each argument name to its (type, default) pair, and records the
+    `$n` position assigned to a name when it is first registered,
+    and the PostgreSQL type its placeholder is cast to, if any.
+    `compile()` also accepts a plain dict, mapping names to (type, default)
+    pairs in placeholder order, as before this class existed.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.positions: Dict[str, int] = {}
+        self.casts: Dict[str, Optional[str]] = {}
+
+    def __setitem__(self, name: str, info: Tuple[Any, Any]):
+        if name not in self.positions:
+            self.positions[name] = len(self.positions) + 1
+        super().__setitem__(name, info)
+
+    def position(self, name: str) -> int:
+        """Return the 1-based placeholder position of a registered argument."""
+        return self.positions[name]
 
 
 class BaseBlock(Protocol):  # pylint: disable=too-few-public-methods
@@ -13,6 +35,8 @@ class BaseBlock(Protocol):  # pylint: disable=too-few-public-methods
     Abstract class for objects that can be understood by mkquery().
     """
 
+    __slots__ = ()
+
     def compile(self, query_args: QueryArgs) -> str:
         """Compile an object into a finalized string."""
         ...
@@ -24,6 +48,8 @@ BuildingBlock = Union[str, BaseBlock]
 class Block(Protocol):  # pylint: disable=too-few-public-methods
     """Abstract class that implements a basic query block object."""
 
+    __slots__ = ()
+
     def flatten(self) -> List[BuildingBlock]:
         """Flattens a block to a list of building blocks."""
         ...
@@ -42,6 +68,8 @@ class Value(Block, Protocol):
         which converts any object to a Value when used to form a Constraint.
     """
 
+    __slots__ = ()
+
     def as_value(self) -> List[BuildingBlock]:
         ...
 
@@ -1,15 +1,19 @@
-from typing import Any, Mapping, Optional, Sequence, Union
+import itertools
+from typing import Any, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
 
 from . import types
 from .blocks import CommaSeparated
+from .cache import CachedQuery
+from .emit import Flat, emit
 from .column import Column, Table
 from .expression import Expression, Operator
 from .helpers import group
-from .mkquery import mkquery
+from .returning import Returning
+from .utils import quote_ident, transpose
 from .variable import Variable
 
 
-class Update:
+class Update(Returning, CachedQuery):
     """SQL Update query.
 
     Examples:
@@ -22,6 +26,11 @@ class Update:
         self.table = Table.as_table(table)
         self.updates: Sequence[types.Block] = []
         self.constraints = None
+        self._bulk: Optional[Tuple[List[Column], List[Column], List[str]]] = None
+        # Columns and values given to set() and where(), to qualify
+        # the columns of the table in bulk updates.
+        self._assignments: List[Tuple[Column, Any]] = []
+        self._where: Tuple[List[Any], List[Tuple[str, Any]]] = ([], [])
 
     def set(self, 
             *columns: Sequence[Union[str, Column]],
@@ -34,36 +43,216 @@ class Update:
         ('UPDATE "user" SET "name" = $1 WHERE id = $2', 'Oxy', 101)
         """
 
-        var_updates = [Column(col) == Variable(col) for col in columns]
-        fixed_updates = [Column(col) == val for col, val in updates.items()]
+        assignments = []
+        for col in columns:
+            column = Column.as_column(col, self.table)
+            assignments.append((column, Variable(column.as_arg(), cast=column.pgtype)))
+        assignments.extend(
+            (Column.as_column(col, self.table), val) for col, val in updates.items()
+        )
 
-        self.updates.extend([*var_updates, *fixed_updates])
+        self.updates = [*self.updates, *(column == val for column, val in assignments)]
+        self._assignments = [*self._assignments, *assignments]
         return self
 
     def where(self, *constraints: types.Value, **constraints_and: Mapping[str, Any]):
         """Specify constraints to be used. TODO complete
         """
+        self._where = (list(constraints), list(constraints_and.items()))
         self.constraints = group(
-            list(constraints) + [Column(col) == val for col, val in constraints_and.items()],
+            list(constraints) + [
+                Column.as_column(col, self.table) == val for col, val in constraints_and.items()
+            ],
             Operator.and_,
         )
         return self
 
+    def bulk(self,
+             key: Union[str, Column, Sequence[Union[str, Column]]],
+             columns: Sequence[Union[str, Column]],
+             column_types: Optional[Sequence[str]] = None):
+        """Update many rows, matched by key, from arrays of values.
+
+        The query takes one array argument per key and column, joined
+        with `FROM unnest()`, so its text is the same for any number of rows.
+        Updates from `set()` and constraints from `where()` still apply, with
+        the columns they name by keyword qualified by the table, eg. `"user"."name"`,
+        so they are not ambiguous with the columns of the arrays. A variable
+        of `where()` named like an array is renamed after the qualified column,
+        eg. `user_name`.
+        Constraints and values given as expressions are not rewritten: they raise
+        ValueError if they name a column of the arrays without its table, or
+        reuse the name of an array for a variable.
+
+        Args:
+            key: key column, or columns, to match rows by.
+            columns: columns to update.
+            column_types: PostgreSQL type of each key and column, eg. `int8`.
+                Defaults to the types of the columns.
+
+        Examples:
+            >>> update = pq.Update("user").bulk("id", ["name"], ["int8", "text"])
+            >>> update.to_query().sql
+            'UPDATE "user" SET "name" = "v"."name" '
+            'FROM unnest ($1::int8[], $2::text[]) AS "v" ("id", "name") '
+            'WHERE "user"."id" = "v"."id"'
+            >>> list(update.batches([(1, "a"), (2, "b")]))
+            [('UPDATE "user" SET "name" = "v"."name" FROM unnest ...', [1, 2], ['a', 'b'])]
+        """
+        keys = key if isinstance(key, (list, tuple)) else [key]
+        keys = [Column.as_column(col, self.table) for col in keys]
+        values = [Column.as_column(col, self.table) for col in columns]
+        if column_types is None:
+            column_types = [col.pgtype for col in keys + values]
+            missing = [col.column for col in keys + values if col.pgtype is None]
+            if missing:
+                raise ValueError(f"No types given, and columns {missing} have no type.")
+        if len(column_types) != len(keys) + len(values):
+            raise ValueError(
+                f"Expected {len(keys) + len(values)} types, got {len(column_types)}."
+            )
+
+        self._bulk = (keys, values, list(column_types))
+        return self
+
+    def batches(self,
+                rows: Iterable[Sequence[Any]],
+                *,
+                batch_size: int = 1000,
+                **kwargs: Any) -> Iterator[Tuple[Any, ...]]:
+        """Bind rows to a bulk update, in batches.
+
+        Every batch uses the same query, see `bulk()`.
+
+        Args:
+            rows: iterable of rows, each with the values of the keys and then the columns.
+            batch_size: maximum number of rows per batch.
+            kwargs: other arguments of the query, eg. from `where()`.
+
+        Yields:
+            Tuples of query and arguments, like those returned by `to_query()`.
+        """
+        if self._bulk is None:
+            raise ValueError("Update is not a bulk update, call Update.bulk() first.")
+        if batch_size < 1:
+            raise ValueError(f"Batch size must be positive, got {batch_size}.")
+
+        keys, values, _ = self._bulk
+        names = [col.as_arg() for col in keys + values]
+        query = self.to_query()
+        rows = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows, batch_size))
+            if not chunk:
+                return
+            yield query(**dict(zip(names, transpose(chunk, len(names)))), **kwargs)
+
+    def _qualify(self, value: Any) -> Any:
+        """Qualify a column without a table by the updated table."""
+        if isinstance(value, Column) and value.table is None:
+            return Column(value.column, table=self.table, pgtype=value.pgtype)
+        return value
+
+    @staticmethod
+    def _check_bulk(value: Any, arrays: Sequence[str], columns: Sequence[str]):
+        """Check that a value given to `set()` or `where()` is unambiguous in a bulk update.
+
+        Args:
+            value: value, eg. an expression.
+            arrays: names of the array arguments, which variables must not reuse.
+            columns: SQL names of the columns of the arrays, which must be qualified.
+        """
+        if not isinstance(value, types.Value):
+            return
+        for block in emit(value):
+            if isinstance(block, Variable) and block.name in arrays:
+                raise ValueError(
+                    f"Variable {repr(block.name)} has the name of an array of the bulk update,"
+                    " rename it."
+                )
+            if isinstance(block, str) and block in columns:
+                raise ValueError(
+                    f"Column {block} is ambiguous in a bulk update,"
+                    " qualify it with its table, eg. with Table.col()."
+                )
+
+    def _bulk_constraints(self, arrays: Sequence[str]) -> Optional[types.Value]:
+        """Return the constraints of `where()`, with the columns of the table qualified.
+
+        Constraints given as values, rather than by keyword, are only checked,
+        see `_check_bulk`.
+
+        Args:
+            arrays: names of the array arguments, which variables must not reuse.
+        """
+        constraints, constraints_and = self._where
+        if not constraints and not constraints_and:
+            return self.constraints
+        columns = [quote_ident(name) for name in self._bulk_columns()]
+        for constraint in constraints:
+            self._check_bulk(constraint, arrays, columns)
+        qualified = []
+        for col, val in constraints_and:
+            column = Column(col, table=self.table)
+            if not isinstance(val, types.Value):
+                name = Column.as_column(col).as_arg()
+                if name in arrays:
+                    name = column.as_arg()
+                val = Variable(name, val, cast=column.pgtype)
+            qualified.append(column == self._qualify(val))
+        return group(constraints + qualified, Operator.and_)
+
+    def _bulk_columns(self) -> List[str]:
+        keys, values, _ = self._bulk  # type: ignore
+        return [col.column for col in keys + values]
+
+    def _bulk_parts(self) -> List[Any]:
+        keys, values, pgtypes = self._bulk  # type: ignore
+        alias = "v" if self.table.name != "v" else "v_"
+        source = Table(alias)
+        updates = [Column.as_column(col.column) == source.col(col.column) for col in values]
+        array_names = [col.as_arg() for col in keys + values]
+        columns = [quote_ident(name) for name in self._bulk_columns()]
+        for _, val in self._assignments:
+            if not isinstance(val, Column):
+                self._check_bulk(val, array_names, columns)
+        updates.extend(column == self._qualify(val) for column, val in self._assignments)
+        arrays = [
+            Variable(col.as_arg(), list, cast=pgtype + "[]")
+            for col, pgtype in zip(keys + values, pgtypes)
+        ]
+        names = [Column.as_column(col.column) for col in keys + values]
+        matches = [Column(col.column, table=self.table) == source.col(col.column) for col in keys]
+        constraints = self._bulk_constraints(array_names)
+        if constraints is not None:
+            matches.append(constraints)
+        return [
+            "UPDATE", self.table.declaration(),
+            "SET", CommaSeparated(*updates),  # type: ignore
+            "FROM unnest", "(", CommaSeparated(*arrays), ")",  # type: ignore
+            "AS", str(source), "(", CommaSeparated(*names), ")",  # type: ignore
+            "WHERE", Flat(group(matches, Operator.and_)),
+            *self._returning_blocks(self.table),
+        ]
+
     def __repr__(self):
         return str(self.to_query())
 
-    def flatten(self) -> Sequence[types.BuildingBlock]:
-        """Flatten into a list of blocks."""
-        columns = CommaSeparated(*self.updates).flatten()  # type: ignore
+    def parts(self) -> Sequence[Any]:
+        """Return the clauses of the query, see `emit.emit`."""
+        if self._bulk is not None:
+            return self._bulk_parts()
 
-        parts = ["UPDATE", str(self.table), "SET", *columns]
+        parts: List[Any] = [
+            "UPDATE", self.table.declaration(), "SET", CommaSeparated(*self.updates)  # type: ignore
+        ]
 
         if self.constraints is not None:
-            parts.append("WHERE")
-            parts.extend(self.constraints.flatten())
+            parts.extend(["WHERE", Flat(self.constraints)])
+        parts.extend(self._returning_blocks())
 
         return parts
 
-    def to_query(self):
-        """Compile into a query function."""
-        return mkquery(self.flatten())
+    def flatten(self) -> Sequence[types.BuildingBlock]:
+        """Flatten into a list of blocks."""
+        return emit(self)
@@ -2,11 +2,12 @@
 
 import keyword
 import re
+from typing import Any, Iterable, List, Sequence
 
-__all__ = ["quote_ident", "clean_ident"]
+__all__ = ["quote_ident", "clean_ident", "transpose"]
 
 
-CLEAN_IDENT_RE = re.compile(r"[\w]")
+UNCLEAN_IDENT_RE = re.compile(r"[^\w]+")
 QUOTE_TABLE = str.maketrans({"\0": "\\0", '"': '""', "\\": "\\\\"})
 
 
@@ -37,7 +38,26 @@ def clean_ident(ident: str):
     Returns:
         Escaped and quoted identifier.
     """
-    clean = "".join([ch for ch in ident if CLEAN_IDENT_RE.match(ch)])
+    clean = UNCLEAN_IDENT_RE.sub("", ident)
     if not clean.isidentifier() or keyword.iskeyword(clean):
         clean = "_" + clean
     return clean
+
+
+def transpose(rows: Iterable[Sequence[Any]], width: int) -> List[List[Any]]:
+    """Transpose rows of values into columns.
+
+    Args:
+        rows: Rows to transpose, each with `width` values.
+        width: Number of values in each row.
+
+    Returns:
+        One list of values per column.
+    """
+    rows = rows if isinstance(rows, Sequence) else list(rows)
+    for row in rows:
+        if len(row) != width:
+            raise ValueError(f"Expected {width} values per row, got {len(row)}.")
+    if not rows:
+        return [[] for _ in range(width)]
+    return [list(column) for column in zip(*rows)]
@@ -2,7 +2,7 @@
 
 import keyword
 import warnings
-from typing import Any, List
+from typing import Any, List, Optional, Tuple
 
 from . import types
 from .expression import ValueMixin
@@ -10,6 +10,11 @@ from .expression import ValueMixin
 __all__ = ["Variable"]
 
 
+def _warn_conflict(name: str, res: Tuple[Any, Any], other: Tuple[Any, Any]):
+    """Warn that a variable name is used with different types or defaults."""
+    warnings.warn(f"Variable with name {repr(name)} has multiple types/values: {res} and {other}")
+
+
 class Variable(ValueMixin, types.BaseBlock):
     """Provide a building block for SQL variables.
 
@@ -19,13 +24,17 @@ class Variable(ValueMixin, types.BaseBlock):
         default: Default value for the variable,
             None indicates a default of NULL,
             Ellipsis indicates no default.
+        cast: (optional) PostgreSQL type to cast the placeholder to, eg. `int8[]`.
     """
 
-    def __init__(self, name: str, default: Any = ...):
+    __slots__ = ("name", "default", "cast", "_boolean")
+
+    def __init__(self, name: str, default: Any = ..., *, cast: Optional[str] = None):
         if not name.isidentifier() or keyword.iskeyword(name):
             raise ValueError("Cannot use {repr(name)} as a variable name.")
         self.name = name
         self.default = default
+        self.cast = cast
         self._boolean = isinstance(default, bool)
 
     def flatten(self) -> List[types.BuildingBlock]:
@@ -34,35 +43,42 @@ class Variable(ValueMixin, types.BaseBlock):
     def as_value(self) -> List[types.BuildingBlock]:
         return [self]
 
-    def compile(self, query_args: types.QueryArgs) -> str:
+    def query_arg(self) -> Tuple[Any, Any]:
+        """Return the type and default of the variable, as kept in `types.QueryArgs`."""
         if self.default is Ellipsis or self.default is None:
-            type_ = Any  # type: ignore
-            default = self.default
-        elif isinstance(self.default, type):
-            type_ = self.default
-            default = Ellipsis
-        else:
-            type_ = type(self.default)
-            default = self.default
+            return Any, self.default
+        if isinstance(self.default, type):
+            return self.default, Ellipsis
+        return type(self.default), self.default
 
-        res = (type_, default)
+    def compile(self, query_args: types.QueryArgs) -> str:
+        res = self.query_arg()
 
         if self.name in query_args:
             if res != query_args[self.name]:
-                warnings.warn(
-                    f"Variable with name {repr(self.name)} has multiple types/values: \
-{res} and {query_args[self.name]}"
-                )
+                _warn_conflict(self.name, res, query_args[self.name])
         else:
             query_args[self.name] = res
+            if isinstance(query_args, types.QueryArgs):
+                query_args.casts[self.name] = self.cast
 
-        index = list(query_args.keys()).index(self.name) + 1
-        return f"${index}"
+        if isinstance(query_args, types.QueryArgs):
+            position = query_args.position(self.name)
+        else:
+            # Plain dicts, which compile() took before QueryArgs, are still
+            # accepted, but positions are looked up in linear time.
+            position = list(query_args).index(self.name) + 1
+        placeholder = f"${position}"
+        if self.cast:
+            placeholder += "::" + self.cast
+        return placeholder
 
     def __repr__(self):
         default_part = ""
         if self.default is not Ellipsis:
             default_part = ", " + repr(self.default)
+        if self.cast:
+            default_part += f", cast={repr(self.cast)}"
         return f"{self.__class__.__name__}({repr(self.name)}{default_part})"
 
     @property
@@ -0,0 +1,33 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import json
+
+from prequel import bench
+
+
+def test_run_all_cases():
+    results = list(bench.run(sizes=[3], repeat=1, min_time=0))
+    assert [res["name"] for res in results] == list(bench.CASES)
+    assert all(res["seconds"] > 0 and res["loops"] == 1 for res in results)
+
+
+def test_run_prefix():
+    results = list(bench.run(["bind."], sizes=[1, 2], repeat=2, min_time=0))
+    names = {res["name"] for res in results}
+    assert names == {"bind.select", "bind.select_keywords", "bind.insert"}
+    assert len(results) == 6
+
+
+def test_main_json(tmp_path, capsys):
+    output = tmp_path / "results.json"
+    args = ["compile.select", "--sizes", "2", "--repeat", "1", "--min-time", "0"]
+    bench.main(args + ["-o", str(output)])
+    report = json.loads(output.read_text())
+    assert [res["name"] for res in report["results"]] == ["compile.select"]
+
+    bench.main(args + ["--compare", str(output)])
+    out, err = capsys.readouterr()
+    assert json.loads(out)["results"][0]["size"] == 2
+    assert err.startswith("compile.select")
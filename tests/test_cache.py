@@ -0,0 +1,146 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import inspect
+import warnings
+
+import pytest
+import prequel as pq
+
+
+@pytest.fixture
+def cache():
+    return pq.QueryCache(maxsize=2)
+
+
+def test_fingerprint_equal():
+    a = pq.Select("id").from_("user").where(id=int).flatten()
+    b = pq.Select("id").from_("user").where(id=int).flatten()
+    assert pq.fingerprint(a) == pq.fingerprint(b)
+
+
+@pytest.mark.parametrize("other", [
+    pq.Select("id").from_("users").where(id=int),
+    pq.Select("id").from_("user").where(uid=int),
+    pq.Select("id").from_("user").where(id=str),
+    pq.Select("id").from_("user").where(id=1),
+    pq.Select("id").from_("user").where(id=True),
+    pq.Select("id").from_("user").where(pq.Column("id") > 1),
+])
+def test_fingerprint_differs(other):
+    base = pq.Select("id").from_("user").where(id=int)
+    assert pq.fingerprint(base.flatten()) != pq.fingerprint(other.flatten())
+
+
+def test_fingerprint_ignores_default_values():
+    key = pq.fingerprint([pq.Variable("ids", [1, 2])])
+    assert key == pq.fingerprint([pq.Variable("ids", [1, 3])])
+    assert key != pq.fingerprint([pq.Variable("ids", (1, 3))])
+
+
+def test_cache_hit(cache):
+    query = cache.mkquery(["SELECT", pq.Variable("a")])
+    assert cache.mkquery(["SELECT", pq.Variable("a")]) is query
+    assert cache.info() == pq.CacheInfo(hits=1, misses=1, maxsize=2, currsize=1)
+
+
+def test_cache_evicts_lru(cache):
+    first = cache.mkquery(["SELECT", "1"])
+    cache.mkquery(["SELECT", "2"])
+    cache.mkquery(["SELECT", "1"])
+    cache.mkquery(["SELECT", "3"])
+    assert len(cache) == 2
+    assert cache.mkquery(["SELECT", "1"]) is first
+    assert cache.misses == 3
+
+
+def test_cache_resize(cache):
+    cache.mkquery(["SELECT", "1"])
+    cache.mkquery(["SELECT", "2"])
+    cache.maxsize = 1
+    assert len(cache) == 1
+
+
+def test_cache_disabled():
+    cache = pq.QueryCache(maxsize=0)
+    assert cache.mkquery(["SELECT"]) is not cache.mkquery(["SELECT"])
+    assert len(cache) == 0
+
+
+def test_cache_invalidate(cache):
+    query = cache.mkquery(["SELECT", "1"])
+    assert cache.invalidate(["SELECT", "1"])
+    assert not cache.invalidate(["SELECT", "1"])
+    assert cache.mkquery(["SELECT", "1"]) is not query
+
+
+def test_cache_clear(cache):
+    cache.mkquery(["SELECT", "1"])
+    cache.mkquery(["SELECT", "1"])
+    cache.clear()
+    assert cache.info() == pq.CacheInfo(hits=0, misses=0, maxsize=2, currsize=0)
+
+
+def test_to_query_shared():
+    first = pq.Update("user").set(name=str).where(id=int).to_query()
+    second = pq.Update("user").set(name=str).where(id=int).to_query()
+    assert first is second
+    assert first("oxy", 1) == ('UPDATE "user" SET "name" = $1 WHERE "id" = $2', "oxy", 1)
+
+
+def test_cache_defaults_per_query(cache):
+    first = cache.mkquery(["SELECT", pq.Variable("id", 1)])
+    second = cache.mkquery(["SELECT", pq.Variable("id", 2)])
+    assert first() == ("SELECT $1", 1)
+    assert second() == ("SELECT $1", 2)
+    assert str(inspect.signature(second)) == "(id: int = 2) -> Tuple[str, int]"
+    assert second.query_args["id"] == (int, 2)
+    assert cache.mkquery(["SELECT", pq.Variable("id", 1)]) is first
+    assert cache.info() == pq.CacheInfo(hits=2, misses=1, maxsize=2, currsize=1)
+
+
+def test_cache_mutable_defaults_not_shared(cache):
+    ids = [1, 2]
+    first = cache.mkquery(["SELECT", pq.Variable("ids", ids)])
+    second = cache.mkquery(["SELECT", pq.Variable("ids", [1, 2])])
+    assert first is not second
+    assert first()[1] is ids
+    assert second()[1] is not ids
+
+
+def test_to_query_memoized():
+    select = pq.Select("id").from_("user").where(id=int)
+    query = select.to_query()
+    hits = pq.query_cache.hits
+    assert select.to_query() is query
+    assert pq.query_cache.hits == hits
+
+
+def test_to_query_memo_invalidated():
+    select = pq.Select("id").from_("user")
+    assert select.to_query().sql == 'SELECT "id" FROM "user"'
+    select.where(id=int)
+    assert select.to_query().sql == 'SELECT "id" FROM "user" WHERE "id" = $1'
+    select.join("post", pq.Column("author", table="post") == pq.Column("id", table="user"))
+    assert "JOIN" in select.to_query().sql
+    update = pq.Update("user").set("name")
+    assert update.to_query().sql == 'UPDATE "user" SET "name" = $1'
+    update.set("age")
+    assert update.to_query().sql == 'UPDATE "user" SET "name" = $1, "age" = $2'
+    select = pq.Select("id").from_("user")
+    select.to_query()
+    select.values = [*select.values, pq.Column("name")]
+    assert select.to_query().sql == 'SELECT "id", "name" FROM "user"'
+
+
+def test_cache_hit_warns_conflict(cache):
+    blocks = ["SELECT", pq.Variable("a", 1), pq.Variable("a", 2)]
+    with pytest.warns(UserWarning, match="multiple types/values"):
+        cache.mkquery(blocks)
+    with pytest.warns(UserWarning, match="multiple types/values"):
+        cache.mkquery(["SELECT", pq.Variable("a", 3), pq.Variable("a", 4)])
+    assert cache.info().hits == 1
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        cache.mkquery(["SELECT", pq.Variable("a", 5), pq.Variable("a", 5)])
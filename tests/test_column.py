@@ -4,7 +4,9 @@
 # pylint: disable=missing-class-docstring
 # pylint: disable=missing-function-docstring
 
+import copy
 import operator
+import pickle
 
 import pytest
 import prequel as pq
@@ -69,3 +71,91 @@ def test_astable_table():
 def test_astable_wrongtype():
     with pytest.raises(TypeError):
         pq.Table.as_table(0.1)
+
+
+@pytest.mark.parametrize("ids", [[1], [1, 2, 3], list(range(100))])
+def test_in_constant_shape(ids):
+    query = pq.Select("id").from_("user").where(pq.Column("id").in_(list)).to_query()
+    assert query(ids) == ('SELECT "id" FROM "user" WHERE "id" = ANY ($1)', ids)
+
+
+def test_in_variable_name():
+    assert pq.Column("id", table="user").in_([1]).array.name == "user_id_in"
+    assert pq.Column("id").not_in([1]).array.name == "id_not_in"
+
+
+def test_table_interned():
+    assert pq.Table("user") is pq.Table("user")
+    assert pq.Table("user") is not pq.Table("users")
+
+
+def test_column_interned():
+    table = pq.Table("user")
+    assert table.col("id") is table.col("id")
+    assert table.col("id") is pq.Column("id", table="user")
+    assert pq.Column("id") is pq.Column("id")
+    assert pq.Column("id") is not table.col("id")
+
+
+def test_column_interned_copy():
+    col = pq.Table("user").col("id")
+    assert copy.copy(col) is col
+    assert pickle.loads(pickle.dumps(col)) is col
+
+
+def test_interned_immutable():
+    table = pq.Table("user")
+    col = table.col("id")
+    with pytest.raises(AttributeError):
+        table.alias = "u"
+    with pytest.raises(AttributeError):
+        col.pgtype = "int8"
+    with pytest.raises(AttributeError):
+        del col.column
+    assert (table.alias, str(col), col.pgtype) == (None, '"user"."id"', None)
+
+
+def test_column_cached_sql():
+    col = pq.Column("user id", table='my"table')
+    assert col.parts() == ('"my""table"."user id"',)
+    assert col.as_arg() == "mytable_userid"
+
+
+USERS = pq.Table("user", {"id": "int8", "uid": "uuid", "name": "text"})
+
+
+def test_schema_cast():
+    query = pq.Select("name").from_(USERS).where(id=int).to_query()
+    assert query(1) == ('SELECT "name" FROM "user" WHERE "id" = $1::int8', 1)
+    assert query.pgtypes == ("int8",)
+
+
+def test_schema_column_cast():
+    query = pq.Select("id").from_(USERS).where(
+        USERS.col("uid") == str, USERS.col("id").in_(list), pq.Column("other") == 1
+    ).to_query()
+    assert query.sql == (
+        'SELECT "id" FROM "user" WHERE ("user"."uid" = $1::uuid) '
+        'AND ("user"."id" = ANY ($2::int8[])) AND ("other" = $3)'
+    )
+    assert query.pgtypes == ("uuid", "int8[]", None)
+
+
+def test_schema_update():
+    query = pq.Update(USERS).set("name").where(id=int).to_query()
+    assert query.sql == 'UPDATE "user" SET "name" = $1::text WHERE "id" = $2::int8'
+
+
+def test_schema_unknown_column():
+    with pytest.raises(ValueError):
+        USERS.col("email")
+
+
+def test_schema_interned():
+    assert pq.Table("user", {"id": "int8", "uid": "uuid", "name": "text"}) is USERS
+    assert pq.Table("user", {"name": "text", "id": "int8", "uid": "uuid"}) is USERS
+    assert pq.Table("user", {"id": "int8", "uid": "uuid", "name": "varchar"}) is not USERS
+    assert pq.Table("user") is not USERS
+    assert pq.Table("user").pgtype("id") is None
+    assert USERS.col("id").pgtype == "int8"
+    assert pq.Column("id", pgtype="int4").pgtype == "int4"
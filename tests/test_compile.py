@@ -0,0 +1,103 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import datetime
+import importlib
+import inspect
+import sys
+import types
+import typing
+from pathlib import Path
+
+import pytest
+import prequel as pq
+from prequel import compile as pq_compile
+
+QUERIES = '''
+import datetime
+
+import prequel as pq
+
+get_user = pq.Select("id", "name").from_("user").where(id=int).to_query()
+list_users = pq.Select("id").from_("user").where(pq.Column("name").like("a%"), active=True)
+insert_user = pq.Insert("user", ["id", "name"])
+tenant_user = pq.Select("id").from_("user").where(tenant=int, id=int).to_query().partial(tenant=7)
+user_logins = pq.Select("id").from_("login").where(day=datetime.date)
+keyword_only = pq.Select("id").from_("user").where(active=True, id=int).to_query()
+_private = pq.Select("id").from_("user")
+'''
+
+
+@pytest.fixture
+def compiled(tmp_path, monkeypatch):
+    (tmp_path / "aot_queries.py").write_text(QUERIES)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    pq_compile.main(["aot_queries", "-o", str(tmp_path / "aot_compiled.py")])
+    yield importlib.import_module("aot_compiled"), importlib.import_module("aot_queries")
+    del sys.modules["aot_compiled"], sys.modules["aot_queries"]
+
+
+def test_find_queries():
+    module = types.ModuleType("queries")
+    module.query = pq.Select("id").from_("user").to_query()
+    module.builder = pq.Update("user").set(name=str)
+    module.Select = pq.Select
+    module.other = 1
+    assert list(pq_compile.find_queries(module)) == ["query", "builder"]
+
+
+def test_compiled_module(compiled):
+    module, original = compiled
+    assert module.__all__ == [
+        "get_user", "list_users", "insert_user", "tenant_user", "user_logins", "keyword_only",
+    ]
+    assert module.get_user(1) == original.get_user(1)
+    assert module.get_user(id=2) == original.get_user(id=2)
+    assert module.list_users() == original.list_users.to_query()()
+    assert module.insert_user(1, name="oxy") == original.insert_user.to_query()(1, "oxy")
+    assert module.get_user.sql == original.get_user.sql
+    assert module.tenant_user(1) == original.tenant_user(1)
+    assert module.keyword_only(False, id=1) == original.keyword_only(False, id=1)
+
+
+@pytest.mark.parametrize("args,kwargs", [((), {}), ((1, 2), {}), ((1,), {"other": 1})])
+def test_compiled_errors(compiled, args, kwargs):
+    module, original = compiled
+    with pytest.raises(TypeError):
+        original.get_user(*args, **kwargs)
+    with pytest.raises(TypeError):
+        module.get_user(*args, **kwargs)
+
+
+@pytest.mark.parametrize("name", ["get_user", "list_users", "tenant_user", "keyword_only"])
+def test_compiled_signatures(compiled, name):
+    module, original = compiled
+    query = getattr(original, name)
+    query = query.to_query() if hasattr(query, "to_query") else query
+    params = inspect.signature(getattr(module, name)).parameters.values()
+    assert [(param.name, param.kind, param.default) for param in params] == [
+        (param.name, param.kind, param.default)
+        for param in inspect.signature(query).parameters.values()
+    ]
+
+
+def test_compiled_module_standalone(compiled):
+    module, _ = compiled
+    source = Path(module.__file__).read_text()
+    assert "prequel" not in source.split('"""', 2)[2]
+    assert "_pq_enabled" not in source
+
+
+def test_compiled_type_hints(compiled):
+    module, _ = compiled
+    assert typing.get_type_hints(module.user_logins) == {
+        "day": datetime.date, "return": typing.Tuple[str, datetime.date],
+    }
+    assert typing.get_type_hints(module.get_user)["id"] is int
+
+
+def test_non_literal_default():
+    query = pq.Select("id").from_("user").where(day=datetime.date(2020, 1, 1)).to_query()
+    with pytest.raises(ValueError):
+        pq_compile.generate({"query": query})
@@ -0,0 +1,67 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import sys
+
+import pytest
+import prequel as pq
+from prequel.emit import emit, join
+
+
+class Legacy(pq.ValueMixin):
+    def flatten(self):
+        return ["legacy"]
+
+    def as_value(self):
+        return ["(", "legacy", ")"]
+
+
+@pytest.mark.parametrize("parts,expected", [
+    (["SELECT", "a", ",", "b"], "SELECT a, b"),
+    (["COUNT", "(", "a", ")"], "COUNT (a)"),
+    (["(", "(", "a", ")", ")"], "((a))"),
+    (["a", "", ","], "a,"),
+    ([], ""),
+])
+def test_join(parts, expected):
+    assert join(parts) == expected
+
+
+def test_emit_value_parenthesized():
+    expr = pq.Column("a") == pq.Column("b")
+    assert emit(expr) == ['"a"', "=", '"b"']
+    assert emit(expr, True) == ["(", '"a"', "=", '"b"', ")"]
+
+
+def test_emit_flat_child():
+    block = pq.CommaSeparated(pq.Column("a") + pq.Column("b"), "c")
+    assert emit(block) == ['"a"', "+", '"b"', ",", "c"]
+
+
+def test_emit_legacy_value():
+    expr = pq.Expression(Legacy(), pq.Operator.eq, pq.Variable("a"))
+    assert emit(expr) == ["(", "legacy", ")", "=", pq.Variable("a")]
+    assert emit(pq.CommaSeparated(Legacy())) == ["legacy"]
+
+
+def test_emit_deeper_than_recursion_limit():
+    depth = sys.getrecursionlimit() * 2
+    expr = pq.Column("c0")
+    for i in range(1, depth):
+        expr = pq.Expression(expr, pq.Operator.sub, pq.Column(f"c{i}"))
+    sql, = pq.mkquery(emit(expr))()
+    assert sql.startswith("(" * (depth - 2) + '"c0" - "c1")')
+    assert sql.endswith(f' - "c{depth - 1}"')
+
+
+def test_between_as_value():
+    expr = pq.Column("a").between(1, 2)
+    assert emit(expr, True)[0] == "("
+    sql, *_ = pq.Select("id").where(expr, b=1).to_query()()
+    assert sql == 'SELECT "id" WHERE ("a" BETWEEN $1 AND $2) AND ("b" = $3)'
+
+
+def test_function_call_args():
+    call = pq.FunctionCall(pq.Function.count, [pq.Column("id")])
+    assert pq.mkquery(pq.Select(call).flatten())() == ('SELECT COUNT ("id")',)
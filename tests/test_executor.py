@@ -0,0 +1,101 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import asyncio
+
+import pytest
+import prequel as pq
+from prequel import testing
+
+SELECT = pq.Select("id").from_("user").where(id=int).to_query()
+UPDATE = pq.Update("user").set(name=str).where(id=int).to_query()
+
+
+def test_prepare_once_per_connection():
+    pool = testing.FakePool([(1,)], size=2)
+    executor = pq.Executor(pool)
+
+    async def run():
+        return [await executor.fetch(SELECT, 1) for _ in range(4)]
+
+    assert asyncio.run(run()) == [[(1,)]] * 4
+    assert [len(conn.statements) for conn in pool.connections] == [1, 1]
+    assert pool.connections[0].queries == [('SELECT "id" FROM "user" WHERE "id" = $1', (1,))] * 2
+    assert executor.info() == pq.CacheInfo(hits=2, misses=2, maxsize=100, currsize=2)
+
+
+def test_fetchrow_execute():
+    pool = testing.FakePool(lambda query, *args: [args])
+    executor = pq.Executor(pool)
+
+    async def run():
+        return (
+            await executor.fetchrow(SELECT, id=5),
+            await executor.execute(UPDATE, "oxy", 5),
+        )
+
+    assert asyncio.run(run()) == ((5,), "UPDATE 1")
+
+
+def test_cache_eviction():
+    pool = testing.FakePool()
+    executor = pq.Executor(pool, cache_size=1)
+
+    async def run():
+        await executor.fetch(SELECT, 1)
+        await executor.execute(UPDATE, "oxy", 1)
+        await executor.fetch(SELECT, 1)
+
+    asyncio.run(run())
+    assert [stmt.query.split()[0] for stmt in pool.connections[0].statements] == [
+        "SELECT", "UPDATE", "SELECT",
+    ]
+    assert executor.info().currsize == 1
+    assert [stmt.valid for stmt in pool.connections[0].statements] == [False, False, True]
+
+
+def test_connection_key():
+    pool = testing.FakePool([(1,)], size=2, proxies=True)
+    executor = pq.Executor(pool, connection_key=lambda proxy: proxy.connection)
+
+    async def run():
+        return [await executor.fetch(SELECT, 1) for _ in range(4)]
+
+    assert asyncio.run(run()) == [[(1,)]] * 4
+    assert [len(conn.statements) for conn in pool.connections] == [1, 1]
+    assert executor.info() == pq.CacheInfo(hits=2, misses=2, maxsize=100, currsize=2)
+
+
+def test_proxies_need_connection_key():
+    executor = pq.Executor(testing.FakePool(proxies=True))
+    with pytest.raises(TypeError, match="pass a connection_key"):
+        asyncio.run(executor.fetch(SELECT, 1))
+
+
+def test_reprepare_invalid_statement():
+    pool = testing.FakePool([(1,)])
+    executor = pq.Executor(pool)
+
+    async def run():
+        await executor.fetch(SELECT, 1)
+        pool.connections[0].deallocate()
+        return await executor.fetch(SELECT, 1)
+
+    assert asyncio.run(run()) == [(1,)]
+    assert len(pool.connections[0].statements) == 2
+
+
+def test_other_errors_raise():
+    def rows(query, *args):
+        raise RuntimeError("connection lost")
+
+    executor = pq.Executor(testing.FakePool(rows))
+    with pytest.raises(RuntimeError):
+        asyncio.run(executor.fetch(SELECT, 1))
+    assert executor.misses == 1
+
+
+def test_cache_size():
+    with pytest.raises(ValueError):
+        pq.Executor(testing.FakePool(), cache_size=0)
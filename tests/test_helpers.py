@@ -12,13 +12,36 @@ def test_group_multi():
         [pq.Variable("a"), pq.Variable("b"), pq.Variable("c")],
         pq.Operator.add
     )
-    assert res == pq.Expression(
-            pq.Expression(
-                pq.Variable("a"), pq.Operator.add, pq.Variable("b")
-            ),
-            pq.Operator.add,
-            pq.Variable("c")
-    )
+    assert isinstance(res, pq.Chain)
+    assert res.op == pq.Operator.add
+    assert [var.name for var in res.values] == ["a", "b", "c"]
+    assert res.flatten() == [
+        pq.Variable("a"), "+", pq.Variable("b"), "+", pq.Variable("c")
+    ]
+
+
+def test_group_merges_nested():
+    inner = pq.group([pq.Variable("a"), pq.Variable("b")], pq.Operator.and_)
+    res = pq.group([inner, pq.Variable("c")], pq.Operator.and_)
+    assert [var.name for var in res.values] == ["a", "b", "c"]
+
+
+def test_group_keeps_other_operator():
+    inner = pq.group([pq.Variable("a"), pq.Variable("b")], pq.Operator.or_)
+    res = pq.group([inner, pq.Variable("c")], pq.Operator.and_)
+    assert len(res.values) == 2
+    assert res.flatten() == [
+        "(", pq.Variable("a"), "OR", pq.Variable("b"), ")", "AND", pq.Variable("c")
+    ]
+
+
+def test_group_many_constraints():
+    constraints = [pq.Column(f"col{i}") == i for i in range(5000)]
+    query = pq.Select("id").from_("t").where(*constraints).to_query()
+    sql, *args = query()
+    assert sql.count(" AND ") == 4999
+    assert "((" not in sql
+    assert args == list(range(5000))
 
 
 def test_group_none():
@@ -26,3 +26,170 @@ def test_insert_values_fromquery_nonmatch():
 def test_insert_values():
     query = pq.Insert("table", ["column1", "column2"])
 
+    query.values(pq.Variable("a"), pq.Variable("b"))
+    assert query.to_query()(1, 2) == (
+        'INSERT INTO "table" ("column1", "column2") VALUES ($1, $2)', 1, 2
+    )
+
+
+def test_insert_default_values():
+    query = pq.Insert("table", ["column1", "column2"]).to_query()
+    assert query(1, 2) == (
+        'INSERT INTO "table" ("column1", "column2") VALUES ($1, $2)', 1, 2
+    )
+
+
+def test_insert_batches():
+    query = pq.Insert("table", ["a", "b"])
+    batches = list(query.batches([(1, 2), (3, 4), (5, 6)], max_params=4))
+    assert batches == [
+        ('INSERT INTO "table" ("a", "b") VALUES ($1, $2), ($3, $4)', 1, 2, 3, 4),
+        ('INSERT INTO "table" ("a", "b") VALUES ($1, $2)', 5, 6),
+    ]
+
+
+def test_insert_batches_reuses_query():
+    query = pq.Insert("table", ["a"])
+    batches = list(query.batches(([i] for i in range(7)), max_params=3))
+    assert [len(batch) - 1 for batch in batches] == [3, 3, 1]
+    assert batches[0][0] is batches[1][0]
+
+
+def test_insert_batches_reuses_query_across_calls():
+    query = pq.Insert("table", ["a"])
+    first = next(query.batches([[1], [2]]))
+    assert next(query.batches([[3], [4]]))[0] is first[0]
+    query.on_conflict("a").do_nothing()
+    assert next(query.batches([[3], [4]]))[0].endswith('ON CONFLICT ("a") DO NOTHING')
+
+
+def test_insert_batches_lazy():
+    def rows():
+        yield (1,)
+        raise RuntimeError("consumed too far")
+
+    batches = pq.Insert("table", ["a"]).batches(rows(), max_params=1)
+    assert next(batches) == ('INSERT INTO "table" ("a") VALUES ($1)', 1)
+
+
+def test_insert_batches_default_limit():
+    query = pq.Insert("table", ["a", "b", "c"])
+    batch = next(query.batches([(1, 2, 3)] * 20000))
+    assert len(batch) - 1 == pq.MAX_PARAMS // 3 * 3
+
+
+def test_insert_batches_row_width():
+    with pytest.raises(ValueError):
+        list(pq.Insert("table", ["a", "b"]).batches([(1, 2), (3,)]))
+
+
+def test_insert_batches_too_wide():
+    with pytest.raises(ValueError):
+        list(pq.Insert("table", ["a", "b"]).batches([(1, 2)], max_params=1))
+
+
+def test_insert_unnest():
+    query = pq.Insert("table", ["a", "b"]).unnest(["int8", "text"]).to_query()
+    sql = 'INSERT INTO "table" ("a", "b") SELECT * FROM unnest ($1::int8[], $2::text[])'
+    assert query([1, 2], ["x", "y"]) == (sql, [1, 2], ["x", "y"])
+    assert query(b=["x"], a=[1]) == (sql, [1], ["x"])
+
+
+def test_insert_unnest_rows():
+    query = pq.Insert("table", ["a", "b"]).unnest(["int8", "text"])
+    sql, a, b = query.unnest_rows(iter([(1, "x"), (2, "y"), (3, "z")]))
+    assert sql.endswith("unnest ($1::int8[], $2::text[])")
+    assert (a, b) == ([1, 2, 3], ["x", "y", "z"])
+    assert query.unnest_rows([]) == (sql, [], [])
+
+
+def test_insert_unnest_constant_shape():
+    query = pq.Insert("table", ["a"]).unnest(["int4"])
+    assert query.unnest_rows([(1,)])[0] is query.unnest_rows([(1,), (2,)])[0]
+
+
+def test_insert_unnest_types_mismatch():
+    with pytest.raises(ValueError):
+        pq.Insert("table", ["a", "b"]).unnest(["int8"])
+
+
+def test_insert_unnest_rows_requires_unnest():
+    with pytest.raises(ValueError):
+        pq.Insert("table", ["a"]).unnest_rows([(1,)])
+
+
+def test_schema_types():
+    users = pq.Table("user", {"id": "int8", "name": "text"})
+    insert = pq.Insert(users, ["id", "name"])
+    assert insert.to_query().sql == 'INSERT INTO "user" ("id", "name") VALUES ($1::int8, $2::text)'
+    assert insert.unnest().to_query().pgtypes == ("int8[]", "text[]")
+    assert next(pq.Insert(users, ["id"]).batches([(1,), (2,)])) == (
+        'INSERT INTO "user" ("id") VALUES ($1::int8), ($2::int8)', 1, 2
+    )
+
+
+def test_schema_types_missing():
+    with pytest.raises(ValueError):
+        pq.Insert(pq.Table("user", {"id": "int8"}), ["id", "name"]).unnest()
+
+
+def test_on_conflict_do_update():
+    query = pq.Insert("user", ["id", "name"]).on_conflict("id").do_update("name").to_query()
+    assert query.sql == (
+        'INSERT INTO "user" ("id", "name") VALUES ($1, $2)'
+        ' ON CONFLICT ("id") DO UPDATE SET "name" = "excluded"."name"'
+    )
+
+
+def test_on_conflict_do_update_defaults():
+    insert = pq.Insert("member", ["org", "user", "role", "since"]).on_conflict("org", "user")
+    assert insert.do_update().to_query().sql.endswith(
+        'ON CONFLICT ("org", "user") DO UPDATE'
+        ' SET "role" = "excluded"."role", "since" = "excluded"."since"'
+    )
+
+
+def test_on_conflict_constraint_expression():
+    count = pq.Column("count", table="counter") + pq.EXCLUDED.col("count")
+    query = pq.Insert("counter", ["key", "count"]).on_conflict(constraint="counter_pkey")
+    query = query.do_update(count=count, updated=int).to_query()
+    assert query.sql.endswith(
+        'ON CONFLICT ON CONSTRAINT "counter_pkey" DO UPDATE'
+        ' SET "count" = ("counter"."count" + "excluded"."count"), "updated" = $3'
+    )
+    assert query(1, 2, 3)[1:] == (1, 2, 3)
+
+
+def test_on_conflict_do_nothing():
+    insert = pq.Insert("user", ["id", "name"]).do_nothing()
+    assert insert.to_query().sql.endswith("VALUES ($1, $2) ON CONFLICT DO NOTHING")
+    insert = pq.Insert("user", ["id", "name"]).on_conflict("id").do_nothing()
+    assert insert.to_query().sql.endswith('ON CONFLICT ("id") DO NOTHING')
+
+
+def test_on_conflict_batches_and_unnest():
+    insert = pq.Insert("user", ["id", "name"]).on_conflict("id").do_update()
+    assert next(insert.batches([(1, "a"), (2, "b")])) == (
+        'INSERT INTO "user" ("id", "name") VALUES ($1, $2), ($3, $4)'
+        ' ON CONFLICT ("id") DO UPDATE SET "name" = "excluded"."name"', 1, "a", 2, "b"
+    )
+    assert insert.unnest(["int8", "text"]).to_query().sql == (
+        'INSERT INTO "user" ("id", "name") SELECT * FROM unnest ($1::int8[], $2::text[])'
+        ' ON CONFLICT ("id") DO UPDATE SET "name" = "excluded"."name"'
+    )
+
+
+def test_on_conflict_errors():
+    with pytest.raises(ValueError):
+        pq.Insert("user", ["id"]).on_conflict("id", constraint="user_pkey")
+    with pytest.raises(ValueError):
+        pq.Insert("user", ["id"]).do_update("id")
+    with pytest.raises(ValueError):
+        pq.Insert("user", ["id"]).on_conflict().do_update("id")
+    with pytest.raises(ValueError):
+        pq.Insert("user", ["id"]).on_conflict("id").do_update()
+    with pytest.raises(ValueError):
+        pq.Insert("user", ["id"]).on_conflict("id").to_query()
+    insert = pq.Insert("user", ["id", "name"]).on_conflict("id").do_update(name=str)
+    with pytest.raises(ValueError):
+        next(insert.batches([(1, "a")]))
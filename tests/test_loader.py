@@ -0,0 +1,133 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import asyncio
+
+import pytest
+import prequel as pq
+from prequel import testing
+
+ROWS = [{"id": i, "team": i % 2} for i in range(10)]
+
+
+def lookup(query, keys):
+    column = "team" if '"team"' in query.split("WHERE")[1] else "id"
+    return [row for row in ROWS if row[column] in keys]
+
+
+def test_query():
+    loader = pq.Loader(None, pq.Select("id").from_("user").where(active=True), "id")
+    assert loader.query.sql == (
+        'SELECT "id" FROM "user" WHERE ("active" = $1) AND ("id" = ANY ($2))'
+    )
+
+
+def test_coalesce_and_dedup():
+    conn = testing.FakeConnection(lookup)
+    loader = pq.Loader(conn.fetch, pq.Select("id").from_("user"), "id")
+
+    async def run():
+        return await asyncio.gather(loader.load(1), loader.load(2), loader.load(1), loader.load(42))
+
+    assert asyncio.run(run()) == [ROWS[1], ROWS[2], ROWS[1], None]
+    assert conn.queries == [('SELECT "id" FROM "user" WHERE "id" = ANY ($1)', ([1, 2, 42],))]
+
+
+def test_max_batch_size():
+    conn = testing.FakeConnection(lookup)
+    loader = pq.Loader(conn.fetch, pq.Select("id").from_("user"), "id", max_batch_size=3)
+
+    async def run():
+        return await loader.load_many(range(7))
+
+    assert asyncio.run(run()) == ROWS[:7]
+    assert [args[0] for _, args in conn.queries] == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_window():
+    conn = testing.FakeConnection(lookup)
+    loader = pq.Loader(conn.fetch, pq.Select("id").from_("user"), "id", window=0.01)
+
+    async def run():
+        first = loader.load(1)
+        await asyncio.sleep(0)
+        second = loader.load(2)
+        return await asyncio.gather(first, second)
+
+    assert asyncio.run(run()) == [ROWS[1], ROWS[2]]
+    assert len(conn.queries) == 1
+
+
+def test_many():
+    conn = testing.FakeConnection(lookup)
+    loader = pq.Loader(conn.fetch, pq.Select("id").from_("user"), "team", many=True)
+
+    async def run():
+        return await asyncio.gather(loader.load(0), loader.load(2))
+
+    assert asyncio.run(run()) == [ROWS[0::2], []]
+
+
+@pytest.mark.parametrize("active,params", [(True, None), (bool, {"active": True})])
+def test_select_arguments(active, params):
+    rows = [{"id": 1, "active": True}, {"id": 2, "active": False}]
+
+    def lookup_active(query, active, keys):
+        return [row for row in rows if row["active"] == active and row["id"] in keys]
+
+    conn = testing.FakeConnection(lookup_active)
+    select = pq.Select("id").from_("user").where(active=active)
+    loader = pq.Loader(conn.fetch, select, "id", params=params)
+
+    async def run():
+        return await loader.load_many([1, 2])
+
+    assert asyncio.run(run()) == [rows[0], None]
+    assert conn.queries == [
+        ('SELECT "id" FROM "user" WHERE ("active" = $1) AND ("id" = ANY ($2))', (True, [1, 2])),
+    ]
+
+
+def test_unknown_params():
+    with pytest.raises(TypeError):
+        pq.Loader(None, pq.Select("id").from_("user"), "id", params={"tenant": 1})
+
+
+def test_error():
+    def fail(query, *args):
+        raise RuntimeError("connection lost")
+
+    loader = pq.Loader(testing.FakeConnection(fail).fetch, pq.Select("id").from_("user"), "id")
+
+    async def run():
+        return await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+
+    assert [type(res) for res in asyncio.run(run())] == [RuntimeError, RuntimeError]
+
+
+def test_cancelled_fetch():
+    async def fetch(query, *args):
+        raise asyncio.CancelledError()
+
+    loader = pq.Loader(fetch, pq.Select("id").from_("user"), "id")
+
+    async def run():
+        return await asyncio.wait_for(
+            asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True), 1
+        )
+
+    results = asyncio.run(run())
+    assert [type(res) for res in results] == [asyncio.CancelledError] * 2
+    assert not loader._tasks  # pylint: disable=protected-access
+
+
+def test_bad_rows():
+    loader = pq.Loader(testing.FakeConnection([{"other": 1}]).fetch,
+                       pq.Select("id").from_("user"), "id")
+
+    async def run():
+        return await asyncio.wait_for(loader.load(1), 1)
+
+    with pytest.raises(KeyError):
+        asyncio.run(run())
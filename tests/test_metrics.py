@@ -0,0 +1,93 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import pytest
+import prequel as pq
+from prequel import metrics
+
+BLOCKS = ["SELECT", '"id"', "FROM", '"metrics"', "WHERE", '"id"', "=", pq.Variable("id")]
+SQL = 'SELECT "id" FROM "metrics" WHERE "id" = $1'
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.disable()
+    metrics.reset()
+
+
+def test_disabled_records_nothing():
+    query = pq.mkquery(BLOCKS)
+    query(1)
+    assert pq.stats() == []
+
+
+def test_compile_and_bind():
+    metrics.enable()
+    query = pq.mkquery(BLOCKS)
+    query(1)
+    query(id=2)
+    (entry,) = pq.stats()
+    assert (entry.sql, entry.compiles, entry.binds) == (SQL, 1, 2)
+    assert entry.compile_time > 0 and entry.bind_time > 0
+    assert entry.total_time == entry.compile_time + entry.bind_time
+
+
+def test_toggle_existing_queries():
+    query = pq.mkquery(BLOCKS)
+    metrics.enable()
+    query(1)
+    metrics.disable()
+    query(1)
+    assert pq.stats()[0].binds == 1
+
+
+def test_failed_bind_not_recorded():
+    metrics.enable()
+    query = pq.mkquery(BLOCKS)
+    with pytest.raises(TypeError):
+        query()
+    assert pq.stats()[0].binds == 0
+
+
+def test_hooks():
+    events = []
+
+    def hook(event, sql, seconds):
+        events.append((event, sql))
+
+    metrics.add_hook(hook)
+    try:
+        metrics.enable()
+        pq.mkquery(BLOCKS)(1)
+    finally:
+        metrics.remove_hook(hook)
+    assert events == [("compile", SQL), ("bind", SQL)]
+
+
+def test_failing_hook(caplog):
+    def hook(event, sql, seconds):
+        raise RuntimeError("statsd is down")
+
+    metrics.add_hook(hook)
+    try:
+        metrics.enable()
+        assert pq.mkquery(BLOCKS)(1) == (SQL, 1)
+    finally:
+        metrics.remove_hook(hook)
+    assert [record.exc_info[0] for record in caplog.records] == [RuntimeError, RuntimeError]
+    assert pq.stats()[0].binds == 1
+
+
+def test_stats_top():
+    metrics.enable()
+    pq.mkquery(BLOCKS)
+    query = pq.mkquery(["SELECT", pq.Variable("a")])
+    for _ in range(3):
+        query(1)
+    assert [entry.sql for entry in pq.stats(top=1, by="binds")] == ["SELECT $1"]
+    assert len(pq.stats(top=None)) == 2
+    with pytest.raises(ValueError):
+        pq.stats(by="sql_length")
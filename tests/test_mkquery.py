@@ -55,3 +55,112 @@ def test_mkquery_bracket():
     res = pq.mkquery(["(", "one", "=", "two", ")"])
     assert str(inspect.signature(res)) == "() -> Tuple[str]"
     assert res() == ("(one = two)",)
+
+
+def test_mkquery_kwargs():
+    res = pq.mkquery([pq.Variable("a"), pq.Variable("b", 2), pq.Variable("c", 3)])
+    assert res(1, c=4) == ("$1 $2 $3", 1, 2, 4)
+    assert res(c=5, a=0) == ("$1 $2 $3", 0, 2, 5)
+
+
+def test_mkquery_too_many():
+    res = pq.mkquery([pq.Variable("a")])
+    with pytest.raises(TypeError, match="Query takes 1 arguments but 3 were given"):
+        res(1, 2, 3)
+
+
+def test_mkquery_missing():
+    res = pq.mkquery([pq.Variable("a"), pq.Variable("b")])
+    with pytest.raises(TypeError, match="missing a required keyword-only argument: 'b'"):
+        res(1)
+
+
+def test_mkquery_unexpected():
+    res = pq.mkquery([pq.Variable("a")])
+    with pytest.raises(TypeError, match=r"unexpected keyword arguments \['b'\]"):
+        res(1, b=2)
+
+
+def test_mkquery_reserved_names():
+    res = pq.mkquery([pq.Variable("_pq_query"), pq.Variable("_pq_args", 1)])
+    assert res("x") == ("$1 $2", "x", 1)
+
+
+def test_required_after_default():
+    query = pq.Select("id").from_("user").where(active=True, id=int, name="oxy").to_query()
+    params = inspect.signature(query).parameters
+    assert [(name, param.kind) for name, param in params.items()] == [
+        ("active", inspect.Parameter.POSITIONAL_OR_KEYWORD),
+        ("id", inspect.Parameter.KEYWORD_ONLY),
+        ("name", inspect.Parameter.KEYWORD_ONLY),
+    ]
+    assert query(id=1) == (
+        'SELECT "id" FROM "user" WHERE ("active" = $1) AND ("id" = $2) AND ("name" = $3)',
+        True, 1, "oxy",
+    )
+    assert query(False, id=1)[1:] == (False, 1, "oxy")
+    with pytest.raises(TypeError, match="missing a required keyword-only argument: 'id'"):
+        query(False)
+    with pytest.raises(TypeError, match="takes 1 arguments but 2 were given"):
+        query(False, 1)
+    assert list(inspect.signature(query.partial(active=False)).parameters) == ["id", "name"]
+    assert query.partial(active=False)(1)[1:] == (False, 1, "oxy")
+
+
+def test_partial():
+    query = pq.mkquery([pq.Variable("a"), pq.Variable("tenant", int), pq.Variable("b", 2)])
+    bound = query.partial(tenant=7)
+    assert list(inspect.signature(bound).parameters) == ["a", "b"]
+    assert bound(1) == ("$1 $2 $3", 1, 7, 2)
+    assert bound(b=3, a=0) == ("$1 $2 $3", 0, 7, 3)
+    assert bound.sql == query.sql
+    assert dict(bound.fixed) == {"tenant": 7}
+    assert bound.partial(b=5)(a=1) == ("$1 $2 $3", 1, 7, 5)
+    assert query(1, 8) == ("$1 $2 $3", 1, 8, 2)
+
+
+def test_partial_shares_code():
+    query = pq.mkquery([pq.Variable("a"), pq.Variable("tenant", int), pq.Variable("b", 2)])
+    first, second = query.partial(tenant=7), query.partial(tenant=8)
+    assert first.__code__ is second.__code__
+    assert first.__signature__ is second.__signature__
+    assert (first(1), second(1)) == (("$1 $2 $3", 1, 7, 2), ("$1 $2 $3", 1, 8, 2))
+    both = query.partial(b=3, tenant=9)
+    assert first.partial(b=5).__code__ is both.__code__
+    assert both(0) == ("$1 $2 $3", 0, 9, 3)
+    assert first.partial(b=5)(0) == ("$1 $2 $3", 0, 7, 5)
+
+
+def test_partial_errors():
+    bound = pq.mkquery([pq.Variable("a"), pq.Variable("tenant")]).partial(tenant=7)
+    with pytest.raises(TypeError, match="Query takes 1 arguments but 2 were given"):
+        bound(1, 2)
+    with pytest.raises(TypeError, match=r"unexpected keyword arguments \['tenant'\]"):
+        bound(1, tenant=8)
+    with pytest.raises(TypeError, match=r"unexpected keyword arguments \['tenant'\]"):
+        bound.partial(tenant=8)
+    with pytest.raises(TypeError, match=r"unexpected keyword arguments \['other'\]"):
+        bound.partial(other=8)
+
+
+def test_builtin_names():
+    query = pq.Select("id").from_("t").where(len=int, next=int).to_query()
+    assert query(1, next=2)[1:] == (1, 2)
+    with pytest.raises(TypeError, match="Query takes 2 arguments but 3 were given"):
+        query(1, 2, 3)
+    with pytest.raises(TypeError, match="missing a required keyword-only argument: 'next'"):
+        query(len=1)
+
+
+def test_mkquery_wide():
+    res = pq.mkquery([pq.Variable(f"a{i}") for i in range(50)] + [pq.Variable("b", 0)])
+    args = tuple(range(50))
+    assert res(*args) == (res.sql, *args, 0)
+    assert res(*args, 1) == (res.sql, *args, 1)
+    assert res(*args[:49], a49=49, b=2) == (res.sql, *args, 2)
+    with pytest.raises(TypeError, match="Query takes 51 arguments but 52 were given"):
+        res(*args, 1, 2)
+    with pytest.raises(TypeError, match="missing a required keyword-only argument: 'a49'"):
+        res(*args[:49])
+    with pytest.raises(TypeError, match=r"unexpected keyword arguments \['c'\]"):
+        res(*args, c=1)
@@ -0,0 +1,230 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import datetime
+import decimal
+import struct
+import uuid
+
+import pytest
+import prequel as pq
+from prequel import pgcopy
+
+HEADER = b"PGCOPY\n\xff\r\n\x00" + b"\x00" * 8
+TRAILER = b"\xff\xff"
+
+
+def field(data):
+    return struct.pack("!i", len(data)) + data
+
+
+@pytest.mark.parametrize("pgtype,value,expected", [
+    ("bool", True, b"\x01"),
+    ("int2", -2, b"\xff\xfe"),
+    ("int4", 1, b"\x00\x00\x00\x01"),
+    ("int8", 1, b"\x00" * 7 + b"\x01"),
+    ("float8", 1.5, struct.pack("!d", 1.5)),
+    ("text", "ö", "ö".encode()),
+    ("bytea", b"\x00\x01", b"\x00\x01"),
+    ("date", datetime.date(2000, 1, 2), struct.pack("!i", 1)),
+    ("timestamp", datetime.datetime(2000, 1, 1, 0, 0, 1), struct.pack("!q", 1000000)),
+    (
+        "timestamptz",
+        datetime.datetime(2000, 1, 1, 1, tzinfo=datetime.timezone(datetime.timedelta(hours=1))),
+        struct.pack("!q", 0),
+    ),
+    ("uuid", uuid.UUID(int=1), b"\x00" * 15 + b"\x01"),
+    ("uuid", str(uuid.UUID(int=1)), b"\x00" * 15 + b"\x01"),
+])
+def test_encoders(pgtype, value, expected):
+    assert pq.ENCODERS[pgtype](value) == expected
+
+
+@pytest.mark.parametrize("value,header,digits", [
+    (decimal.Decimal("-12345.678"), (3, 1, 0x4000, 3), [1, 2345, 6780]),
+    (decimal.Decimal("0.0001"), (1, -1, 0, 4), [1]),
+    (decimal.Decimal("10000"), (1, 1, 0, 0), [1]),
+    (decimal.Decimal("1E+5"), (1, 1, 0, 0), [10]),
+    (decimal.Decimal("0.00"), (0, 0, 0, 2), []),
+    (decimal.Decimal("NaN"), (0, 0, 0xC000, 0), []),
+    (12, (1, 0, 0, 0), [12]),
+    (0.5, (1, -1, 0, 1), [5000]),
+])
+def test_encode_numeric(value, header, digits):
+    expected = struct.pack("!hhHH", *header) + struct.pack(f"!{len(digits)}H", *digits)
+    assert pq.ENCODERS["numeric"](value) == expected
+
+
+def test_copy_writer():
+    writer = pq.CopyWriter(["int4", "text"])
+    data = b"".join(writer.encode([(1, "a"), (2, None)]))
+    assert data == (
+        HEADER
+        + b"\x00\x02" + field(b"\x00\x00\x00\x01") + field(b"a")
+        + b"\x00\x02" + field(b"\x00\x00\x00\x02") + b"\xff\xff\xff\xff"
+        + TRAILER
+    )
+
+
+def test_copy_writer_chunks():
+    writer = pq.CopyWriter(["int8"], buffer_size=64)
+    chunks = list(writer.encode([(i,) for i in range(100)]))
+    assert len(chunks) > 1
+    assert all(len(chunk) < 64 + 14 for chunk in chunks)
+    assert b"".join(chunks) == b"".join(pq.CopyWriter(["int8"]).encode([(i,) for i in range(100)]))
+
+
+def test_copy_writer_interleaved():
+    writer = pq.CopyWriter(["int8"], buffer_size=64)
+    rows = [[(i,) for i in range(50)], [(i,) for i in range(50, 100)]]
+    expected = [b"".join(writer.encode(part)) for part in rows]
+    streams = [writer.encode(part) for part in rows]
+    chunks: list = [[], []]
+    for pair in zip(*streams):
+        for i, chunk in enumerate(pair):
+            chunks[i].append(chunk)
+    for i, stream in enumerate(streams):
+        chunks[i].extend(stream)
+    assert [b"".join(parts) for parts in chunks] == expected
+
+
+def test_insert_copy_column_types():
+    users = pq.Insert("user", ["id"])
+    assert b"".join(users.copy([(1,)], column_types=["int8"])[1]) == b"".join(
+        pq.CopyWriter(["int8"]).encode([(1,)])
+    )
+
+
+def test_copy_writer_custom_encoder():
+    writer = pq.CopyWriter([lambda value: value.encode("ascii")])
+    assert b"".join(writer.encode([("x",)])) == HEADER + b"\x00\x01" + field(b"x") + TRAILER
+
+
+def test_register_encoder():
+    pq.register_encoder("citext", pgcopy.ENCODERS["text"])
+    try:
+        writer = pq.CopyWriter(["citext"])
+        assert b"".join(writer.encode([("x",)])) == HEADER + b"\x00\x01" + field(b"x") + TRAILER
+    finally:
+        del pgcopy.ENCODERS["citext"]
+
+
+def test_copy_writer_unknown_type():
+    with pytest.raises(ValueError):
+        pq.CopyWriter(["money"])
+
+
+def test_copy_writer_row_width():
+    with pytest.raises(ValueError):
+        list(pq.CopyWriter(["int4", "int4"]).encode([(1,)]))
+
+
+def test_insert_copy():
+    query, data = pq.Insert("user", ["id", pq.Column("name")]).copy([(1, "a")], ["int8", "text"])
+    assert query == 'COPY "user" ("id", "name") FROM STDIN (FORMAT binary)'
+    assert b"".join(data) == b"".join(pq.CopyWriter(["int8", "text"]).encode([(1, "a")]))
+
+
+def test_insert_copy_aliased_table():
+    query = pq.Insert(pq.Table("user").as_("u"), ["id"]).copy_query()
+    assert query == 'COPY "user" ("id") FROM STDIN (FORMAT binary)'
+
+
+def test_insert_copy_types_mismatch():
+    with pytest.raises(ValueError):
+        pq.Insert("user", ["id", "name"]).copy([], ["int8"])
+
+
+def test_encode_columns_fixed_width():
+    np = pytest.importorskip("numpy")
+    ids = np.arange(5, dtype=np.int32)
+    scores = np.linspace(0, 1, 5)
+    flags = np.array([True, False, True, False, True])
+    data = b"".join(pq.encode_columns([ids, scores, flags], ["int8", "float8", "bool"]))
+    rows = zip(ids.tolist(), scores.tolist(), flags.tolist())
+    assert data == b"".join(pq.CopyWriter(["int8", "float8", "bool"]).encode(rows))
+
+
+def test_encode_columns_nulls():
+    np = pytest.importorskip("numpy")
+    ids = np.arange(4)
+    scores = np.ma.masked_array([1.0, 2.0, 3.0, 4.0], mask=[False, True, False, False])
+    nulls = [np.array([False, False, True, False]), None]
+    chunks = list(pq.encode_columns([ids, scores], ["int4", "float4"], nulls, chunk_rows=3))
+    rows = [(0, 1.0), (1, None), (None, 3.0), (3, 4.0)]
+    assert b"".join(chunks) == b"".join(pq.CopyWriter(["int4", "float4"]).encode(rows))
+    assert len(chunks) == 4
+
+
+def test_encode_columns_datetime():
+    np = pytest.importorskip("numpy")
+    stamps = np.array(["2000-01-01T00:00:01", "2020-05-17T12:30:00.25"], dtype="datetime64[us]")
+    days = np.array(["2000-01-02", "1999-12-31"], dtype="datetime64[D]")
+    data = b"".join(pq.encode_columns([stamps, days], ["timestamp", "date"]))
+    rows = zip(stamps.tolist(), days.tolist())
+    assert data == b"".join(pq.CopyWriter(["timestamp", "date"]).encode(rows))
+
+
+def test_encode_columns_fallback():
+    np = pytest.importorskip("numpy")
+    ids = np.arange(3)
+    names = np.array(["a", "b", "c"])
+    nulls = [None, np.array([False, True, False])]
+    data = b"".join(pq.encode_columns([ids, names], ["int8", "text"], nulls))
+    rows = [(0, "a"), (1, None), (2, "c")]
+    assert data == b"".join(pq.CopyWriter(["int8", "text"]).encode(rows))
+
+
+def test_encode_columns_mixed_chunks():
+    np = pytest.importorskip("numpy")
+    ids = np.arange(20).reshape(10, 2)[:, 1]
+    scores = np.ma.masked_array(np.linspace(0, 1, 10), mask=[i % 3 == 0 for i in range(10)])
+    names = np.array([f"name{i}" * (i % 3) for i in range(10)])
+    nulls = [None, None, np.array([i % 4 == 1 for i in range(10)])]
+    types = ["int4", "float8", "text"]
+    chunks = list(pq.encode_columns([ids, scores, names], types, nulls, chunk_rows=4))
+    rows = [
+        (int(ids[i]), None if i % 3 == 0 else float(scores[i]), None if i % 4 == 1 else names[i])
+        for i in range(10)
+    ]
+    assert b"".join(chunks) == b"".join(pq.CopyWriter(types).encode(rows))
+    assert len(chunks) == 5
+
+
+@pytest.mark.parametrize("pgtypes", [["int4"], ["int4", "text"]])
+def test_encode_columns_lossy_dtype(pgtypes):
+    np = pytest.importorskip("numpy")
+    columns = [np.array([1.5, 2.0]), np.array(["a", "b"])][:len(pgtypes)]
+    with pytest.raises(TypeError):
+        list(pq.encode_columns(columns, pgtypes))
+
+
+def test_encode_columns_out_of_range():
+    np = pytest.importorskip("numpy")
+    with pytest.raises(ValueError):
+        list(pq.encode_columns([np.array([1 << 20])], ["int2"]))
+
+
+def test_encode_columns_length_mismatch():
+    np = pytest.importorskip("numpy")
+    with pytest.raises(ValueError):
+        list(pq.encode_columns([np.arange(2), np.arange(3)], ["int8", "int8"]))
+
+
+def test_insert_copy_columns():
+    np = pytest.importorskip("numpy")
+    insert = pq.Insert("user", ["id", "score"])
+    data = {"score": np.array([0.5, np.nan]), "id": np.array([1, 2])}
+    query, chunks = insert.copy_columns(
+        data, ["int8", "float8"], nulls={"score": np.isnan(data["score"])}
+    )
+    assert query == 'COPY "user" ("id", "score") FROM STDIN (FORMAT binary)'
+    rows = [(1, 0.5), (2, None)]
+    assert b"".join(chunks) == b"".join(pq.CopyWriter(["int8", "float8"]).encode(rows))
+
+
+def test_insert_copy_columns_mismatch():
+    np = pytest.importorskip("numpy")
+    with pytest.raises(ValueError):
+        pq.Insert("user", ["id", "name"]).copy_columns({"id": np.arange(2)}, ["int8", "text"])
@@ -0,0 +1,48 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import pytest
+import prequel as pq
+
+
+def test_insert_returning():
+    query = pq.Insert("user", ["name"]).returning("id", pq.Column("created")).to_query()
+    assert query("oxy") == (
+        'INSERT INTO "user" ("name") VALUES ($1) RETURNING "id", "created"', "oxy"
+    )
+
+
+def test_insert_returning_expressions():
+    total = pq.Column("a") + pq.Column("b")
+    count = pq.FunctionCall(pq.Function.count, [pq.Column("id")])
+    query = pq.Insert("user", ["a", "b"]).returning(total, count).to_query()
+    assert query.sql.endswith('RETURNING "a" + "b", COUNT ("id")')
+
+
+def test_insert_returning_after_on_conflict():
+    insert = pq.Insert("user", ["id", "name"]).on_conflict("id").do_update().returning("id")
+    suffix = 'ON CONFLICT ("id") DO UPDATE SET "name" = "excluded"."name" RETURNING "id"'
+    assert insert.to_query().sql.endswith(suffix)
+    assert next(insert.batches([(1, "a"), (2, "b")]))[0].endswith(suffix)
+    assert insert.unnest(["int8", "text"]).to_query().sql.endswith(suffix)
+
+
+def test_update_returning():
+    query = pq.Update("user").set("name").where(id=int).returning("id", "name").to_query()
+    assert query.sql == 'UPDATE "user" SET "name" = $1 WHERE "id" = $2 RETURNING "id", "name"'
+
+
+def test_update_bulk_returning():
+    update = pq.Update("user").bulk("id", ["name"], ["int8", "text"]).returning("id")
+    assert update.to_query().sql.endswith('WHERE "user"."id" = "v"."id" RETURNING "user"."id"')
+
+
+def test_returning_errors():
+    with pytest.raises(ValueError):
+        pq.Insert("user", ["name"]).returning()
+    with pytest.raises(TypeError):
+        pq.Update("user").returning(1)
+    insert = pq.Insert("user", ["name"]).returning(pq.Column("id") == int)
+    with pytest.raises(ValueError):
+        next(insert.batches([("oxy",)]))
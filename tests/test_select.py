@@ -1,3 +1,6 @@
+import asyncio
+
+import pytest
 import prequel as pq
 
 
@@ -17,3 +20,78 @@ def test_flatten():
     query = pq.Select("id").from_("user")
     assert query.flatten() == ["SELECT", '"id"', "FROM", '"user"']
 
+
+def test_order_by_limit():
+    query = pq.Select("id").from_("user").order_by("name", pq.Column("id")).limit(10)
+    assert query.to_query()() == ('SELECT "id" FROM "user" ORDER BY "name", "id" LIMIT $1', 10)
+
+def test_paginate_single_key():
+    pages = pq.Select("id").from_("user").where(active=bool).paginate("id", page_size=2)
+    assert pages.first(True) == (
+        'SELECT "id" FROM "user" WHERE "active" = $1 ORDER BY "id" LIMIT $2', True, 2
+    )
+    assert pages.next(True, after_id=5) == (
+        'SELECT "id" FROM "user" WHERE ("active" = $1) AND ("id" > $2) ORDER BY "id" LIMIT $3',
+        True, 5, 2,
+    )
+
+def test_paginate_row_key():
+    pages = pq.Select("id").from_("user").paginate(["name", "id"])
+    assert pages.query({"name": "oxy", "id": 3}) == (
+        'SELECT "id" FROM "user" WHERE ("name", "id") > ($1, $2) ORDER BY "name", "id" LIMIT $3',
+        "oxy", 3, 100,
+    )
+
+def test_paginate_pages():
+    rows = [{"id": i} for i in range(5)]
+    calls = []
+
+    def fetch(query, *args):
+        calls.append(query)
+        after = args[0] if len(args) > 1 else -1
+        return [row for row in rows if row["id"] > after][:args[-1]]
+
+    pages = pq.Select("id").from_("user").paginate("id", page_size=2)
+    assert [len(page) for page in pages.pages(fetch)] == [2, 2, 1]
+    assert calls[1] is calls[2]
+    assert [len(page) for page in pages.pages(fetch, page_size=5)] == [5]
+
+def test_paginate_apages():
+    rows = [{"id": i} for i in range(4)]
+
+    async def fetch(_, *args):
+        after = args[0] if len(args) > 1 else -1
+        return [row for row in rows if row["id"] > after][:args[-1]]
+
+    async def collect():
+        pages = pq.Select("id").from_("user").paginate("id", page_size=2)
+        return [page async for page in pages.apages(fetch)]
+
+    assert asyncio.run(collect()) == [rows[:2], rows[2:]]
+
+def test_join():
+    user, post = pq.Table("user"), pq.Table("post")
+    query = pq.Select(user.col("name"), post.col("title")).from_(user).join(
+        post, on=post.col("author") == user.col("id")
+    ).where(user.col("id") == int).to_query()
+    assert query(1) == (
+        'SELECT "user"."name", "post"."title" FROM "user" '
+        'JOIN "post" ON "post"."author" = "user"."id" WHERE "user"."id" = $1',
+        1,
+    )
+
+def test_join_alias():
+    user = pq.Table("user", {"id": "int8", "manager": "int8"}).as_("u")
+    manager = user.as_("m")
+    query = pq.Select(user.col("id"), manager.col("id")).from_(user).join(
+        manager, on=manager.col("id") == user.col("manager"), kind="left"
+    ).where(user.col("id") == int).to_query()
+    assert query.sql == (
+        'SELECT "u"."id", "m"."id" FROM "user" AS "u" '
+        'LEFT JOIN "user" AS "m" ON "m"."id" = "u"."manager" WHERE "u"."id" = $1::int8'
+    )
+    assert list(query.__signature__.parameters) == ["u_id"]
+
+def test_join_kind():
+    with pytest.raises(ValueError):
+        pq.Select("id").from_("user").join("post", on=pq.Column("id") == 1, kind="outer")
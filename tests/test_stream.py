@@ -0,0 +1,73 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import asyncio
+
+import pytest
+import prequel as pq
+from prequel import testing
+
+QUERY = pq.Select("id").from_("user").where(active=bool).to_query()
+
+
+def collect(batches):
+    async def run():
+        return [batch async for batch in batches]
+    return asyncio.run(run())
+
+
+def test_stream_batches():
+    conn = testing.FakeConnection([(i,) for i in range(7)])
+    batches = collect(pq.stream(conn, QUERY, True, batch_size=3))
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert conn.queries == [('SELECT "id" FROM "user" WHERE "active" = $1', (True,))]
+    assert conn.cursors[0].fetches == [3, 3, 3]
+
+
+def test_stream_exact_batches():
+    conn = testing.FakeConnection([(i,) for i in range(4)])
+    batches = collect(pq.stream(conn, QUERY, active=False, batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 2]
+    assert conn.cursors[0].fetches == [2, 2, 2]
+
+
+def test_stream_empty():
+    assert not collect(pq.stream(testing.FakeConnection(), QUERY, True))
+
+
+@pytest.mark.parametrize("prefetch", [1, 3])
+def test_stream_prefetch(prefetch):
+    conn = testing.FakeConnection([(i,) for i in range(10)])
+    batches = collect(pq.stream(conn, QUERY, True, batch_size=4, prefetch=prefetch))
+    assert [row for batch in batches for row in batch] == [(i,) for i in range(10)]
+
+
+def test_stream_prefetch_backpressure():
+    conn = testing.FakeConnection([(i,) for i in range(100)])
+
+    async def run():
+        batches = pq.stream(conn, QUERY, True, batch_size=10, prefetch=2)
+        first = await batches.__anext__()
+        for _ in range(5):
+            await asyncio.sleep(0)
+        fetched = len(conn.cursors[0].fetches)
+        await batches.aclose()
+        return first, fetched
+
+    first, fetched = asyncio.run(run())
+    assert len(first) == 10
+    assert fetched <= 4
+
+
+def test_stream_prefetch_error():
+    def rows(query, *args):
+        raise RuntimeError("connection lost")
+
+    with pytest.raises(RuntimeError):
+        collect(pq.stream(testing.FakeConnection(rows), QUERY, True, prefetch=1))
+
+
+def test_stream_batch_size():
+    with pytest.raises(ValueError):
+        collect(pq.stream(testing.FakeConnection(), QUERY, True, batch_size=0))
@@ -0,0 +1,106 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import pytest
+import prequel as pq
+
+USERS = pq.Table("user", {"id": "int8", "name": "text", "age": "int4"})
+
+
+def test_update_bulk():
+    query = pq.Update("user").bulk("id", ["name", "age"], ["int8", "text", "int4"]).to_query()
+    assert query.sql == (
+        'UPDATE "user" SET "name" = "v"."name", "age" = "v"."age"'
+        ' FROM unnest ($1::int8[], $2::text[], $3::int4[]) AS "v" ("id", "name", "age")'
+        ' WHERE "user"."id" = "v"."id"'
+    )
+    assert query([1, 2], ["a", "b"], [30, 40])[1:] == ([1, 2], ["a", "b"], [30, 40])
+
+
+def test_update_bulk_schema_types():
+    query = pq.Update(USERS).bulk("id", ["name"]).to_query()
+    assert query.pgtypes == ("int8[]", "text[]")
+
+
+def test_update_bulk_missing_types():
+    with pytest.raises(ValueError):
+        pq.Update("user").bulk("id", ["name"])
+    with pytest.raises(ValueError):
+        pq.Update("user").bulk("id", ["name"], ["int8"])
+
+
+def test_update_bulk_composite_key():
+    query = pq.Update("member").bulk(
+        ["org", "user"], ["role"], ["int8", "int8", "text"]
+    ).to_query()
+    assert query.sql.endswith(
+        'WHERE ("member"."org" = "v"."org") AND ("member"."user" = "v"."user")'
+    )
+
+
+def test_update_bulk_set_and_where():
+    update = pq.Update(USERS).bulk("id", ["name"]).set("age").where(pq.Column("age") < int)
+    sql = update.to_query().sql
+    assert sql.startswith('UPDATE "user" SET "name" = "v"."name", "age" = $1::int4 FROM')
+    assert sql.endswith('WHERE ("user"."id" = "v"."id") AND ("age" < $4)')
+
+
+def test_update_bulk_where_updated_column():
+    update = pq.Update(USERS).bulk("id", ["name"]).set(age=pq.Column("age")).where(name=str, age=30)
+    query = update.to_query()
+    assert query.sql == (
+        'UPDATE "user" SET "name" = "v"."name", "age" = "user"."age"'
+        ' FROM unnest ($1::int8[], $2::text[]) AS "v" ("id", "name")'
+        ' WHERE ("user"."id" = "v"."id") AND ("user"."name" = $3::text)'
+        ' AND ("user"."age" = $4::int4)'
+    )
+    assert list(query.query_args) == ["id", "name", "user_name", "age"]
+    assert list(update.batches([(1, "b")], user_name="a"))[0][1:] == ([1], ["b"], "a", 30)
+
+
+def test_update_bulk_positional_where():
+    update = pq.Update("user").bulk("id", ["name"], ["int8", "text"])
+    with pytest.raises(ValueError, match="ambiguous"):
+        update.where(pq.Column("name") == "x").to_query()
+    with pytest.raises(ValueError, match="name of an array"):
+        update.where(pq.Column("name", table="user") == pq.Variable("name")).to_query()
+    query = update.where(pq.Column("name", table="user") == "x").to_query()
+    assert query.sql.endswith('WHERE ("user"."id" = "v"."id") AND ("user"."name" = $3)')
+    assert list(query.query_args) == ["id", "name", "user_name"]
+
+
+def test_update_bulk_set_array_name():
+    with pytest.raises(ValueError, match="name of an array"):
+        pq.Update(USERS).bulk("id", ["name"]).set("name").to_query()
+
+
+def test_update_where_unqualified():
+    query = pq.Update(USERS).set(age=pq.Column("age")).where(name=str).to_query()
+    assert query.sql == 'UPDATE "user" SET "age" = "age" WHERE "name" = $1::text'
+
+
+def test_update_bulk_alias_collision():
+    sql = pq.Update("v").bulk("id", ["name"], ["int8", "text"]).to_query().sql
+    assert 'AS "v_" ("id", "name") WHERE "v"."id" = "v_"."id"' in sql
+
+
+def test_update_batches():
+    update = pq.Update(USERS).bulk("id", ["name"]).set("age")
+    rows = ((i, f"user{i}") for i in range(5))
+    batches = list(update.batches(rows, batch_size=2, age=30))
+    assert len({batch[0] for batch in batches}) == 1
+    assert [batch[1:] for batch in batches] == [
+        (30, [0, 1], ["user0", "user1"]),
+        (30, [2, 3], ["user2", "user3"]),
+        (30, [4], ["user4"]),
+    ]
+
+
+def test_update_batches_errors():
+    with pytest.raises(ValueError):
+        list(pq.Update(USERS).set("name").batches([(1, "a")]))
+    with pytest.raises(ValueError):
+        list(pq.Update(USERS).bulk("id", ["name"]).batches([(1, "a")], batch_size=0))
+    with pytest.raises(ValueError):
+        list(pq.Update(USERS).bulk("id", ["name"]).batches([(1,)]))
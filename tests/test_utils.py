@@ -11,3 +11,14 @@ import prequel.utils as utils
 )
 def test_clean_ident(name, expected):
     assert utils.clean_ident(name) == expected
+
+
+def test_transpose():
+    assert utils.transpose([(1, "a"), (2, "b")], 2) == [[1, 2], ["a", "b"]]
+    assert utils.transpose(iter([(1,)]), 1) == [[1]]
+    assert utils.transpose([], 3) == [[], [], []]
+
+
+def test_transpose_width():
+    with pytest.raises(ValueError):
+        utils.transpose([(1, 2), (3,)], 2)
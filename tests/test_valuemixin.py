@@ -47,3 +47,31 @@ def test_between():
     assert res.val == ValueMixinTest("a")
     assert res.min == ValueMixinTest("b")
     assert res.max == ValueMixinTest("c")
+
+
+def test_in():
+    res = ValueMixinTest("a").in_(ValueMixinTest("b"))
+    assert isinstance(res, pq.In)
+    assert res.val == ValueMixinTest("a")
+    assert res.array == ValueMixinTest("b")
+    assert not res.negate
+    assert res.flatten() == ["a", "=", "ANY", "(", "b", ")"]
+
+
+def test_not_in():
+    res = ValueMixinTest("a").not_in(ValueMixinTest("b"))
+    assert res.negate
+    assert res.as_value() == ["(", "a", "<>", "ALL", "(", "b", ")", ")"]
+
+
+def test_add_boolean_chain():
+    res = (pq.Column("a") == 1) + (pq.Column("b") == 2) + (pq.Column("c") == 3)
+    assert isinstance(res, pq.Chain)
+    assert res.op == pq.Operator.and_
+    assert len(res.values) == 3
+
+
+def test_truediv_boolean_chain():
+    res = (pq.Column("a") == 1) / (pq.Column("b") == 2)
+    assert isinstance(res, pq.Chain)
+    assert res.op == pq.Operator.or_
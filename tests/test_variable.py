@@ -2,6 +2,8 @@
 # pylint: disable=missing-class-docstring
 # pylint: disable=missing-function-docstring
 
+from typing import Any
+
 import pytest
 import prequel as pq
 
@@ -30,3 +32,33 @@ def test_var_flatten():
 def test_var_as_value():
     var = pq.Variable("name", "value")
     assert var.as_value() == [var]
+
+
+def test_var_compile_positions():
+    query_args = pq.types.QueryArgs()
+    assert pq.Variable("a").compile(query_args) == "$1"
+    assert pq.Variable("b").compile(query_args) == "$2"
+    assert pq.Variable("a").compile(query_args) == "$1"
+    assert query_args.position("b") == 2
+    assert list(query_args) == ["a", "b"]
+
+
+def test_var_compile_conflict_warns():
+    query_args = pq.types.QueryArgs()
+    pq.Variable("a", 1).compile(query_args)
+    with pytest.warns(UserWarning):
+        assert pq.Variable("a", "x").compile(query_args) == "$1"
+
+
+def test_var_cast():
+    var = pq.Variable("ids", list, cast="int8[]")
+    assert var.compile(pq.types.QueryArgs()) == "$1::int8[]"
+    assert repr(var) == "Variable('ids', <class 'list'>, cast='int8[]')"
+
+
+def test_var_compile_plain_dict():
+    query_args = {}
+    assert pq.Variable("a").compile(query_args) == "$1"
+    assert pq.Variable("b", 2, cast="int4").compile(query_args) == "$2::int4"
+    assert pq.Variable("a").compile(query_args) == "$1"
+    assert query_args == {"a": (Any, ...), "b": (int, 2)}